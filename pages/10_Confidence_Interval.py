@@ -1,45 +1,120 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-from scipy import stats
 
-# Set the random seed for reproducibility
-np.random.seed(42)
+from utils.client_charts import interval_spec
+from utils.downsample import PIXELS_PER_INCH, interval_envelope
+from utils.figures import FigureSpec
+from utils.kernels import normal_ppf
+from utils.population import population_cache
+from utils.progressive import collect_progressively, is_finished, mark_finished
+from utils.render_cache import cached_pyplot
+from utils.rng import seed_control, stream_seed
+from utils.sampling import iter_sample_means_and_errors, sample_means_and_errors
 
-def compute_confidence_interval(sample, confidence=0.95):
+# Small sampling blocks, so the first chunk of a simulation (and its preview) is ready within milliseconds
+BLOCK_BYTES = 1024 * 1024
+
+# Most intervals drawn in a preview while a simulation runs
+PREVIEW_INTERVALS = 200
+
+# Width of the candlestick plot (inches)
+CANDLESTICK_WIDTH = 14
+
+# Most x-axis labels of the candlestick plot
+MAX_X_LABELS = 50
+
+# Rows of the interval details table sent to the browser
+DETAIL_ROWS = 1000
+
+def compute_confidence_interval(sample_means, standard_errors, confidence=0.95):
     """
-    Compute the confidence interval for a sample using the z-test.
+    Compute the confidence intervals for many samples at once using the z-test.
     """
-    n = len(sample)
-    mean = np.mean(sample)
-    sem = stats.sem(sample)  # Standard error of the mean
-    
     # Z-test uses normal distribution
-    interval = sem * stats.norm.ppf((1 + confidence) / 2.)
+    interval = standard_errors * normal_ppf((1 + confidence) / 2.)
     
-    return mean, mean - interval, mean + interval, interval * 2  # Also return the interval width
-
-def plot_candlestick_intervals(num_samples, sample_size, population_mean, population_std, confidence_level, x_axis_frequency):
-    # Generate population
-    population = np.random.normal(loc=population_mean, scale=population_std, size=10000)
-    sample_means = []
-    lower_bounds = []
-    upper_bounds = []
-    interval_widths = []
-    includes_population_mean = []
-    
-    for _ in range(num_samples):
-        sample = np.random.choice(population, sample_size)
-        mean, lower_bound, upper_bound, interval_width = compute_confidence_interval(sample, confidence_level)
-        sample_means.append(mean)
-        lower_bounds.append(lower_bound)
-        upper_bounds.append(upper_bound)
-        interval_widths.append(interval_width)
-        includes_population_mean.append(lower_bound <= population_mean <= upper_bound)
+    return sample_means, sample_means - interval, sample_means + interval, interval * 2  # Also return the interval width
+
+@st.cache_data(show_spinner="Drawing samples...", max_entries=8)
+def simulate_samples(num_samples, sample_size, population_mean, population_std, seed, _samples=None):
+    """
+    Draw all samples in chunked blocks and return their means and standard errors.
+    _samples are the same means and standard errors if they were already simulated (not part of the cache key).
+    """
+    if _samples is None:
+        population = population_cache.get("normal", {"loc": population_mean, "scale": population_std})
+        _samples = sample_means_and_errors(population, sample_size, num_samples, rng=seed, max_block_bytes=BLOCK_BYTES)
+    mark_finished("confidence-interval", num_samples, sample_size, population_mean, population_std, seed)
+    return _samples
+
+def simulate_with_previews(num_samples, sample_size, population_mean, population_std, confidence_level, seed):
+    """
+    Simulate the samples chunk by chunk, showing a thinned set of the intervals finished so far
+    as soon as the first chunk is drawn. The previews are drawn by the browser, so no image is
+    rendered until the full plot. The results are handed to the simulation cache.
+    """
+    def preview(sample_means, standard_errors):
+        shown = np.arange(0, sample_means.size, -(-sample_means.size // PREVIEW_INTERVALS))
+        means, lower_bounds, upper_bounds, _ = compute_confidence_interval(sample_means[shown], standard_errors[shown], confidence_level)
+        covers = (lower_bounds <= population_mean) & (population_mean <= upper_bounds)
+        title = f'{int(confidence_level*100)}% Confidence Intervals ({sample_means.size:,} of {num_samples:,} samples, {shown.size} shown)'
+        st.vega_lite_chart(spec=interval_spec(shown, lower_bounds, upper_bounds, means, covers, population_mean, title))
+
+    population = population_cache.get("normal", {"loc": population_mean, "scale": population_std})
+    chunks = iter_sample_means_and_errors(population, sample_size, num_samples, rng=seed, max_block_bytes=BLOCK_BYTES)
+    samples = collect_progressively(chunks, num_samples, preview)
+    simulate_samples(num_samples, sample_size, population_mean, population_std, seed, _samples=samples)
+
+def compute_coverage(sample_means, standard_errors, population_mean, confidence_levels):
+    """
+    Fraction of intervals containing the population mean, for every confidence level at once.
+    """
+    # An interval covers the mean when |mean - μ| / SE is within the critical value
+    distances = np.abs(sample_means - population_mean) / standard_errors
+    critical_values = normal_ppf((1 + np.asarray(confidence_levels)) / 2.)
+    return (distances[:, None] <= critical_values[None, :]).mean(axis=0)
+
+@cached_pyplot("coverage")
+def plot_coverage_curve(num_samples, sample_size, population_mean, population_std, confidence_level, seed):
+    """
+    Plot empirical against nominal coverage for confidence levels from 0.80 to 0.99,
+    reusing the sample means and standard errors already simulated.
+    """
+    sample_means, standard_errors = simulate_samples(num_samples, sample_size, population_mean, population_std, seed)
+    confidence_levels = np.round(np.arange(0.80, 0.995, 0.01), 2)
+    coverage = compute_coverage(sample_means, standard_errors, population_mean, confidence_levels)
+
+    figures = FigureSpec("coverage", figsize=(10, 6))
+    ax = figures.axes
+    figures.line("nominal", ax, confidence_levels, confidence_levels, color='black', linestyle='--', label='Nominal Coverage')
+    figures.line("empirical", ax, confidence_levels, coverage, marker='o', color='blue', label='Empirical Coverage')
+    figures.vline("selected", ax, confidence_level, color='gray', linestyle=':', label='Selected Confidence Level')
+    with figures.setup():
+        ax.set_title('Empirical vs Nominal Coverage', fontsize=16)
+        ax.set_xlabel('Nominal Confidence Level', fontsize=14)
+        ax.set_ylabel('Fraction of Intervals Containing the Population Mean', fontsize=14)
+        ax.legend()
+    figures.rescale()
+    return figures
+
+def confidence_intervals(num_samples, sample_size, population_mean, population_std, confidence_level, seed):
+    """
+    Every simulated interval and whether it contains the population mean, in one vectorized operation.
+    """
+    sample_means, standard_errors = simulate_samples(num_samples, sample_size, population_mean, population_std, seed)
+    sample_means, lower_bounds, upper_bounds, interval_widths = compute_confidence_interval(sample_means, standard_errors, confidence_level)
+    includes_population_mean = (lower_bounds <= population_mean) & (population_mean <= upper_bounds)
+    return sample_means, lower_bounds, upper_bounds, interval_widths, includes_population_mean
+
+@cached_pyplot("candlestick")
+def draw_candlestick_intervals(num_samples, sample_size, population_mean, population_std, confidence_level, x_axis_frequency, seed):
+    sample_means, lower_bounds, upper_bounds, _, includes_population_mean = confidence_intervals(
+        num_samples, sample_size, population_mean, population_std, confidence_level, seed)
     
-    # Plotting
-    fig, ax = plt.subplots(figsize=(14, 7))
+    # Plotting, redrawn on the render worker's reused figure
+    figures = FigureSpec("candlestick", figsize=(CANDLESTICK_WIDTH, 7))
+    figures.clear()
+    ax = figures.axes
     
     # Plot the population mean
     ax.axhline(y=population_mean, color='black', linestyle='--', label='Population Mean')
@@ -47,28 +122,67 @@ def plot_candlestick_intervals(num_samples, sample_size, population_mean, popula
     ax.set_xlabel('Sample Index', fontsize=14)
     ax.set_ylabel('Value', fontsize=14)
     
-    # Plot candlestick for each sample's mean and their confidence intervals
-    for i in range(num_samples):
-        color = 'green' if includes_population_mean[i] else 'red'
-        ax.plot([i, i], [lower_bounds[i], upper_bounds[i]], color=color)  # Vertical line for CI
-        ax.plot(i, sample_means[i], 'o', color=color)  # Sample mean
+    index = np.arange(num_samples)
+    max_columns = CANDLESTICK_WIDTH * PIXELS_PER_INCH
+    if num_samples <= max_columns:
+        # Plot all confidence intervals as one collection and all sample means as one scatter
+        colors = np.where(includes_population_mean, 'green', 'red')
+        ax.vlines(index, lower_bounds, upper_bounds, colors=colors)
+        ax.scatter(index, sample_means, c=colors, s=20, zorder=3)
+    else:
+        # More intervals than pixel columns: merge each column into min/max envelopes of its
+        # intervals and sample means. Intervals above and below the population mean are merged
+        # separately from those covering it, so no envelope of misses crosses the mean. Misses
+        # are drawn first, so they show where they reach beyond the covering intervals.
+        width = -(-num_samples // max_columns)
+        groups = (
+            (lower_bounds > population_mean, 'red'),
+            (upper_bounds < population_mean, 'red'),
+            (includes_population_mean, 'green'),
+        )
+        envelopes = []
+        for in_group, color in groups:
+            selected = index[in_group]
+            centers, low, high = interval_envelope(selected, lower_bounds[selected], upper_bounds[selected], width)
+            ax.vlines(centers, low, high, colors=color)
+            _, lowest_mean, highest_mean = interval_envelope(selected, sample_means[selected], sample_means[selected], width)
+            envelopes.append((np.repeat(centers, 2), np.column_stack([lowest_mean, highest_mean]).ravel(), color))
+        # Means of the misses go on top, as in the full plot where they stand out from the covering ones
+        for centers, means, color in reversed(envelopes):
+            ax.scatter(centers, means, c=color, s=20, zorder=3)
+    ax.autoscale_view()
 
     # Adjust x-axis labels
     ax.set_xticks(range(0, num_samples, x_axis_frequency))
     ax.set_xticklabels(range(1, num_samples + 1, x_axis_frequency))
     ax.legend()
-    st.pyplot(fig)
+    return figures
+
+def plot_candlestick_intervals(num_samples, sample_size, population_mean, population_std, confidence_level, x_axis_frequency, seed):
+    with st.empty():
+        # Large simulations show previews in this placeholder until the full plot replaces them
+        if not is_finished("confidence-interval", num_samples, sample_size, population_mean, population_std, seed) \
+                and not draw_candlestick_intervals.is_cached(num_samples, sample_size, population_mean, population_std,
+                                                             confidence_level, x_axis_frequency, seed):
+            simulate_with_previews(num_samples, sample_size, population_mean, population_std, confidence_level, seed)
+        draw_candlestick_intervals(num_samples, sample_size, population_mean, population_std, confidence_level, x_axis_frequency, seed)
 
     # Display the interval data
+    sample_means, lower_bounds, upper_bounds, interval_widths, includes_population_mean = confidence_intervals(
+        num_samples, sample_size, population_mean, population_std, confidence_level, seed)
     st.subheader("Confidence Intervals Details")
+    shown = slice(DETAIL_ROWS)
     interval_data = {
-        "Sample Index": list(range(1, num_samples + 1)),
-        "Sample Mean": sample_means,
-        "Lower Bound": lower_bounds,
-        "Upper Bound": upper_bounds,
-        "Interval Width": interval_widths,
-        "Includes Population Mean": includes_population_mean
+        "Sample Index": np.arange(1, min(num_samples, DETAIL_ROWS) + 1),
+        "Sample Mean": sample_means[shown],
+        "Lower Bound": lower_bounds[shown],
+        "Upper Bound": upper_bounds[shown],
+        "Interval Width": interval_widths[shown],
+        "Includes Population Mean": includes_population_mean[shown]
     }
+    if num_samples > DETAIL_ROWS:
+        st.caption(f"First {DETAIL_ROWS:,} of {num_samples:,} samples; "
+                   f"{includes_population_mean.mean():.1%} of all intervals include the population mean.")
     st.dataframe(interval_data)
 
 # Streamlit UI
@@ -94,15 +208,28 @@ st.write("""
 st.header("Simulation: Confidence Intervals for Sample Means")
 
 # Input widgets for various parameters
+seed_control()
 sample_size = st.slider("Sample Size (n)", min_value=1, max_value=500, value=30)
 population_mean = st.number_input("Population Mean", value=0.0)
 population_std = st.number_input("Population Standard Deviation", value=1.0, min_value=0.1)
-num_samples = st.slider("Number of Simulations", min_value=1, max_value=1000, value=100)
+num_samples = st.slider("Number of Simulations", min_value=1, max_value=100000, value=100)
 confidence_level = st.slider("Confidence Level", min_value=0.80, max_value=0.99, value=0.95, step=0.01)
-x_axis_frequency = st.slider("X-axis Label Frequency", min_value=1, max_value=num_samples, value=10)
+# At most MAX_X_LABELS labels, however many samples there are (sliders need a range, even for one sample)
+min_x_axis_frequency = -(-num_samples // MAX_X_LABELS)
+x_axis_frequency = st.slider("X-axis Label Frequency", min_value=min_x_axis_frequency, max_value=max(num_samples, 2),
+                             value=min(max(10, num_samples // 10, min_x_axis_frequency), num_samples))
 
 # Generate and plot the graphs
-plot_candlestick_intervals(num_samples, sample_size, population_mean, population_std, confidence_level, x_axis_frequency)
+seed = stream_seed("confidence-interval")
+plot_candlestick_intervals(num_samples, sample_size, population_mean, population_std, confidence_level, x_axis_frequency, seed)
+
+st.subheader("Coverage Across Confidence Levels")
+st.write("""
+Only the critical value depends on the confidence level, so the same simulated samples can be checked against 
+every level from 80% to 99% at once. Points close to the dashed line mean the intervals cover the population mean 
+as often as promised. With small sample sizes, z-intervals built from the sample standard deviation fall short.
+""")
+plot_coverage_curve(num_samples, sample_size, population_mean, population_std, confidence_level, seed)
 
 st.write("""
 ### Key Insights:
@@ -1,7 +1,9 @@
 import numpy as np
 import streamlit as st
-from scipy import stats
-import matplotlib.pyplot as plt
+
+from utils.figures import FigureSpec
+from utils.kernels import normal_ppf
+from utils.render_cache import cached_pyplot
 
 # Function to calculate the confidence interval
 def compute_confidence_interval(sample_mean, sample_size, population_std, confidence_level):
@@ -13,7 +15,7 @@ def compute_confidence_interval(sample_mean, sample_size, population_std, confid
         return None, None, None
     
     sem = population_std / np.sqrt(sample_size)  # Standard error of the mean
-    z_score = stats.norm.ppf((1 + confidence_level) / 2.)
+    z_score = normal_ppf((1 + confidence_level) / 2.)
     margin_of_error = sem * z_score
     
     lower_limit = sample_mean - margin_of_error
@@ -21,6 +23,48 @@ def compute_confidence_interval(sample_mean, sample_size, population_std, confid
     
     return margin_of_error, lower_limit, upper_limit
 
+@cached_pyplot("factors_ci")
+def plot_confidence_interval(sample_mean, margin_of_error, lower_limit, upper_limit, num_bins):
+    """
+    Plot the interval around the sample mean, with y-axis limits padded by num_bins.
+    """
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its artists
+    figures = FigureSpec("factors_ci", figsize=(12, 6))
+    ax = figures.axes
+
+    # Plot margin of error line
+    figures.line("margin", ax, [1, 1], [lower_limit, upper_limit], color='red', linestyle='--', linewidth=2, label='Margin of Error')
+
+    # Plot sample mean
+    figures.line("mean", ax, [1], [sample_mean], marker='o', linestyle='', color='black', label='Sample Mean', markersize=10)
+
+    # Plot bars for lower and upper limits
+    figures.bars("lower", ax, [0.8], [lower_limit], width=0.4, color='lightblue', label='Lower Limit')
+    figures.bars("upper", ax, [1.2], [upper_limit], width=0.4, color='lightgreen', label='Upper Limit')
+
+    with figures.setup():
+        # Adding labels and title
+        ax.set_title("Confidence Interval")
+        ax.set_xlabel("Sample")
+        ax.set_ylabel("Value")
+        ax.set_xticks([0.8, 1.2])
+        ax.set_xticklabels(["Lower Limit", "Upper Limit"])
+
+        # Display legend
+        ax.legend()
+
+    # Adjust y-axis limits based on number of bins
+    y_min = min(lower_limit, sample_mean) - abs(margin_of_error) * 0.5
+    y_max = max(upper_limit, sample_mean) + abs(margin_of_error) * 0.5
+    y_range = y_max - y_min
+    bin_width = y_range / num_bins
+    ax.set_ylim(y_min - bin_width, y_max + bin_width)
+
+    # Show grid lines for better readability
+    # ax.grid(False, linestyle='--', alpha=0.7)
+
+    return figures
+
 # Streamlit UI
 st.title("Factors Affecting Confidence Interval")
 
@@ -51,42 +95,14 @@ with col2:
         # Plot the data
         st.subheader("Confidence Interval Visualization")
 
-        fig, ax = plt.subplots(figsize=(12, 6))
-
-        # Plot margin of error line
-        ax.plot([1, 1], [lower_limit, upper_limit], color='red', linestyle='--', linewidth=2, label='Margin of Error')
-
-        # Plot sample mean
-        ax.plot(1, sample_mean, 'o', color='black', label='Sample Mean', markersize=10)
-
-        # Plot bars for lower and upper limits
-        ax.bar(0.8, lower_limit, width=0.4, color='lightblue', label='Lower Limit')
-        ax.bar(1.2, upper_limit, width=0.4, color='lightgreen', label='Upper Limit')
-
-        # Adding labels and title
-        ax.set_title("Confidence Interval")
-        ax.set_xlabel("Sample")
-        ax.set_ylabel("Value")
-        ax.set_xticks([0.8, 1.2])
-        ax.set_xticklabels(["Lower Limit", "Upper Limit"])
-
-        # Display legend
-        ax.legend()
+        # The plot goes above the slider that sets its y-axis limits
+        plot_container = st.container()
 
         # Slider for number of bins (used for adjusting y-axis limits)
         num_bins = st.slider("Number of Y-Axis Bins", min_value=1, max_value=20, value=5)
-        
-        # Adjust y-axis limits based on number of bins
-        y_min = min(lower_limit, sample_mean) - abs(margin_of_error) * 0.5
-        y_max = max(upper_limit, sample_mean) + abs(margin_of_error) * 0.5
-        y_range = y_max - y_min
-        bin_width = y_range / num_bins
-        ax.set_ylim(y_min - bin_width, y_max + bin_width)
-
-        # Show grid lines for better readability
-        # ax.grid(False, linestyle='--', alpha=0.7)
-
-        st.pyplot(fig)
+
+        with plot_container:
+            plot_confidence_interval(sample_mean, margin_of_error, lower_limit, upper_limit, num_bins)
 
         st.write("""
         **Key Points:**
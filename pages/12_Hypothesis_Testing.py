@@ -1,7 +1,10 @@
 import streamlit as st
-import numpy as np
 import scipy.stats as stats
 
+from utils.datasets import dataset_uploader, numbers_input
+from utils.hypothesis import ttest_1samp_from_stats, ztest_1samp
+from utils.moments import Moments
+
 # Title and Introduction
 st.title("🔍 Hypothesis Testing")
 
@@ -51,20 +54,20 @@ if test_type in ["Z-Test", "T-Test"]:
 
 # Chi-Square Test parameters
 if test_type == "Chi-Square Test":
-    observed_values = st.text_input("Observed Values (comma-separated)", "10, 20, 30, 40")
-    expected_values = st.text_input("Expected Values (comma-separated)", "25, 25, 25, 25")
+    columns = dataset_uploader()
+    observed_values = numbers_input("Observed Values", "10, 20, 30, 40", columns, index=0)
+    expected_values = numbers_input("Expected Values", "25, 25, 25, 25", columns, index=1)
     alpha = st.slider("Significance Level (α)", min_value=0.01, max_value=0.10, value=0.05, step=0.01)
 
 st.subheader("Results")
 if test_type == "Z-Test" or test_type == "T-Test":
-    # Calculate the test statistic
+    # Calculate the test statistic from the summary statistics alone
     if test_type == "Z-Test":
-        z_score = (sample_mean - population_mean) / (sample_std / np.sqrt(sample_size))
-        p_value = 2 * (1 - stats.norm.cdf(np.abs(z_score)))
+        statistic, p_value, _ = ztest_1samp(Moments.from_summary(sample_size, sample_mean), population_mean, sample_std)
     else:
-        t_stat, p_value = stats.ttest_1samp([sample_mean] * sample_size, population_mean)
+        statistic, p_value, _ = ttest_1samp_from_stats(sample_mean, sample_std, sample_size, population_mean)
 
-    st.write(f"**Test Statistic:** {z_score:.4f}")
+    st.write(f"**Test Statistic:** {statistic:.4f}")
     st.write(f"**P-Value:** {p_value:.4f}")
 
     # Conclusion
@@ -73,11 +76,7 @@ if test_type == "Z-Test" or test_type == "T-Test":
     else:
         st.error(f"Fail to reject the null hypothesis. (p-value >= {alpha})")
 
-elif test_type == "Chi-Square Test":
-    # Process observed and expected values
-    observed_values = list(map(float, observed_values.split(',')))
-    expected_values = list(map(float, expected_values.split(',')))
-    
+elif test_type == "Chi-Square Test" and observed_values is not None and expected_values is not None:
     chi2_stat, p_value = stats.chisquare(observed_values, expected_values)
 
     st.write(f"**Chi-Square Statistic:** {chi2_stat:.4f}")
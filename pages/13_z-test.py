@@ -1,42 +1,49 @@
 import streamlit as st
 import numpy as np
-from scipy import stats
-import matplotlib.pyplot as plt
 
-def plot_z_test_results_p_value(z_statistic, p_value, alpha, test_type, tail_type):
-    # Plot the Z-Test results
-    fig, ax = plt.subplots(figsize=(10, 6))
+from utils.figures import FigureSpec
+from utils.hypothesis import ztest_1samp, ztest_ind
+from utils.kernels import normal_pdf, normal_ppf, normal_sf
+from utils.moments import Moments
+from utils.render_cache import cached_pyplot
+
+@cached_pyplot("z_test")
+def draw_z_test(z_statistic, alpha, test_type, tail_type):
+    # Plot the Z-Test results, redrawn on the render worker's reused figure
+    figures = FigureSpec("z_test", figsize=(10, 6))
+    figures.clear()
+    ax = figures.axes
     
     x = np.linspace(-4, 4, 1000)
-    y = stats.norm.pdf(x)
+    y = normal_pdf(x)
     
     ax.plot(x, y, label='Standard Normal Distribution', color='blue')
     ax.axvline(z_statistic, color='red', linestyle='--', label='Z-Statistic')
     
-    critical_value = stats.norm.ppf(1 - alpha / 2) if tail_type == 'Two-Tailed' else stats.norm.ppf(1 - alpha)
+    critical_value = normal_ppf(1 - alpha / 2) if tail_type == 'Two-Tailed' else normal_ppf(1 - alpha)
 
     if test_type == 'One-Sample Z-Test':
         if tail_type == 'One-Tailed':
             if z_statistic < 0:
                 alpha_region = np.linspace(-4, z_statistic, 1000)
-                ax.fill_between(alpha_region, stats.norm.pdf(alpha_region), color='gray', alpha=0.3, label='Alpha Region')
+                ax.fill_between(alpha_region, normal_pdf(alpha_region), color='gray', alpha=0.3, label='Alpha Region')
             else:
                 alpha_region = np.linspace(z_statistic, 4, 1000)
-                ax.fill_between(alpha_region, stats.norm.pdf(alpha_region), color='gray', alpha=0.3, label='Alpha Region')
+                ax.fill_between(alpha_region, normal_pdf(alpha_region), color='gray', alpha=0.3, label='Alpha Region')
         elif tail_type == 'Two-Tailed':
             alpha_region_left = np.linspace(-4, -critical_value, 1000)
-            ax.fill_between(alpha_region_left, stats.norm.pdf(alpha_region_left), color='gray', alpha=0.3, label='Alpha Region')
+            ax.fill_between(alpha_region_left, normal_pdf(alpha_region_left), color='gray', alpha=0.3, label='Alpha Region')
 
             alpha_region_right = np.linspace(critical_value, 4, 1000)
-            ax.fill_between(alpha_region_right, stats.norm.pdf(alpha_region_right), color='gray', alpha=0.3)
+            ax.fill_between(alpha_region_right, normal_pdf(alpha_region_right), color='gray', alpha=0.3)
 
     elif test_type == 'Two-Sample Z-Test':
         if tail_type == 'Two-Tailed':
             alpha_region_left = np.linspace(-4, -critical_value, 1000)
-            ax.fill_between(alpha_region_left, stats.norm.pdf(alpha_region_left), color='gray', alpha=0.3, label='Alpha Region')
+            ax.fill_between(alpha_region_left, normal_pdf(alpha_region_left), color='gray', alpha=0.3, label='Alpha Region')
 
             alpha_region_right = np.linspace(critical_value, 4, 1000)
-            ax.fill_between(alpha_region_right, stats.norm.pdf(alpha_region_right), color='gray', alpha=0.3)
+            ax.fill_between(alpha_region_right, normal_pdf(alpha_region_right), color='gray', alpha=0.3)
         
         # Highlight the p-value area
         if z_statistic < -critical_value or z_statistic > critical_value:
@@ -46,6 +53,13 @@ def plot_z_test_results_p_value(z_statistic, p_value, alpha, test_type, tail_typ
             p_value_area = np.abs(x) <= np.abs(z_statistic)
             ax.fill_between(x, y, 0, where=p_value_area, color='red', alpha=0.3, label='P-Value Area')
 
+    ax.set_title('Z-Test Visualization (P-Value Approach)')
+    ax.set_xlabel('Z-Score')
+    ax.set_ylabel('Probability Density')
+    ax.legend()
+    return figures
+
+def plot_z_test_results_p_value(z_statistic, p_value, alpha, test_type, tail_type):
     # Highlight whether the p-value is greater or lesser than alpha
     if p_value < alpha:
         st.write(f"The p-value ({p_value:.4f}) is less than the significance level (alpha = {alpha:.2f}).")
@@ -54,11 +68,7 @@ def plot_z_test_results_p_value(z_statistic, p_value, alpha, test_type, tail_typ
         st.write(f"The p-value ({p_value:.4f}) is greater than the significance level (alpha = {alpha:.2f}).")
         st.write("The p-value area is outside the alpha region. **Fail to reject the null hypothesis**.")
     
-    ax.set_title('Z-Test Visualization (P-Value Approach)')
-    ax.set_xlabel('Z-Score')
-    ax.set_ylabel('Probability Density')
-    ax.legend()
-    st.pyplot(fig)
+    draw_z_test(z_statistic, alpha, test_type, tail_type)
 
 # Create tabs for the Z-Test
 tabs = st.tabs(["Introduction & Assumptions", "One-Sample Z-Test", "Two-Sample Z-Test", "Interactive Z-Test"])
@@ -161,7 +171,7 @@ with tabs[1]:
     sample_size = 50
 
     z_statistic = (sample_mean - population_mean) / (population_std_dev / np.sqrt(sample_size))
-    p_value = 2 * (1 - stats.norm.cdf(np.abs(z_statistic)))
+    p_value = 2 * normal_sf(np.abs(z_statistic))
 
     # Display results
     st.subheader("Results")
@@ -246,7 +256,7 @@ with tabs[2]:
     size_2 = 30
 
     z_statistic = (sample_mean_1 - sample_mean_2) / np.sqrt((std_dev_1**2 / size_1) + (std_dev_2**2 / size_2))
-    p_value = 2 * (1 - stats.norm.cdf(np.abs(z_statistic)))
+    p_value = 2 * normal_sf(np.abs(z_statistic))
 
     # Display results
     st.subheader("Results")
@@ -274,8 +284,8 @@ with tabs[3]:
     alpha_input = st.number_input("Enter Significance Level (alpha):", value=0.05, format="%.2f")
     
     if st.button("Calculate One-Sample Z-Test"):
-        z_statistic = (sample_mean_input - population_mean_input) / (population_std_dev_input / np.sqrt(sample_size_input))
-        p_value = 2 * (1 - stats.norm.cdf(np.abs(z_statistic)))
+        sample = Moments.from_summary(sample_size_input, sample_mean_input)
+        z_statistic, p_value, _ = ztest_1samp(sample, population_mean_input, population_std_dev_input)
         
         st.write(f"Z-Statistic: {z_statistic:.4f}")
         st.write(f"P-Value: {p_value:.4f}")
@@ -291,8 +301,9 @@ with tabs[3]:
     size2_input = st.number_input("Enter Sample Size 2:", value=30)
     
     if st.button("Calculate Two-Sample Z-Test"):
-        z_statistic = (sample_mean1_input - sample_mean2_input) / np.sqrt((std_dev1_input**2 / size1_input) + (std_dev2_input**2 / size2_input))
-        p_value = 2 * (1 - stats.norm.cdf(np.abs(z_statistic)))
+        sample1 = Moments.from_summary(size1_input, sample_mean1_input)
+        sample2 = Moments.from_summary(size2_input, sample_mean2_input)
+        z_statistic, p_value, _ = ztest_ind(sample1, sample2, std_dev1_input, std_dev2_input)
         
         st.write(f"Z-Statistic: {z_statistic:.4f}")
         st.write(f"P-Value: {p_value:.4f}")
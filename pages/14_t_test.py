@@ -2,6 +2,10 @@ import streamlit as st
 import numpy as np
 from scipy import stats
 
+from utils.datasets import dataset_uploader, numbers_input
+from utils.hypothesis import ttest_1samp_from_stats, ttest_ind, ttest_ind_from_stats, ttest_rel
+from utils.moments import Moments, array_chunks, paired_differences
+
 # Define tabs
 tabs = st.tabs(["Introduction & Assumptions", "One-Sample t-Test", "Paired Sample t-Test", "Independent Two-Sample t-Test", "Interactive t-Test"])
 
@@ -291,9 +295,7 @@ with tabs[4]:
     sample_std_dev = st.number_input("Sample Standard Deviation", value=1.0)
 
     if st.button("Calculate One-Sample t-Test"):
-        t_statistic = (sample_mean - population_mean) / (sample_std_dev / np.sqrt(sample_size))
-        df = sample_size - 1
-        p_value = 2 * (1 - stats.t.cdf(np.abs(t_statistic), df=df))
+        t_statistic, p_value, _ = ttest_1samp_from_stats(sample_mean, sample_std_dev, sample_size, population_mean)
 
         st.write(f"t-Statistic: {t_statistic:.4f}")
         st.write(f"P-Value: {p_value:.4f}")
@@ -305,31 +307,39 @@ with tabs[4]:
 
     # Paired Sample t-Test
     st.subheader("Paired Sample t-Test")
-    data_before = st.text_input("Data Before (comma-separated)", "23, 21, 18, 25, 30, 27, 26, 22, 24, 19")
-    data_after = st.text_input("Data After (comma-separated)", "25, 23, 20, 27, 32, 29, 28, 24, 26, 21")
-
-    if st.button("Calculate Paired t-Test"):
-        data_before = list(map(float, data_before.split(',')))
-        data_after = list(map(float, data_after.split(',')))
-        t_statistic_paired, p_value_paired = stats.ttest_rel(data_before, data_after)
+    paired_columns = dataset_uploader(key="paired_upload")
+    data_before = numbers_input("Data Before", "23, 21, 18, 25, 30, 27, 26, 22, 24, 19", paired_columns, index=0)
+    data_after = numbers_input("Data After", "25, 23, 20, 27, 32, 29, 28, 24, 26, 21", paired_columns, index=1)
+
+    if st.button("Calculate Paired t-Test") and data_before is not None and data_after is not None:
+        try:
+            # The values are read in chunks into running moments, so no test rescans them
+            differences = Moments.from_chunks(paired_differences(array_chunks(data_before), array_chunks(data_after)))
+        except ValueError as error:
+            st.error(str(error))
+        else:
+            t_statistic_paired, p_value_paired, _ = ttest_rel(differences)
 
-        st.write(f"t-Statistic: {t_statistic_paired:.4f}")
-        st.write(f"P-Value: {p_value_paired:.4f}")
+            st.write(f"t-Statistic: {t_statistic_paired:.4f}")
+            st.write(f"P-Value: {p_value_paired:.4f}")
 
-        if p_value_paired < 0.05:
-            st.write("The result is statistically significant. Reject the null hypothesis.")
-        else:
-            st.write("The result is not statistically significant. Fail to reject the null hypothesis.")
+            if p_value_paired < 0.05:
+                st.write("The result is statistically significant. Reject the null hypothesis.")
+            else:
+                st.write("The result is not statistically significant. Fail to reject the null hypothesis.")
 
     # Independent Two-Sample t-Test
     st.subheader("Independent Two-Sample t-Test")
-    group1 = st.text_input("Group 1 Data (comma-separated)", "24, 28, 30, 25, 27, 32, 29, 31, 26, 30")
-    group2 = st.text_input("Group 2 Data (comma-separated)", "22, 20, 23, 24, 21, 19, 18, 20, 22, 21")
+    independent_columns = dataset_uploader(key="independent_upload")
+    group1 = numbers_input("Group 1 Data", "24, 28, 30, 25, 27, 32, 29, 31, 26, 30", independent_columns, index=0)
+    group2 = numbers_input("Group 2 Data", "22, 20, 23, 24, 21, 19, 18, 20, 22, 21", independent_columns, index=1)
 
-    if st.button("Calculate Independent Two-Sample t-Test"):
-        group1 = list(map(float, group1.split(',')))
-        group2 = list(map(float, group2.split(',')))
-        t_statistic_indep, p_value_indep = stats.ttest_ind(group1, group2, equal_var=True)
+    equal_var = st.checkbox("Assume equal variances (pooled); otherwise Welch's t-test", value=True)
+
+    if st.button("Calculate Independent Two-Sample t-Test") and group1 is not None and group2 is not None:
+        group1 = Moments.from_chunks(array_chunks(group1))
+        group2 = Moments.from_chunks(array_chunks(group2))
+        t_statistic_indep, p_value_indep, _ = ttest_ind(group1, group2, equal_var=equal_var)
 
         st.write(f"t-Statistic: {t_statistic_indep:.4f}")
         st.write(f"P-Value: {p_value_indep:.4f}")
@@ -338,3 +348,31 @@ with tabs[4]:
             st.write("The result is statistically significant. Reject the null hypothesis.")
         else:
             st.write("The result is not statistically significant. Fail to reject the null hypothesis.")
+
+    # Two-Sample t-Test from Summary Statistics
+    st.subheader("Two-Sample t-Test from Summary Statistics")
+    col1, col2 = st.columns(2)
+    with col1:
+        summary_mean1 = st.number_input("Group 1 Mean", value=28.2)
+        summary_std1 = st.number_input("Group 1 Standard Deviation", value=2.6)
+        summary_size1 = st.number_input("Group 1 Size", min_value=2, value=10)
+    with col2:
+        summary_mean2 = st.number_input("Group 2 Mean", value=21.0)
+        summary_std2 = st.number_input("Group 2 Standard Deviation", value=1.8)
+        summary_size2 = st.number_input("Group 2 Size", min_value=2, value=10)
+    summary_equal_var = st.checkbox("Assume equal variances (pooled); otherwise Welch's t-test", value=True,
+                                    key="summary_equal_var")
+
+    if st.button("Calculate Two-Sample t-Test from Summary Statistics"):
+        t_statistic_summary, p_value_summary, df_summary = ttest_ind_from_stats(
+            summary_mean1, summary_std1, summary_size1, summary_mean2, summary_std2, summary_size2,
+            equal_var=summary_equal_var)
+
+        st.write(f"t-Statistic: {t_statistic_summary:.4f}")
+        st.write(f"Degrees of Freedom: {df_summary:.2f}")
+        st.write(f"P-Value: {p_value_summary:.4f}")
+
+        if p_value_summary < 0.05:
+            st.write("The result is statistically significant. Reject the null hypothesis.")
+        else:
+            st.write("The result is not statistically significant. Fail to reject the null hypothesis.")
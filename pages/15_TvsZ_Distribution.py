@@ -1,8 +1,12 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import t, norm
+import pandas as pd
+
+from utils.client_charts import curve_family_frame, sweep_chart_spec, sweep_data
+from utils.distributions import evaluate
+from utils.figures import FigureSpec
+from utils.render_cache import cached_pyplot
+from utils.tables import load_table, tabulated
 
 # Page title and introduction
 st.title('Comparison of T-distribution and Z-distribution 📈')
@@ -25,6 +29,7 @@ degrees_of_freedom = st.sidebar.slider(
 )
 
 # Function to plot T-distribution and Z-distribution
+@cached_pyplot("t_vs_z")
 def plot_distributions(df):
     """
     Plot the T-distribution for a given degrees of freedom (df) and Z-distribution.
@@ -32,32 +37,64 @@ def plot_distributions(df):
     x = np.linspace(-4, 4, 1000)
     
     # Z-distribution (Standard Normal Distribution)
-    z_pdf = norm.pdf(x, 0, 1)
+    z_pdf = evaluate("normal", "pdf", x, mu=0, sigma=1)
     
     # T-distribution with selected degrees of freedom
-    t_pdf = t.pdf(x, df)
+    t_pdf = tabulated("t", "pdf", x, df=df)
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its lines
+    figures = FigureSpec("t_vs_z", figsize=(10, 6))
+    ax = figures.axes
 
     # Plot Z-distribution
-    sns.lineplot(x=x, y=z_pdf, ax=ax, label="Z-distribution", color="blue", linewidth=2)
+    figures.line("z", ax, x, z_pdf, label="Z-distribution", color="blue", linewidth=2)
 
     # Plot T-distribution
-    sns.lineplot(x=x, y=t_pdf, ax=ax, label=f"T-distribution (df={df})", color="red", linewidth=2)
+    figures.line("t", ax, x, t_pdf, label=f"T-distribution (df={df})", color="red", linewidth=2)
 
-    ax.set_title('Comparison of T-distribution and Z-distribution')
-    ax.set_xlabel('X values')
-    ax.set_ylabel('Probability Density Function (PDF)')
-    ax.grid(True)
+    with figures.setup():
+        ax.set_title('Comparison of T-distribution and Z-distribution')
+        ax.set_xlabel('X values')
+        ax.set_ylabel('Probability Density Function (PDF)')
+        ax.grid(True)
     ax.legend()
+    figures.rescale()
+
+    return figures
 
-    st.pyplot(fig)
+@st.cache_data
+def t_family_payload():
+    """
+    Every T-distribution curve (df 1..100) plus the Z curve, every 5th point of the precomputed table.
+    """
+    x = np.linspace(-4, 4, 1000)[::5]
+    t_table = load_table("t", "pdf")
+    t_pdf = t_table[:, ::5] if t_table is not None else evaluate("t", "pdf", x, df=np.arange(1, 101)[:, None])
+    family = curve_family_frame(x, t_pdf, {"df": np.arange(1, 101)})
+    z_curve = pd.DataFrame({"x": x, "y": evaluate("normal", "pdf", x, mu=0, sigma=1)})
+    return sweep_data(family, "T-distribution", z_curve, "Z-distribution")
 
 # Streamlit app content
 st.header('Interactive Comparison')
 
-# Plot both distributions based on the selected degrees of freedom
-plot_distributions(degrees_of_freedom)
+client_side = st.toggle(
+    "Explore in the browser",
+    help="Sends all 100 curves once and moves through the degrees of freedom in your browser, without rerunning the page."
+)
+
+if client_side:
+    spec = sweep_chart_spec(
+        {"df": {"min": 1, "max": 100, "step": 1, "value": degrees_of_freedom, "label": "Degrees of Freedom (df)"}},
+        x_title='X values',
+        y_title='Probability Density Function (PDF)',
+        family_label="T-distribution",
+        static_label="Z-distribution",
+        title='Comparison of T-distribution and Z-distribution'
+    )
+    st.vega_lite_chart(t_family_payload(), spec)
+else:
+    # Plot both distributions based on the selected degrees of freedom
+    plot_distributions(degrees_of_freedom)
 
 # Additional Information
 st.header('Key Differences between T-distribution and Z-distribution')
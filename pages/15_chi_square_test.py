@@ -1,10 +1,59 @@
 import streamlit as st
 import numpy as np
+import pandas as pd
 from scipy import stats
-import matplotlib.pyplot as plt
+
+from utils.contingency import analyze_2x2
+from utils.datasets import dataset_uploader, numbers_input, parse_numbers
+from utils.figures import FigureSpec
+from utils.hypothesis import benjamini_hochberg, holm
+from utils.kernels import chi2_isf
+from utils.render_cache import cached_pyplot
+from utils.rng import seed_control, stream_seed
+
+# Rows of the batch results shown
+SHOWN_TABLES = 100
+
+# Names of the tests of utils.contingency.TableTests, in its order
+TABLE_TEST_NAMES = ["Chi-Square", "Chi-Square (Yates)", "G-Test", "Fisher's Exact"]
+
+@st.cache_data(show_spinner="Simulating and testing tables...", max_entries=8)
+def simulate_tables(tables, users, base_rate, lift_fraction, lift, seed):
+    """
+    One 2x2 table (conversions and non-conversions of arms A and B) per simulated A/B test.
+
+    Arm B converts at base_rate * (1 + lift) in the first lift_fraction of the tests.
+    """
+    rng = np.random.Generator(np.random.PCG64(seed))
+    has_lift = np.arange(tables) < int(round(lift_fraction * tables))
+    rate_b = np.where(has_lift, min(1.0, base_rate * (1 + lift)), base_rate)
+    conversions = np.stack([rng.binomial(users, base_rate, tables), rng.binomial(users, rate_b)], axis=1)
+    return np.stack([conversions, users - conversions], axis=2), has_lift
+
+@st.cache_data(show_spinner="Testing tables...", max_entries=8)
+def cached_analyze_2x2(tables):
+    # p-values of every test, kept across reruns (e.g. changing α)
+    return np.stack([result.pvalue for result in analyze_2x2(tables)])
+
+@cached_pyplot("chi_square_frequencies")
+def plot_observed_vs_expected(observed, expected, x_label):
+    # Grouped bars, redrawn on the render worker's reused figure
+    figures = FigureSpec("chi_square_frequencies")
+    figures.clear()
+    ax = figures.axes
+    indices = np.arange(len(observed))
+    
+    ax.bar(indices - 0.2, observed, 0.4, label="Observed")
+    ax.bar(indices + 0.2, expected, 0.4, label="Expected")
+    
+    ax.set_xlabel(x_label)
+    ax.set_ylabel("Frequencies")
+    ax.set_title("Observed vs Expected Frequencies")
+    ax.legend()
+    return figures
 
 # Create tabs for different sections
-tabs = st.tabs(["Introduction & Assumptions", "Chi-Square Test of Independence", "Chi-Square Goodness of Fit", "Interactive Chi-Square Test"])
+tabs = st.tabs(["Introduction & Assumptions", "Chi-Square Test of Independence", "Chi-Square Goodness of Fit", "Interactive Chi-Square Test", "Batch 2×2 Tables"])
 
 with tabs[0]:
     # Introduction
@@ -194,25 +243,36 @@ with tabs[3]:
     if test_type == "Chi-Square Test of Independence":
         # User input for the Chi-Square Test of Independence
         st.header("Enter your observed frequencies:")
-        rows = st.number_input("Number of rows:", min_value=2, max_value=10, value=2)
-        cols = st.number_input("Number of columns:", min_value=2, max_value=10, value=2)
+        table_columns = dataset_uploader("Or upload a contingency table (CSV, Parquet, Arrow or .npy)",
+                                         key="independence_upload")
 
-        # Input observed data
         data = []
-        for i in range(rows):
-            row = st.text_input(f"Enter observed frequencies for row {i + 1} (comma-separated):", "")
-            if row:
-                try:
-                    row_data = list(map(float, row.split(',')))
-                    if len(row_data) == cols:
-                        data.append(row_data)
-                    else:
-                        st.error(f"Row {i + 1} does not have {cols} values.")
-                except ValueError:
-                    st.error(f"Invalid input in row {i + 1}. Ensure all entries are numbers.")
-                    
+        if table_columns:
+            # Each numeric column of the file is a column of the table
+            names = st.multiselect("Columns of the contingency table:", list(table_columns), default=list(table_columns))
+            rows = cols = None
+            if len(names) >= 2:
+                data = np.column_stack([table_columns[name] for name in names])
+                rows, cols = data.shape
+        else:
+            rows = st.number_input("Number of rows:", min_value=2, max_value=10, value=2)
+            cols = st.number_input("Number of columns:", min_value=2, max_value=10, value=2)
+
+            # Input observed data
+            for i in range(rows):
+                row = st.text_input(f"Enter observed frequencies for row {i + 1} (comma-separated):", "")
+                if row:
+                    try:
+                        row_data = parse_numbers(row)
+                        if len(row_data) == cols:
+                            data.append(row_data)
+                        else:
+                            st.error(f"Row {i + 1} does not have {cols} values.")
+                    except ValueError:
+                        st.error(f"Invalid input in row {i + 1}. Ensure all entries are numbers.")
+
         if len(data) == rows and all(len(row) == cols for row in data):
-            observed = np.array(data)
+            observed = np.asarray(data, dtype=np.float64)
             
             # Calculate expected values using row and column totals
             row_totals = np.sum(observed, axis=1, keepdims=True)
@@ -230,7 +290,7 @@ with tabs[3]:
             
             # Perform Chi-Square test
             chi2_statistic, p_value, _, _ = stats.chi2_contingency(observed)
-            critical_value = stats.chi2.ppf(1 - alpha, (rows - 1) * (cols - 1))
+            critical_value = chi2_isf(alpha, (rows - 1) * (cols - 1))
 
             # Display results
             st.subheader("Results")
@@ -246,40 +306,29 @@ with tabs[3]:
 
             # Option to visualize observed vs expected
             if st.checkbox("Visualize Observed vs Expected Frequencies"):
-                fig, ax = plt.subplots()
-                indices = np.arange(rows * cols)
-                observed_flat = observed.flatten()
-                expected_flat = expected.flatten()
-                
-                ax.bar(indices - 0.2, observed_flat, 0.4, label="Observed")
-                ax.bar(indices + 0.2, expected_flat, 0.4, label="Expected")
-                
-                ax.set_xlabel("Cells")
-                ax.set_ylabel("Frequencies")
-                ax.set_title("Observed vs Expected Frequencies")
-                ax.legend()
-                
-                st.pyplot(fig)
+                plot_observed_vs_expected(observed.flatten(), expected.flatten(), "Cells")
 
     elif test_type == "Chi-Square Goodness of Fit":
         # User input for the Chi-Square Goodness of Fit Test
         st.header("Enter your observed and expected frequencies:")
-        categories = st.number_input("Number of categories:", min_value=2, max_value=10, value=3)
-
-        observed = st.text_input("Enter observed frequencies (comma-separated):", "")
-        expected = st.text_input("Enter expected frequencies (comma-separated):", "")
+        frequency_columns = dataset_uploader(key="goodness_of_fit_upload")
+        if frequency_columns:
+            observed_data = numbers_input("Observed frequencies", "", frequency_columns, index=0)
+            expected_data = numbers_input("Expected frequencies", "", frequency_columns, index=1)
+            categories = len(observed_data)
+        else:
+            categories = st.number_input("Number of categories:", min_value=2, max_value=10, value=3)
+            observed_data = numbers_input("Enter observed frequencies", "")
+            expected_data = numbers_input("Enter expected frequencies", "")
         
-        if observed and expected:
+        if observed_data is not None and expected_data is not None and observed_data.size and expected_data.size:
             try:
-                observed_data = np.array(list(map(float, observed.split(','))))
-                expected_data = np.array(list(map(float, expected.split(','))))
-                
                 if len(observed_data) != categories or len(expected_data) != categories:
                     st.error(f"Both observed and expected frequencies must have {categories} values.")
                 else:
                     # Perform Chi-Square Goodness of Fit test
                     chi2_statistic, p_value = stats.chisquare(observed_data, f_exp=expected_data)
-                    critical_value = stats.chi2.ppf(1 - alpha, categories - 1)
+                    critical_value = chi2_isf(alpha, categories - 1)
 
                     # Display results
                     st.subheader("Results")
@@ -295,18 +344,79 @@ with tabs[3]:
 
                     # Option to visualize observed vs expected
                     if st.checkbox("Visualize Observed vs Expected Frequencies"):
-                        fig, ax = plt.subplots()
-                        indices = np.arange(categories)
-                        
-                        ax.bar(indices - 0.2, observed_data, 0.4, label="Observed")
-                        ax.bar(indices + 0.2, expected_data, 0.4, label="Expected")
-                        
-                        ax.set_xlabel("Categories")
-                        ax.set_ylabel("Frequencies")
-                        ax.set_title("Observed vs Expected Frequencies")
-                        ax.legend()
-                        
-                        st.pyplot(fig)
-
-            except ValueError:
-                st.error("Invalid input. Ensure all entries are numbers.")
+                        plot_observed_vs_expected(observed_data, expected_data, "Categories")
+
+            except ValueError as error:
+                # e.g. observed and expected frequencies with different totals
+                st.error(str(error))
+
+with tabs[4]:
+    # Many 2x2 tables (e.g. one per A/B test or metric), all tested at once
+    st.header("Testing Many 2×2 Tables at Once")
+    st.write("""
+    An experimentation platform produces one 2×2 table per A/B test (or per conversion metric): conversions and
+    non-conversions of each arm. Here every table is tested with the chi-square test (with and without Yates'
+    continuity correction), the G-test and Fisher's exact test in one vectorized pass, so a million tables take
+    seconds. The p-values are then corrected for the number of tables (see the Batch Testing page).
+    """)
+    batch_alpha = st.slider("Significance Level (α)", 0.01, 0.10, 0.05, key="batch_alpha")
+    batch_source = st.radio("Tables", ["Simulate A/B Tests", "Upload Tables"], horizontal=True)
+
+    tables = has_lift = None
+    if batch_source == "Simulate A/B Tests":
+        seed_control()
+        table_count = st.select_slider("Number of Tables", options=[1000, 10000, 100000, 1000000], value=10000)
+        users = st.slider("Users per Arm", min_value=10, max_value=100000, value=1000, step=10)
+        base_rate = st.slider("Conversion Rate of Arm A", min_value=0.001, max_value=0.5, value=0.05, step=0.001,
+                              format="%.3f")
+        lift_fraction = st.slider("Fraction of Tests with a Lift", min_value=0.0, max_value=1.0, value=0.1, step=0.01)
+        lift = st.slider("Relative Lift of Arm B", min_value=0.0, max_value=1.0, value=0.2, step=0.01)
+        tables, has_lift = simulate_tables(table_count, users, base_rate, lift_fraction, lift,
+                                           stream_seed("batch-2x2"))
+    else:
+        count_columns = dataset_uploader("Upload one row per table with its four counts (CSV, Parquet, Arrow or .npy)",
+                                         key="batch_upload")
+        if count_columns:
+            names = list(count_columns)
+            cells = [st.selectbox(label, names, index=i % len(names), key=f"batch_cell_{i}") for i, label in
+                     enumerate(["A converted", "A not converted", "B converted", "B not converted"])]
+            counts = np.column_stack([count_columns[name] for name in cells]).astype(np.float64)
+            # Missing values are NaN, which fails every comparison
+            invalid = np.flatnonzero(~((counts >= 0) & (counts == np.floor(counts)) & np.isfinite(counts)).all(axis=1))
+            if invalid.size:
+                st.error(f"Counts must be non-negative whole numbers: {invalid.size:,} rows aren't "
+                         f"(the first is row {invalid[0] + 1}: {counts[invalid[0]].tolist()}).")
+            else:
+                tables = counts.reshape(-1, 2, 2)
+
+    if tables is not None:
+        pvalues = cached_analyze_2x2(tables)
+        qvalues = [benjamini_hochberg(pvalue) for pvalue in pvalues]
+        discoveries = {
+            "Uncorrected": [pvalue < batch_alpha for pvalue in pvalues],
+            "Holm": [holm(pvalue) < batch_alpha for pvalue in pvalues],
+            "Benjamini–Hochberg": [qvalue < batch_alpha for qvalue in qvalues],
+        }
+        summary = pd.DataFrame({correction: [int(rejected.sum()) for rejected in rejections]
+                                for correction, rejections in discoveries.items()}, index=TABLE_TEST_NAMES)
+        if has_lift is not None:
+            # The simulation knows which tests really have a lift
+            summary["False Discoveries (BH)"] = [int((rejected & ~has_lift).sum())
+                                                 for rejected in discoveries["Benjamini–Hochberg"]]
+        st.write(f"Significant tables out of {len(tables):,} (α = {batch_alpha}):")
+        st.table(summary)
+
+        st.subheader("First Tables")
+        shown = tables[:SHOWN_TABLES]
+        results = pd.DataFrame({"A converted": shown[:, 0, 0], "A not converted": shown[:, 0, 1],
+                                "B converted": shown[:, 1, 0], "B not converted": shown[:, 1, 1]})
+        for name, pvalue in zip(TABLE_TEST_NAMES, pvalues):
+            results[f"{name} p"] = pvalue[:SHOWN_TABLES]
+        st.dataframe(results, hide_index=True)
+
+        st.write("""
+        **Which test?** The uncorrected chi-square test is slightly anti-conservative with small counts, Yates'
+        correction and Fisher's exact test are conservative, and the G-test approximates the chi-square test. With
+        hundreds of users per arm they all agree closely; Fisher's exact test is the safe choice when expected
+        counts fall below 5.
+        """)
@@ -1,7 +1,8 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import f
+
+from utils.figures import FigureSpec
+from utils.grids import adaptive_grid, curve_range
+from utils.render_cache import cached_pyplot
 
 # Title
 st.title('Exploring F-Distribution 📊')
@@ -19,35 +20,47 @@ It is used primarily to compare two variances and has two degrees of freedom par
 The shape of the F-distribution changes based on the degrees of freedom.
 """)
 
+@cached_pyplot("f")
 def plot_f_distribution(df1_1, df2_1, df1_2, df2_2):
     """
     Plot the F-distribution's PDF and CDF for given degrees of freedom.
     """
-    x = np.linspace(0, 5, 1000)
-    y1 = f.pdf(x, df1_1, df2_1)
-    y2 = f.pdf(x, df1_2, df2_2)
+    # One range covering both distributions; heavy tails (small d₂) are shown on log axes
+    lower, upper, log = curve_range("f", dfn=[df1_1, df1_2], dfd=[df2_1, df2_2])
+    x1, y1 = adaptive_grid("f", lower, upper, log_x=log, log_y=log, dfn=df1_1, dfd=df2_1)
+    x2, y2 = adaptive_grid("f", lower, upper, log_x=log, log_y=log, dfn=df1_2, dfd=df2_2)
 
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6))
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its lines
+    figures = FigureSpec("f", 1, 2, figsize=(14, 6))
+    ax = figures.axes
 
     # PDF Plot
-    ax[0].plot(x, y1, label=f'F-Distribution (df₁={df1_1}, df₂={df2_1})', color='green')
-    ax[0].plot(x, y2, label=f'F-Distribution (df₁={df1_2}, df₂={df2_2})', color='blue')
-    ax[0].set_title('Probability Density Function (PDF)')
-    ax[0].set_xlabel('x')
-    ax[0].set_ylabel('Probability Density')
+    figures.line("pdf1", ax[0], x1, y1, label=f'F-Distribution (df₁={df1_1}, df₂={df2_1})', color='green')
+    figures.line("pdf2", ax[0], x2, y2, label=f'F-Distribution (df₁={df1_2}, df₂={df2_2})', color='blue')
     ax[0].legend(loc='upper right')
 
     # CDF Plot
-    cdf1 = f.cdf(x, df1_1, df2_1)
-    cdf2 = f.cdf(x, df1_2, df2_2)
-    ax[1].plot(x, cdf1, label=f'F-Distribution (df₁={df1_1}, df₂={df2_1})', color='red', linestyle='-.')
-    ax[1].plot(x, cdf2, label=f'F-Distribution (df₁={df1_2}, df₂={df2_2})', color='purple', linestyle='-.')
-    ax[1].set_title('Cumulative Distribution Function (CDF)')
-    ax[1].set_xlabel('x')
-    ax[1].set_ylabel('Cumulative Probability')
+    cdf_x1, cdf1 = adaptive_grid("f", lower, upper, log_x=log, function="cdf", dfn=df1_1, dfd=df2_1)
+    cdf_x2, cdf2 = adaptive_grid("f", lower, upper, log_x=log, function="cdf", dfn=df1_2, dfd=df2_2)
+    figures.line("cdf1", ax[1], cdf_x1, cdf1, label=f'F-Distribution (df₁={df1_1}, df₂={df2_1})', color='red', linestyle='-.')
+    figures.line("cdf2", ax[1], cdf_x2, cdf2, label=f'F-Distribution (df₁={df1_2}, df₂={df2_2})', color='purple', linestyle='-.')
     ax[1].legend(loc='lower right')
 
-    st.pyplot(fig)
+    with figures.setup():
+        ax[0].set_title('Probability Density Function (PDF)')
+        ax[0].set_xlabel('x')
+        ax[0].set_ylabel('Probability Density')
+        ax[1].set_title('Cumulative Distribution Function (CDF)')
+        ax[1].set_xlabel('x')
+        ax[1].set_ylabel('Cumulative Probability')
+    # The scale follows the degrees of freedom, so it is set on every run
+    scale = 'log' if log else 'linear'
+    ax[0].set_xscale(scale)
+    ax[0].set_yscale(scale)
+    ax[1].set_xscale(scale)
+    figures.rescale()
+
+    return figures
 
 # Parameters for fixed distribution
 fixed_df1 = 10
@@ -1,9 +1,31 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy import stats
 from statsmodels.stats.multicomp import pairwise_tukeyhsd
-import pandas as pd
+
+from utils.datasets import dataset_uploader, numbers_input
+from utils.figures import session_figure
+from utils.hypothesis import f_oneway
+from utils.moments import Moments, array_chunks
+from utils.render_cache import cached_pyplot
+
+# Largest number of values given to Tukey's HSD, which holds every value and its group label
+TUKEY_MAX_VALUES = 1_000_000
+
+@cached_pyplot("tukey")
+def plot_tukey(*samples):
+    # Perform Tukey HSD test on the values of all groups with their group labels
+    data = np.concatenate(samples)
+    groups = np.repeat([f"Group {i}" for i in range(1, len(samples) + 1)], [len(sample) for sample in samples])
+    tukey = pairwise_tukeyhsd(endog=data, groups=groups, alpha=0.05)
+
+    # Plot Tukey HSD results, redrawn on this session's reused figure
+    figures, _ = session_figure("tukey", figsize=(8, 5))
+    figures.clear()
+    ax = figures.axes
+    tukey.plot_simultaneous(comparison_name='Group 1', ax=ax)
+    ax.set_title("Tukey HSD Test Results")
+    return figures.figure
 
 # Define tabs
 tabs = st.tabs(["Introduction & Assumptions", "One-Way ANOVA", "Interactive ANOVA with Tukey HSD Plot"])
@@ -155,17 +177,14 @@ with tabs[2]:
     st.header("Interactive One-Way ANOVA with Tukey HSD Plot")
 
     # Input for group data
-    group1 = st.text_input("Group 1 Data (comma-separated)", "23, 21, 18, 25, 30")
-    group2 = st.text_input("Group 2 Data (comma-separated)", "27, 29, 26, 22, 24")
-    group3 = st.text_input("Group 3 Data (comma-separated)", "19, 18, 23, 20, 22")
-
-    if st.button("Calculate One-Way ANOVA and Tukey HSD"):
-        group1 = list(map(float, group1.split(',')))
-        group2 = list(map(float, group2.split(',')))
-        group3 = list(map(float, group3.split(',')))
+    columns = dataset_uploader(key="anova_upload")
+    group1 = numbers_input("Group 1 Data", "23, 21, 18, 25, 30", columns, index=0)
+    group2 = numbers_input("Group 2 Data", "27, 29, 26, 22, 24", columns, index=1)
+    group3 = numbers_input("Group 3 Data", "19, 18, 23, 20, 22", columns, index=2)
 
-        # Perform one-way ANOVA
-        f_statistic, p_value = stats.f_oneway(group1, group2, group3)
+    if st.button("Calculate One-Way ANOVA and Tukey HSD") and all(group is not None for group in (group1, group2, group3)):
+        # Perform one-way ANOVA from each group's count, mean and M2
+        f_statistic, p_value, _ = f_oneway(*(Moments.from_chunks(array_chunks(group)) for group in (group1, group2, group3)))
 
         st.write(f"F-Statistic: {f_statistic:.4f}")
         st.write(f"P-Value: {p_value:.4f}")
@@ -176,19 +195,8 @@ with tabs[2]:
         else:
             st.write("The result is not statistically significant. Fail to reject the null hypothesis.")
 
-        # Combine data into a single DataFrame for Tukey HSD
-        data = group1 + group2 + group3
-        groups = ['Group 1'] * len(group1) + ['Group 2'] * len(group2) + ['Group 3'] * len(group3)
-        df = pd.DataFrame({'Value': data, 'Group': groups})
-
-        # Perform Tukey HSD test
-        tukey = pairwise_tukeyhsd(endog=df['Value'], groups=df['Group'], alpha=0.05)
-
-        # Extract and display significant results
-        tukey_df = pd.DataFrame(data=tukey._results_table.data[1:], columns=tukey._results_table.data[0])
-        
-        # Plot Tukey HSD results
-        fig, ax = plt.subplots(figsize=(8, 5))
-        tukey.plot_simultaneous(comparison_name='Group 1', ax=ax)
-        plt.title("Tukey HSD Test Results")
-        st.pyplot(fig)
+        # Plot Tukey HSD results; the groups are cached by a digest of their values
+        if sum(len(group) for group in (group1, group2, group3)) <= TUKEY_MAX_VALUES:
+            plot_tukey(group1, group2, group3)
+        else:
+            st.info(f"Tukey's HSD is only run on up to {TUKEY_MAX_VALUES:,} values in total.")
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.datasets import dataset_uploader, table_chunks
+from utils.figures import FigureSpec
+from utils.hypothesis import benjamini_hochberg, holm, ttest_1samp, ttest_ind, ztest_1samp, ztest_ind
+from utils.moments import Moments
+from utils.render_cache import cached_pyplot
+from utils.rng import seed_control, stream_seed
+
+# Values drawn per block of simulated rows (all metrics of a block at once)
+SIMULATION_BLOCK_VALUES = 1 << 22
+
+# Most values simulated per group (rows x metrics)
+MAX_SIMULATED_VALUES = 10**7
+
+# Bins of the p-value histogram
+P_VALUE_BINS = 50
+
+# Rows of the results table shown
+SHOWN_RESULTS = 100
+
+@st.cache_data(show_spinner="Simulating metrics...", max_entries=8)
+def simulate_moments(metrics, rows, effect_fraction, effect_size, seed):
+    """
+    Moments of each metric in a simulated experiment with two groups of rows.
+
+    All metrics are standard normal in group A; in group B, the first effect_fraction of them
+    are shifted by effect_size standard deviations. Rows are drawn in blocks and folded into
+    the moments, so the table itself is never held in memory.
+    """
+    rng = np.random.Generator(np.random.PCG64(seed))
+    shift = np.zeros(metrics)
+    shift[:int(round(effect_fraction * metrics))] = effect_size
+    block_rows = max(1, SIMULATION_BLOCK_VALUES // metrics)
+
+    def blocks(offset):
+        for start in range(0, rows, block_rows):
+            yield rng.standard_normal((min(block_rows, rows - start), metrics)) + offset
+
+    return Moments.from_chunks(blocks(0.0)), Moments.from_chunks(blocks(shift)), shift != 0
+
+def batch_test(design, test, a, b=None, population_mean=0.0, equal_var=True):
+    """
+    Test every metric at once from the per-metric moments of group A (and group B).
+    """
+    if design == "One-Sample":
+        if test == "t-Test":
+            return ttest_1samp(a, population_mean)
+        return ztest_1samp(a, population_mean, a.std())
+    if test == "t-Test":
+        return ttest_ind(a, b, equal_var=equal_var)
+    return ztest_ind(a, b, a.std(), b.std())
+
+@cached_pyplot("batch_p_values")
+def plot_p_values(pvalues):
+    # p-value histogram, redrawn on the render worker's reused figure
+    figures = FigureSpec("batch_p_values", figsize=(10, 4))
+    ax = figures.axes
+    tested = pvalues[~np.isnan(pvalues)]
+    counts, edges = np.histogram(tested, bins=P_VALUE_BINS, range=(0, 1))
+    figures.histogram("p_values", ax, counts, edges, color='steelblue', alpha=0.6)
+    figures.line("uniform", ax, [0, 1], [tested.size / P_VALUE_BINS] * 2, color='red', linestyle='--',
+                 label='Expected if no metric has an effect')
+    with figures.setup():
+        ax.set_xlim(0, 1)
+        ax.set_xlabel('p-Value')
+        ax.set_ylabel('Number of Metrics')
+        ax.set_title('Distribution of p-Values')
+        ax.legend()
+    figures.rescale()
+    return figures
+
+st.title("Batch Hypothesis Testing and Multiple Comparisons")
+
+st.write("""
+Screening many metrics at once (every KPI of an A/B test, every gene of an expression study) means running one
+test per metric. With 10,000 metrics and α = 0.05, about 500 of them are "significant" even when nothing has
+changed, so the p-values have to be corrected for the number of tests:
+
+- **Holm (family-wise error rate):** Controls the probability of even one false positive. The i-th smallest of
+  m p-values is compared with α / (m - i + 1), stopping at the first one that passes. Strict, but safe.
+- **Benjamini–Hochberg (false discovery rate):** Controls the expected fraction of false positives among the
+  discoveries. The i-th smallest p-value is compared with i·α / m, and everything up to the largest one that
+  passes is rejected. Far more powerful when many metrics have real effects.
+
+All metrics are tested in one vectorized pass: each metric's count, mean and variance are accumulated over the
+rows of the table, and the tests are computed from those for every metric at once.
+""")
+
+st.header("Data")
+source = st.radio("Metrics", ["Simulate an Experiment", "Upload a Table"], horizontal=True)
+design = st.radio("Design", ["One-Sample", "Two-Sample"], index=1, horizontal=True,
+                  help="One-sample: each metric's mean against a population mean. "
+                       "Two-sample: each metric's mean in group A against group B.")
+test = st.radio("Test", ["t-Test", "z-Test"], horizontal=True,
+                help="The z-test uses the sample standard deviations, which is accurate for large samples.")
+population_mean = st.number_input("Population Mean", value=0.0) if design == "One-Sample" else 0.0
+equal_var = st.checkbox("Assume equal variances (pooled); otherwise Welch's t-test", value=True) \
+    if design == "Two-Sample" and test == "t-Test" else True
+alpha = st.slider("Significance Level (α)", min_value=0.01, max_value=0.10, value=0.05, step=0.01)
+
+a = b = names = has_effect = None
+if source == "Simulate an Experiment":
+    seed_control()
+    metrics = st.slider("Number of Metrics", min_value=100, max_value=100000, value=10000, step=100)
+    rows = st.slider("Rows per Group", min_value=2, max_value=max(2, min(1000, MAX_SIMULATED_VALUES // metrics)),
+                     value=min(50, MAX_SIMULATED_VALUES // metrics))
+    effect_fraction = st.slider("Fraction of Metrics with an Effect", min_value=0.0, max_value=1.0, value=0.1, step=0.01)
+    effect_size = st.slider("Effect Size (standard deviations)", min_value=0.0, max_value=2.0, value=0.8, step=0.05)
+
+    a, b, has_effect = simulate_moments(metrics, rows, effect_fraction, effect_size,
+                                        stream_seed("batch-testing"))
+    if design == "One-Sample":
+        # Test the shifted group against the population mean of the unshifted one
+        a = b
+    names = np.array([f"metric_{i + 1}" for i in range(metrics)])
+else:
+    columns = dataset_uploader("Upload a table with one numeric column per metric (CSV, Parquet, Arrow or .npy)")
+    if columns:
+        group_column = None
+        if design == "Two-Sample":
+            group_column = st.selectbox("Group Column (two distinct values, e.g. 0 and 1)", list(columns))
+            groups = np.unique(columns[group_column][~np.isnan(columns[group_column].astype(np.float64))])
+        metric_names = [name for name in columns if name != group_column]
+        metric_columns = [columns[name] for name in metric_names]
+        if not metric_columns:
+            st.error("The table has no metric columns besides the group column.")
+        elif design == "One-Sample":
+            a = Moments.from_chunks(table_chunks(metric_columns))
+        elif groups.size != 2:
+            st.error(f"The group column must have exactly two values, it has {groups.size}.")
+        else:
+            a = Moments.from_chunks(table_chunks(metric_columns, columns[group_column] == groups[0]))
+            b = Moments.from_chunks(table_chunks(metric_columns, columns[group_column] == groups[1]))
+            st.write(f"Group A: {group_column} = {groups[0]:g} ({a.count:,} rows), "
+                     f"Group B: {group_column} = {groups[1]:g} ({b.count:,} rows)")
+        names = np.array(metric_names)
+
+if a is not None:
+    st.header("Results")
+    statistic, pvalue, _ = batch_test(design, test, a, b, population_mean, equal_var)
+    statistic, pvalue = np.atleast_1d(statistic), np.atleast_1d(pvalue)
+    holm_pvalue = holm(pvalue)
+    bh_qvalue = benjamini_hochberg(pvalue)
+
+    discoveries = {
+        "Uncorrected": pvalue < alpha,
+        "Holm": holm_pvalue < alpha,
+        "Benjamini–Hochberg": bh_qvalue < alpha,
+    }
+    summary = pd.DataFrame({"Significant Metrics": [int(rejected.sum()) for rejected in discoveries.values()]},
+                           index=list(discoveries))
+    if has_effect is not None:
+        # The simulation knows which metrics really have an effect
+        summary["False Positives"] = [int((rejected & ~has_effect).sum()) for rejected in discoveries.values()]
+        summary["Missed Effects"] = [int((~rejected & has_effect).sum()) for rejected in discoveries.values()]
+    st.write(f"{pvalue.size:,} metrics tested.")
+    st.table(summary)
+
+    plot_p_values(pvalue)
+
+    st.subheader(f"Smallest p-Values (first {SHOWN_RESULTS})")
+    shown = np.argsort(pvalue, kind="stable")[:SHOWN_RESULTS]
+    results = pd.DataFrame({
+        "Metric": names[shown],
+        "Statistic": statistic[shown],
+        "p-Value": pvalue[shown],
+        "Holm p-Value": holm_pvalue[shown],
+        "BH q-Value": bh_qvalue[shown],
+    })
+    st.dataframe(results, hide_index=True)
+
+st.write("""
+### Key Insights:
+- **Uncorrected p-values** flag about α·m metrics by chance alone; the spike near 0 in the histogram is where the
+  real effects are, the flat part is the null metrics.
+- **Holm** keeps the chance of any false positive below α, at the cost of missing many real effects.
+- **Benjamini–Hochberg** keeps the share of false positives among the discoveries below α, and finds most of the
+  real effects when there are many of them.
+""")
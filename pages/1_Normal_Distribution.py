@@ -1,7 +1,8 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import norm
+
+from utils.figures import FigureSpec
+from utils.render_cache import cached_pyplot
+from utils.tables import normal_curve
 
 # Title
 st.title('Exploring Normal Distribution 📊')
@@ -18,43 +19,43 @@ The **Normal Distribution**, also known as the **Gaussian Distribution**, is a c
 Changing these parameters alters the shape of the distribution.
 """)
 
-def normal_distribution(mu, sigma, x):
-    """
-    Calculate the normal distribution (Gaussian) function.
-    """
-    return 1 / (sigma * np.sqrt(2 * np.pi)) * np.exp(-(x - mu)**2 / (2 * sigma**2))
-
+@cached_pyplot("normal")
 def plot_pdf(mu1, sigma1, mu2, sigma2):
     """
     Plot the probability density function (PDF) and cumulative distribution function (CDF) for normal distributions.
     """
-    x = np.linspace(min(mu1 - 3*sigma1, mu2 - 3*sigma2), max(mu1 + 3*sigma1, mu2 + 3*sigma2), 1000)
-    y1 = normal_distribution(mu1, sigma1, x)
-    y2 = normal_distribution(mu2, sigma2, x)
+    # Each curve spans its own μ ± 3σ, sliced from the precomputed standard normal table
+    x1, y1 = normal_curve("pdf", mu1, sigma1)
+    x2, y2 = normal_curve("pdf", mu2, sigma2)
 
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6))
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its lines
+    figures = FigureSpec("normal", 1, 2, figsize=(14, 6))
+    ax = figures.axes
 
     # PDF Plot
-    ax[0].plot(x, y1, label='Fixed Distribution (PDF)', color='green')
-    ax[0].plot(x, y2, label='Adjustable Distribution (PDF)', color='blue')
-    ax[0].axvline(mu1, color='green', linestyle='--', label='Fixed Mean')
-    ax[0].axvline(mu2, color='blue', linestyle='--', label='Adjustable Mean')
-    ax[0].set_title('Probability Density Function (PDF)')
-    ax[0].set_xlabel('x')
-    ax[0].set_ylabel('Probability Density')
-    ax[0].legend(loc='upper left')
+    figures.line("pdf1", ax[0], x1, y1, label='Fixed Distribution (PDF)', color='green')
+    figures.line("pdf2", ax[0], x2, y2, label='Adjustable Distribution (PDF)', color='blue')
+    figures.vline("mean1", ax[0], mu1, color='green', linestyle='--', label='Fixed Mean')
+    figures.vline("mean2", ax[0], mu2, color='blue', linestyle='--', label='Adjustable Mean')
 
     # CDF Plot
-    cdf1 = norm.cdf(x, mu1, sigma1)
-    cdf2 = norm.cdf(x, mu2, sigma2)
-    ax[1].plot(x, cdf1, label='Fixed Distribution (CDF)', color='red', linestyle='-.')
-    ax[1].plot(x, cdf2, label='Adjustable Distribution (CDF)', color='purple', linestyle='-.')
-    ax[1].set_title('Cumulative Distribution Function (CDF)')
-    ax[1].set_xlabel('x')
-    ax[1].set_ylabel('Cumulative Probability')
-    ax[1].legend(loc='lower right')
-
-    st.pyplot(fig)
+    _, cdf1 = normal_curve("cdf", mu1, sigma1)
+    _, cdf2 = normal_curve("cdf", mu2, sigma2)
+    figures.line("cdf1", ax[1], x1, cdf1, label='Fixed Distribution (CDF)', color='red', linestyle='-.')
+    figures.line("cdf2", ax[1], x2, cdf2, label='Adjustable Distribution (CDF)', color='purple', linestyle='-.')
+
+    with figures.setup():
+        ax[0].set_title('Probability Density Function (PDF)')
+        ax[0].set_xlabel('x')
+        ax[0].set_ylabel('Probability Density')
+        ax[0].legend(loc='upper left')
+        ax[1].set_title('Cumulative Distribution Function (CDF)')
+        ax[1].set_xlabel('x')
+        ax[1].set_ylabel('Cumulative Probability')
+        ax[1].legend(loc='lower right')
+    figures.rescale()
+
+    return figures
 
 # Parameters for fixed distribution
 fixed_mean = 0
@@ -1,8 +1,9 @@
 import streamlit as st
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-from scipy.stats import uniform
+
+from utils.distributions import evaluate
+from utils.figures import FigureSpec
+from utils.render_cache import cached_pyplot
 
 # Set up the page title and introduction
 st.title('Exploring Uniform Distribution 📊')
@@ -17,30 +18,36 @@ This distribution is often visualized as a rectangle where every value within th
 """)
 
 # Function to plot Uniform Distributions
+@cached_pyplot("uniform")
 def plot_uniform_distributions(a, b):
     x = np.linspace(a - 1, b + 1, 1000)
-    pdf = uniform.pdf(x, a, b - a)
-    cdf = uniform.cdf(x, a, b - a)
+    pdf = evaluate("uniform", "pdf", x, a=a, b=b)
+    cdf = evaluate("uniform", "cdf", x, a=a, b=b)
 
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its lines
+    figures = FigureSpec("uniform", 1, 2, figsize=(14, 6), constrained_layout=True)
+    ax = figures.axes
 
     # PDF Plot
-    sns.lineplot(x=x, y=pdf, ax=ax[0], color='purple', label='PDF')
-    ax[0].axvline(a, color='purple', linestyle='--', label='Lower Bound (a)')
-    ax[0].axvline(b, color='purple', linestyle='--', label='Upper Bound (b)')
-    ax[0].set_title('Probability Density Function (PDF)')
-    ax[0].set_xlabel('x')
-    ax[0].set_ylabel('Probability Density')
-    ax[0].legend(loc='upper left')
+    figures.line("pdf", ax[0], x, pdf, color='purple', label='PDF')
+    figures.vline("lower", ax[0], a, color='purple', linestyle='--', label='Lower Bound (a)')
+    figures.vline("upper", ax[0], b, color='purple', linestyle='--', label='Upper Bound (b)')
 
     # CDF Plot
-    sns.lineplot(x=x, y=cdf, ax=ax[1], color='darkorange', label='CDF',linestyle='-.')
-    ax[1].set_title('Cumulative Distribution Function (CDF)')
-    ax[1].set_xlabel('x')
-    ax[1].set_ylabel('Cumulative Probability')
-    ax[1].legend(loc='lower right')
+    figures.line("cdf", ax[1], x, cdf, color='darkorange', label='CDF', linestyle='-.')
+
+    with figures.setup():
+        ax[0].set_title('Probability Density Function (PDF)')
+        ax[0].set_xlabel('x')
+        ax[0].set_ylabel('Probability Density')
+        ax[0].legend(loc='upper left')
+        ax[1].set_title('Cumulative Distribution Function (CDF)')
+        ax[1].set_xlabel('x')
+        ax[1].set_ylabel('Cumulative Probability')
+        ax[1].legend(loc='lower right')
+    figures.rescale()
 
-    st.pyplot(fig)
+    return figures
 
 # Sidebar for uniform distribution parameters
 st.sidebar.header('Uniform Distribution Parameters')
@@ -1,8 +1,11 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import lognorm
+
+from utils.client_charts import curve_family_frame, sweep_chart_spec, sweep_data
+from utils.distributions import evaluate
+from utils.figures import FigureSpec
+from utils.grids import adaptive_grid, curve_range
+from utils.render_cache import cached_pyplot
 
 # Page title and introduction
 st.title('Exploring Log-Normal Distribution 📊')
@@ -21,6 +24,7 @@ The **Log-Normal Distribution** is a continuous probability distribution of a ra
 """)
 
 # Function to plot Log-Normal Distribution
+@cached_pyplot("lognormal")
 def plot_lognorm_distributions(mu, sigma):
     """
     Plot the probability density function (PDF) and cumulative distribution function (CDF)
@@ -30,30 +34,53 @@ def plot_lognorm_distributions(mu, sigma):
         mu (float): Mean of the underlying normal distribution.
         sigma (float): Standard deviation of the underlying normal distribution.
     """
-    s = sigma
-    scale = np.exp(mu)
-    x_lognorm = np.linspace(lognorm.ppf(0.01, s, scale=scale), lognorm.ppf(0.99, s, scale=scale), 1000)
-    
-    pdf_lognorm = lognorm.pdf(x_lognorm, s, scale=scale)
-    cdf_lognorm = lognorm.cdf(x_lognorm, s, scale=scale)
+    # The range follows the distribution's quantiles; long right tails (large σ) are shown on a log x axis
+    lower, upper, log = curve_range("lognormal", mu=mu, sigma=sigma)
+    x_pdf, pdf_lognorm = adaptive_grid("lognormal", lower, upper, log_x=log, log_y=log, mu=mu, sigma=sigma)
+    x_cdf, cdf_lognorm = adaptive_grid("lognormal", lower, upper, log_x=log, function="cdf", mu=mu, sigma=sigma)
 
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its lines
+    figures = FigureSpec("lognormal", 1, 2, figsize=(14, 6), constrained_layout=True)
+    ax = figures.axes
 
     # Plot PDF
-    sns.lineplot(x=x_lognorm, y=pdf_lognorm, ax=ax[0], color='purple', label='PDF')
-    ax[0].set_title('Probability Density Function (PDF)')
-    ax[0].set_xlabel('x')
-    ax[0].set_ylabel('Probability Density')
-    ax[0].legend(loc='upper right')
+    figures.line("pdf", ax[0], x_pdf, pdf_lognorm, color='purple', label='PDF')
 
     # Plot CDF
-    sns.lineplot(x=x_lognorm, y=cdf_lognorm, ax=ax[1], color='orange', label='CDF', linestyle='-.')
-    ax[1].set_title('Cumulative Distribution Function (CDF)')
-    ax[1].set_xlabel('x')
-    ax[1].set_ylabel('Cumulative Probability')
-    ax[1].legend(loc='lower right')
+    figures.line("cdf", ax[1], x_cdf, cdf_lognorm, color='orange', label='CDF', linestyle='-.')
+
+    with figures.setup():
+        ax[0].set_title('Probability Density Function (PDF)')
+        ax[0].set_xlabel('x')
+        ax[0].set_ylabel('Probability Density')
+        ax[0].legend(loc='upper right')
+        ax[1].set_title('Cumulative Distribution Function (CDF)')
+        ax[1].set_xlabel('x')
+        ax[1].set_ylabel('Cumulative Probability')
+        ax[1].legend(loc='lower right')
+    # The scale follows σ, so it is set on every run
+    scale = 'log' if log else 'linear'
+    ax[0].set_xscale(scale)
+    ax[0].set_yscale(scale)
+    ax[1].set_xscale(scale)
+    figures.rescale()
+
+    return figures
+
+@st.cache_data
+def lognorm_family_payload():
+    """
+    PDF of every slider combination (μ in -2..2, σ in 0.1..2) on its own 1%-99% range, 100 points each.
+    """
+    mu = np.round(np.arange(-2.0, 2.05, 0.1), 1)
+    sigma = np.round(np.arange(0.1, 2.05, 0.1), 1)
+    mu_grid, sigma_grid = mu[:, None, None], sigma[None, :, None]
 
-    st.pyplot(fig)
+    lower = evaluate("lognormal", "ppf", 0.01, mu=mu_grid, sigma=sigma_grid)
+    upper = evaluate("lognormal", "ppf", 0.99, mu=mu_grid, sigma=sigma_grid)
+    x = lower + (upper - lower) * np.linspace(0, 1, 100)
+    pdf = evaluate("lognormal", "pdf", x, mu=mu_grid, sigma=sigma_grid)
+    return sweep_data(curve_family_frame(x, pdf, {"mu": mu, "sigma": sigma}), "PDF")
 
 # Sidebar for user input
 st.sidebar.header('Log-Normal Distribution Parameters')
@@ -62,7 +89,26 @@ sigma = st.sidebar.slider('Standard Deviation of underlying normal distribution
 
 # Plot the distributions based on user input
 st.header('Log-Normal Distribution Curves')
-plot_lognorm_distributions(mu, sigma)
+
+client_side = st.toggle(
+    "Explore in the browser",
+    help="Sends every (μ, σ) curve once and moves through them in your browser, without rerunning the page."
+)
+
+if client_side:
+    spec = sweep_chart_spec(
+        {
+            "mu": {"min": -2.0, "max": 2.0, "step": 0.1, "value": mu, "label": "μ"},
+            "sigma": {"min": 0.1, "max": 2.0, "step": 0.1, "value": sigma, "label": "σ"},
+        },
+        x_title='x',
+        y_title='Probability Density',
+        family_label="PDF",
+        title='Probability Density Function (PDF)'
+    )
+    st.vega_lite_chart(lognorm_family_payload(), spec)
+else:
+    plot_lognorm_distributions(mu, sigma)
 
 # Mathematical Formulas Section
 st.header('Log-Normal Distribution Formulas')
@@ -1,8 +1,8 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import pareto
+
+from utils.figures import FigureSpec
+from utils.grids import adaptive_grid, curve_range
+from utils.render_cache import cached_pyplot
 
 # Page title and introduction
 st.title('Exploring Pareto Distribution 📊')
@@ -18,31 +18,44 @@ The **Pareto Distribution** is a power-law distribution that is commonly used to
 """)
 
 # Function to plot Pareto Distribution
+@cached_pyplot("pareto")
 def plot_pareto_distribution(alpha):
     """
     Plot the Pareto distribution curves for a specific alpha value.
     """
-    x = np.linspace(1, 5, 1000)  # Pareto distribution is defined for x >= 1
-    
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=False)
+    # The range follows the distribution's quantiles; heavy tails (small α) are shown on log axes
+    lower, upper, log = curve_range("pareto", alpha=alpha)
+    x_pdf, y_pdf = adaptive_grid("pareto", lower, upper, log_x=log, log_y=log, alpha=alpha)
+    x_cdf, y_cdf = adaptive_grid("pareto", lower, upper, log_x=log, function="cdf", alpha=alpha)
+
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its lines
+    figures = FigureSpec("pareto", 1, 2, figsize=(14, 6), constrained_layout=False)
+    ax = figures.axes
 
     # Plot PDFs
-    y_pdf = pareto.pdf(x, alpha)
-    sns.lineplot(x=x, y=y_pdf, ax=ax[0], color='blue', label=f'α={alpha}')
-    ax[0].set_xlabel('x')
-    ax[0].set_ylabel('Probability Density (PDF)')
-    ax[0].legend(loc='upper right')
-    ax[0].set_title('Pareto Distribution PDF')
+    figures.line("pdf", ax[0], x_pdf, y_pdf, color='blue', label=f'α={alpha}')
 
     # Plot CDFs
-    y_cdf = pareto.cdf(x, alpha)
-    sns.lineplot(x=x, y=y_cdf, ax=ax[1], color='orange', label=f'α={alpha}')
-    ax[1].set_xlabel('x')
-    ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+    figures.line("cdf", ax[1], x_cdf, y_cdf, color='orange', label=f'α={alpha}')
+
+    with figures.setup():
+        ax[0].set_xlabel('x')
+        ax[0].set_ylabel('Probability Density (PDF)')
+        ax[0].set_title('Pareto Distribution PDF')
+        ax[1].set_xlabel('x')
+        ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+        ax[1].set_title('Pareto Distribution CDF')
+    # Labels follow α, so the legends are refreshed on every run
+    ax[0].legend(loc='upper right')
     ax[1].legend(loc='lower right')
-    ax[1].set_title('Pareto Distribution CDF')
+    # The scale follows α too, so it is set on every run
+    scale = 'log' if log else 'linear'
+    ax[0].set_xscale(scale)
+    ax[0].set_yscale(scale)
+    ax[1].set_xscale(scale)
+    figures.rescale()
 
-    st.pyplot(fig)
+    return figures
 
 # Sidebar for user input
 st.sidebar.header('Pareto Distribution Parameters')
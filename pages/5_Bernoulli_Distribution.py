@@ -1,8 +1,9 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import bernoulli
+
+from utils.distributions import evaluate
+from utils.figures import FigureSpec, palette
+from utils.render_cache import cached_pyplot
 
 # Page title and introduction
 st.title('Exploring Bernoulli Distribution 🎯')
@@ -17,34 +18,40 @@ This distribution models a single trial with two possible outcomes, making it a
 """)
 
 # Function to plot Bernoulli Distribution
+@cached_pyplot("bernoulli")
 def plot_bernoulli_distribution(p):
     """
     Plot the Bernoulli distribution curves for a specific probability p.
     """
     x = np.array([0, 1])
 
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its artists
+    figures = FigureSpec("bernoulli", 1, 2, figsize=(14, 6), constrained_layout=True)
+    ax = figures.axes
 
     # Plot PMF
-    pmf_y = bernoulli.pmf(x, p)
-    sns.barplot(x=x, y=pmf_y, ax=ax[0], palette='Blues_d', edgecolor='black')
-    ax[0].set_xlabel('Outcome (x)')
-    ax[0].set_ylabel('Probability Mass (PMF)')
+    pmf_y = evaluate("bernoulli", "pmf", x, p=p)
+    figures.bars("pmf", ax[0], x, pmf_y, width=0.8, color=palette('Blues', len(x)), edgecolor='black')
     ax[0].set_title(f'Bernoulli Distribution PMF (p={p})')
-    ax[0].set_xticks(x)  # Set x-axis ticks to integers
-    ax[0].set_xticklabels(['0', '1'])  # Ensure labels are 0 and 1
 
     # Plot CDF 
-    cdf_y = bernoulli.cdf(x, p)
-    ax[1].step(x, cdf_y, where='mid', color='blue', label=f'p={p}')
-    ax[1].set_xlabel('Outcome (x)')
-    ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+    cdf_y = evaluate("bernoulli", "cdf", x, p=p)
+    figures.step("cdf", ax[1], x, cdf_y, where='mid', color='blue', label=f'p={p}')
     ax[1].legend(loc='lower right')
     ax[1].set_title(f'Bernoulli Distribution CDF (p={p})')
-    ax[1].set_xticks(x)  # Set x-axis ticks to integers
-    ax[1].set_xticklabels(['0', '1'])  # Ensure labels are 0 and 1
 
-    st.pyplot(fig)
+    with figures.setup():
+        ax[0].set_xlabel('Outcome (x)')
+        ax[0].set_ylabel('Probability Mass (PMF)')
+        ax[0].set_xticks(x)  # Set x-axis ticks to integers
+        ax[0].set_xticklabels(['0', '1'])  # Ensure labels are 0 and 1
+        ax[1].set_xlabel('Outcome (x)')
+        ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+        ax[1].set_xticks(x)  # Set x-axis ticks to integers
+        ax[1].set_xticklabels(['0', '1'])  # Ensure labels are 0 and 1
+    figures.rescale()
+
+    return figures
 
 # Streamlit app
 st.header('Interactive Bernoulli Distribution')
@@ -1,8 +1,10 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import binom
+
+from utils.discrete import binned_distribution
+from utils.figures import FigureSpec, palette
+from utils.render_cache import cached_pyplot
+from utils.tables import tabulated
 
 # Page title and introduction
 st.title('Exploring Binomial Distribution 🎲')
@@ -18,43 +20,95 @@ The Binomial Distribution is used in various fields such as quality control, fin
 """)
 
 # Function to plot Binomial Distribution
+@cached_pyplot("binomial")
 def plot_binomial_distribution(n, p):
     """
     Plot the Binomial distribution curve for a specific number of trials (n) and probability (p) values.
     """
     x = np.arange(0, n + 1)
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its artists
+    figures = FigureSpec("binomial", 1, 2, figsize=(14, 6), constrained_layout=True)
+    ax = figures.axes
 
     # Plot PMF
-    pmf_y = binom.pmf(x, n, p)
-    sns.barplot(x=x, y=pmf_y, ax=ax[0], palette='Blues_d', edgecolor='black')
-    ax[0].set_xlabel('Number of Successes (k)')
-    ax[0].set_ylabel('Probability Mass (PMF)')
+    pmf_y = tabulated("binomial", "pmf", x, n=n, p=p)
+    figures.bars("pmf", ax[0], x, pmf_y, width=0.8, color=palette('Blues', len(x)), edgecolor='black')
     ax[0].set_title(f'Binomial Distribution PMF (n={n}, p={p})')
     ax[0].set_xticks(x)  # Set x-axis ticks to integers
 
     # Plot CDF
-    cdf_y = binom.cdf(x, n, p)
-    ax[1].step(x, cdf_y, where='mid', color='blue', label=f'p={p}')
-    ax[1].set_xlabel('Number of Successes')
-    ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+    cdf_y = tabulated("binomial", "cdf", x, n=n, p=p)
+    figures.step("cdf", ax[1], x, cdf_y, where='mid', color='blue', label=f'p={p}')
     ax[1].legend(loc='lower right')
     ax[1].set_title(f'Binomial Distribution CDF (n={n}, p={p})')
     ax[1].set_xticks(x)  # Set x-axis ticks to integers
     ax[1].set_xticklabels([str(int(val)) for val in x])  # Ensure labels are integers
 
-    st.pyplot(fig)
+    with figures.setup():
+        ax[0].set_xlabel('Number of Successes (k)')
+        ax[0].set_ylabel('Probability Mass (PMF)')
+        ax[1].set_xlabel('Number of Successes')
+        ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+    figures.rescale()
+
+    return figures
+
+
+@cached_pyplot("binomial_large")
+def plot_binomial_large(n, p):
+    """
+    Plot the Binomial distribution for large n over the values that carry its mass, binned
+    when there are more of them than pixels.
+    """
+    edges, pmf_y, last, cdf_y = binned_distribution("binomial", n=n, p=p)
+    figures = FigureSpec("binomial_large", 1, 2, figsize=(14, 6), constrained_layout=True)
+    ax = figures.axes
+
+    # Plot PMF
+    figures.histogram("pmf", ax[0], pmf_y, edges, color='steelblue')
+    ax[0].set_title(f'Binomial Distribution PMF (n={n:,}, p={p})')
+    ax[0].set_ylabel('Probability Mass (PMF)' if edges[1] - edges[0] == 1 else 'Mean Probability Mass per Bin')
+
+    # Plot CDF
+    figures.step("cdf", ax[1], last, cdf_y, where='post', color='blue', label=f'p={p}')
+    ax[1].legend(loc='lower right')
+    ax[1].set_title(f'Binomial Distribution CDF (n={n:,}, p={p})')
+
+    with figures.setup():
+        ax[0].set_xlabel('Number of Successes (k)')
+        ax[1].set_xlabel('Number of Successes')
+        ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+        for axes in ax:
+            axes.ticklabel_format(axis='x', style='plain', useOffset=False)
+    # Only a few round values are labelled, however wide the support
+    figures.integer_ticks(ax[0], max_ticks=8)
+    figures.integer_ticks(ax[1], max_ticks=8)
+    figures.rescale()
+
+    return figures
 
 
 # Streamlit app
 st.header('Interactive Binomial Distribution')
 
+large_mode = st.toggle(
+    "Large-parameter mode",
+    help="Allows up to 10,000,000 trials. Only the values around the mode are computed, and they are "
+         "merged into bins when there are more than the plot can show."
+)
+
 # Sliders for parameters
-n_trials = st.slider("Number of Trials (n)", min_value=1, max_value=50, value=10)
+if large_mode:
+    n_trials = st.number_input("Number of Trials (n)", min_value=1, max_value=10_000_000, value=100_000, step=1_000)
+else:
+    n_trials = st.slider("Number of Trials (n)", min_value=1, max_value=50, value=10)
 p_success = st.slider("Probability of Success (p)", min_value=0.01, max_value=1.0, value=0.5, step=0.01)
 
 # Plot the distribution based on user input
-plot_binomial_distribution(n_trials, p_success)
+if large_mode:
+    plot_binomial_large(n_trials, p_success)
+else:
+    plot_binomial_distribution(n_trials, p_success)
 
 # Mathematical Formulas Section
 st.header('Binomial Distribution Formulas')
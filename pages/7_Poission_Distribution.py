@@ -1,8 +1,10 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import poisson
+
+from utils.discrete import binned_distribution
+from utils.figures import FigureSpec, palette
+from utils.render_cache import cached_pyplot
+from utils.tables import tabulated
 
 # Page title and introduction
 st.title('Exploring Poisson Distribution 📊')
@@ -19,6 +21,7 @@ The Poisson Distribution assumes that events occur independently of one another.
 """)
 
 # Function to plot Poisson Distribution
+@cached_pyplot("poisson")
 def plot_poisson_distribution(lambda_):
     """
     Plot the Poisson distribution curve for a specific mean (λ) value.
@@ -26,34 +29,85 @@ def plot_poisson_distribution(lambda_):
     max_x = 15  # Extend the range to show more possible events
     
     x = np.arange(0, max_x + 1)
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its artists
+    figures = FigureSpec("poisson", 1, 2, figsize=(14, 6), constrained_layout=True)
+    ax = figures.axes
 
     # Plot PMF
-    pmf_y = poisson.pmf(x, lambda_)
-    sns.barplot(x=x, y=pmf_y, ax=ax[0], palette='Blues_d', edgecolor='black')
-    ax[0].set_xlabel('Number of Events (x)')
-    ax[0].set_ylabel('Probability Mass Function (PMF)')
+    pmf_y = tabulated("poisson", "pmf", x, lam=lambda_)
+    figures.bars("pmf", ax[0], x, pmf_y, width=0.8, color=palette('Blues', len(x)), edgecolor='black')
     ax[0].set_title(f'Poisson Distribution PMF (λ={lambda_})')
 
     # Plot CDF
-    cdf_y = poisson.cdf(x, lambda_)
-    ax[1].step(x, cdf_y, where='mid', color='green')
-    ax[1].set_xlabel('Number of Events (x)')
-    ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+    cdf_y = tabulated("poisson", "cdf", x, lam=lambda_)
+    figures.step("cdf", ax[1], x, cdf_y, where='mid', color='green')
     ax[1].set_title(f'Poisson Distribution CDF (λ={lambda_})')
-    ax[1].set_xticks(x)
-    ax[1].set_xticklabels([str(int(val)) for val in x])
 
-    st.pyplot(fig)
+    with figures.setup():
+        ax[0].set_xlabel('Number of Events (x)')
+        ax[0].set_ylabel('Probability Mass Function (PMF)')
+        ax[0].set_xticks(x)
+        ax[1].set_xlabel('Number of Events (x)')
+        ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+        ax[1].set_xticks(x)
+        ax[1].set_xticklabels([str(int(val)) for val in x])
+    figures.rescale()
+
+    return figures
+
+@cached_pyplot("poisson_large")
+def plot_poisson_large(lambda_):
+    """
+    Plot the Poisson distribution for large λ over the values that carry its mass, binned
+    when there are more of them than pixels.
+    """
+    edges, pmf_y, last, cdf_y = binned_distribution("poisson", lam=lambda_)
+    figures = FigureSpec("poisson_large", 1, 2, figsize=(14, 6), constrained_layout=True)
+    ax = figures.axes
+
+    # Plot PMF
+    figures.histogram("pmf", ax[0], pmf_y, edges, color='steelblue')
+    ax[0].set_title(f'Poisson Distribution PMF (λ={lambda_:,})')
+    ax[0].set_ylabel('Probability Mass Function (PMF)' if edges[1] - edges[0] == 1
+                     else 'Mean Probability Mass per Bin')
+
+    # Plot CDF
+    figures.step("cdf", ax[1], last, cdf_y, where='post', color='green')
+    ax[1].set_title(f'Poisson Distribution CDF (λ={lambda_:,})')
+
+    with figures.setup():
+        ax[0].set_xlabel('Number of Events (x)')
+        ax[1].set_xlabel('Number of Events (x)')
+        ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+        for axes in ax:
+            axes.ticklabel_format(axis='x', style='plain', useOffset=False)
+    # Only a few round values are labelled, however wide the support
+    figures.integer_ticks(ax[0], max_ticks=8)
+    figures.integer_ticks(ax[1], max_ticks=8)
+    figures.rescale()
+
+    return figures
 
 # Streamlit app
 st.header('Interactive Poisson Distribution')
 
+large_mode = st.toggle(
+    "Large-parameter mode",
+    help="Allows λ up to 10,000,000. Only the values around the mode are computed, and they are "
+         "merged into bins when there are more than the plot can show."
+)
+
 # Slider for lambda value (now only discrete integers)
-lambda_value = st.slider("Rate of Occurrence (λ)", min_value=1, max_value=15, value=1, step=1)
+if large_mode:
+    lambda_value = st.number_input("Rate of Occurrence (λ)", min_value=0.1, max_value=1e7, value=1000.0, step=100.0)
+else:
+    lambda_value = st.slider("Rate of Occurrence (λ)", min_value=1, max_value=15, value=1, step=1)
 
 # Plot the distribution based on user input
-plot_poisson_distribution(lambda_value)
+if large_mode:
+    plot_poisson_large(lambda_value)
+else:
+    plot_poisson_distribution(lambda_value)
 
 # Mathematical Formulas Section
 st.header('Poisson Distribution Formulas')
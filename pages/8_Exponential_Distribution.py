@@ -1,8 +1,8 @@
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import expon
+
+from utils.figures import FigureSpec
+from utils.grids import adaptive_grid, curve_range
+from utils.render_cache import cached_pyplot
 
 # Page title and introduction
 st.title('Exploring Exponential Distribution ⏳')
@@ -19,30 +19,36 @@ The Exponential Distribution is memoryless, meaning the probability of an event
 """)
 
 # Function to plot Exponential Distribution
+@cached_pyplot("exponential")
 def plot_exponential_distribution(lambda_):
     """
     Plot the Exponential distribution curve for a specific rate (λ) value.
     """
-    max_x = 10  # Maximum x value to display
-    x = np.linspace(0, max_x, 1000)
+    # The range follows the distribution's quantiles, so it scales with 1/λ
+    lower, upper, _ = curve_range("exponential", rate=lambda_)
+    x_pdf, pdf_y = adaptive_grid("exponential", lower, upper, rate=lambda_)
+    x_cdf, cdf_y = adaptive_grid("exponential", lower, upper, function="cdf", rate=lambda_)
 
-    fig, ax = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
+    # Describe the figure for a render worker, which reuses its figure and only replaces the data of its lines
+    figures = FigureSpec("exponential", 1, 2, figsize=(14, 6), constrained_layout=True)
+    ax = figures.axes
 
     # Plot PDF
-    pdf_y = expon.pdf(x, scale=1/lambda_)
-    ax[0].plot(x, pdf_y, label=f'λ={lambda_}', color='blue')
-    ax[0].set_xlabel('Time (x)')
-    ax[0].set_ylabel('Probability Density (PDF)')
+    figures.line("pdf", ax[0], x_pdf, pdf_y, label=f'λ={lambda_}', color='blue')
     ax[0].set_title(f'Exponential Distribution PDF (λ={lambda_})')
 
     # Plot CDF
-    cdf_y = expon.cdf(x, scale=1/lambda_)
-    ax[1].plot(x, cdf_y, label=f'λ={lambda_}', color='green')
-    ax[1].set_xlabel('Time (x)')
-    ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+    figures.line("cdf", ax[1], x_cdf, cdf_y, label=f'λ={lambda_}', color='green')
     ax[1].set_title(f'Exponential Distribution CDF (λ={lambda_})')
 
-    st.pyplot(fig)
+    with figures.setup():
+        ax[0].set_xlabel('Time (x)')
+        ax[0].set_ylabel('Probability Density (PDF)')
+        ax[1].set_xlabel('Time (x)')
+        ax[1].set_ylabel('Cumulative Distribution Function (CDF)')
+    figures.rescale()
+
+    return figures
 
 # Streamlit app
 st.header('Interactive Exponential Distribution')
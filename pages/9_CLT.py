@@ -1,59 +1,221 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
+from scipy import stats
 
-# Set the random seed for reproducibility
-np.random.seed(42)
+from utils.client_charts import histogram_spec
+from utils.convolution import is_discrete, mean_distribution
+from utils.figures import FigureSpec
+from utils.histograms import histogram_with_kde
+from utils.population import population_cache
+from utils.progressive import collect_progressively, is_finished, mark_finished
+from utils.render_cache import cached_pyplot
+from utils.rng import seed_control, stream_seed
+from utils.sampling import AVAILABLE_CPUS, convergence_diagnostics, cumulative_sample_means, iter_sample_means
+from utils.sampling import sample_means as draw_sample_means
 
-# Define a function to plot the Central Limit Theorem
-def plot_clt(population_type, sample_size, num_samples):
-    # Generate population based on the selected distribution
+# Threads drawing sample blocks in parallel
+SAMPLING_WORKERS = min(4, AVAILABLE_CPUS)
+
+# Small sampling blocks, so the first chunk of a simulation (and its preview) is ready within milliseconds
+BLOCK_BYTES = 1024 * 1024
+
+# Coarse bins of the previews shown while a simulation runs
+PREVIEW_BINS = 15
+
+# Theoretical counterparts of the populations drawn in plot_clt
+# (numpy's pareto draws the Lomax form, shifted to start at 0)
+POPULATION_DISTRIBUTIONS = {
+    "Normal": stats.norm(loc=0, scale=1),
+    "Uniform": stats.uniform(loc=0, scale=1),
+    "Exponential": stats.expon(scale=1),
+    "Binomial": stats.binom(n=10, p=0.5),
+    "Poisson": stats.poisson(mu=3),
+    "Bernoulli": stats.bernoulli(p=0.5),
+    "Pareto": stats.lomax(c=3),
+    "Log-Normal": stats.lognorm(s=1, scale=1),
+}
+
+@st.cache_data(show_spinner="Drawing samples...", max_entries=8)
+def simulate_sample_means(population, sample_size, num_samples, seed):
+    """
+    Draw all samples as one chunked (num_samples, sample_size) block and return their means.
+    Blocks use child streams spawned from the session's seed and are drawn on several threads.
+    """
+    return draw_sample_means(population, sample_size, num_samples, rng=seed, max_block_bytes=BLOCK_BYTES,
+                             workers=SAMPLING_WORKERS)
+
+@st.cache_data(max_entries=8)
+def sample_mean_histogram(population, sample_size, num_samples, seed, _sample_means=None):
+    """
+    Histogram and density curve of the simulated sample means.
+    _sample_means are the same means if they were already simulated (not part of the cache key).
+    """
+    if _sample_means is None:
+        _sample_means = simulate_sample_means(population, sample_size, num_samples, seed)
+    mark_finished("clt", population, sample_size, num_samples, seed)
+    return histogram_with_kde(_sample_means)
+
+@st.cache_data(max_entries=16)
+def population_histogram(population):
+    """
+    Histogram and density curve of a population.
+    """
+    return histogram_with_kde(population)
+
+@st.cache_data(max_entries=32)
+def exact_sample_mean_distribution(population_type, sample_size):
+    """
+    Sampling distribution of the mean computed by FFT convolution of the population PMF.
+    """
+    return mean_distribution(POPULATION_DISTRIBUTIONS[population_type], sample_size)
+
+# Generate the population for the selected distribution
+def generate_population(population_type):
     if population_type == "Normal":
-        population = np.random.normal(loc=0, scale=1, size=10000)
+        population = population_cache.get("normal", {"loc": 0, "scale": 1})
         population_label = "μ=0, σ=1"
     elif population_type == "Uniform":
-        population = np.random.uniform(low=0, high=1, size=10000)
+        population = population_cache.get("uniform", {"low": 0, "high": 1})
         population_label = "low=0, high=1"
     elif population_type == "Exponential":
-        population = np.random.exponential(scale=1, size=10000)
+        population = population_cache.get("exponential", {"scale": 1})
         population_label = "λ=1"
     elif population_type == "Binomial":
-        population = np.random.binomial(n=10, p=0.5, size=10000)
+        population = population_cache.get("binomial", {"n": 10, "p": 0.5})
         population_label = "n=10, p=0.5"
     elif population_type == "Poisson":
-        population = np.random.poisson(lam=3, size=10000)
+        population = population_cache.get("poisson", {"lam": 3})
         population_label = "λ=3"
     elif population_type == "Bernoulli":
-        population = np.random.binomial(n=1, p=0.5, size=10000)
+        population = population_cache.get("binomial", {"n": 1, "p": 0.5})
         population_label = "p=0.5"
     elif population_type == "Pareto":
-        population = np.random.pareto(a=3, size=10000)
+        population = population_cache.get("pareto", {"a": 3})
         population_label = "a=3"
     elif population_type == "Log-Normal":
-        population = np.random.lognormal(mean=0, sigma=1, size=10000)
+        population = population_cache.get("lognormal", {"mean": 0, "sigma": 1})
         population_label = "μ=0, σ=1"
 
-    # Calculate sample means
-    sample_means = [np.mean(np.random.choice(population, sample_size)) for _ in range(num_samples)]
-    
-    # Plotting
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    return population, population_label
+
+@st.cache_data(show_spinner="Running convergence sweep...", max_entries=8)
+def simulate_convergence(population, max_n, num_samples, seed):
+    """
+    Means for every n = 1..max_n from one simulation, summarised by convergence diagnostics.
+    """
+    means = cumulative_sample_means(population, max_n, num_samples, rng=seed)
+    return convergence_diagnostics(means, population.mean(), population.std())
+
+@cached_pyplot("clt_sweep")
+def plot_clt_sweep(population, max_n, num_samples, seed):
+    """
+    Plot KS distance to the normal, skewness and standard error of the sample means against n.
+    """
+    diagnostics = simulate_convergence(population, max_n, num_samples, seed)
+    n = np.arange(1, max_n + 1)
+
+    figures = FigureSpec("clt_sweep", 1, 3, figsize=(18, 5))
+    figures.clear()
+    axes = figures.axes
+
+    axes[0].plot(n, diagnostics["ks"], color='purple')
+    axes[0].set_title('KS Distance to the Normal Approximation')
+    axes[0].set_ylabel('KS Distance')
+
+    axes[1].plot(n, diagnostics["skewness"], color='orange')
+    axes[1].axhline(0, color='black', linestyle='--')
+    axes[1].set_title('Skewness of Sample Means')
+    axes[1].set_ylabel('Skewness')
+
+    axes[2].plot(n, diagnostics["standard_error"], color='green', label='Simulated')
+    axes[2].plot(n, population.std() / np.sqrt(n), color='black', linestyle='--', label='σ/√n')
+    axes[2].set_title('Standard Error of the Mean')
+    axes[2].set_ylabel('Standard Error')
+    axes[2].legend()
+
+    for ax in axes:
+        ax.set_xlabel('Sample Size (n)')
+
+    figures.figure.tight_layout()
+    return figures
+
+def clt_figure(population_type, population):
+    """
+    Figure of the CLT plot with the population panel drawn and the sample mean panel left empty.
+    """
+    # Plotting, redrawn on the render worker's reused figure
+    figures = FigureSpec("clt", 1, 2, figsize=(14, 6))
+    figures.clear()
+    axes = figures.axes
     
-    # Plot the population distribution
-    sns.histplot(population, bins=30, kde=True, color='blue', ax=axes[0])
+    # Plot the population distribution from its precomputed histogram
+    counts, edges, kde_x, kde_y = population_histogram(population)
+    figures.histogram("population", axes[0], counts, edges, color='blue', alpha=0.4)
+    figures.line("population_kde", axes[0], kde_x, kde_y, color='blue')
     axes[0].set_title(f'{population_type} Distribution (Population)')
     axes[0].set_xlabel('Value')
     axes[0].set_ylabel('Frequency')
-    
-    # Plot the distribution of sample means
-    sns.histplot(sample_means, bins=30, kde=True, color='green', ax=axes[1])
-    axes[1].set_title('Distribution of Sample Means')
     axes[1].set_xlabel('Sample Mean')
-    axes[1].set_ylabel('Frequency')
+    return figures
+
+def draw_sample_mean_histogram(figures, histogram, title):
+    """
+    Draw the histogram and density curve of simulated sample means on the second panel.
+    """
+    ax = figures.axes[1]
+    counts, edges, kde_x, kde_y = histogram
+    figures.histogram("sample_means", ax, counts, edges, color='green', alpha=0.4)
+    figures.line("sample_means_kde", ax, kde_x, kde_y, color='green')
+    ax.set_title(title)
+    ax.set_ylabel('Frequency')
+
+# Define a function to plot the Central Limit Theorem
+@cached_pyplot("clt")
+def plot_clt(population_type, population, sample_size, num_samples, method="Monte Carlo", seed=None):
+    figures = clt_figure(population_type, population)
+    axes = figures.axes
+    
+    if method == "Monte Carlo":
+        # Plot the distribution of simulated sample means
+        histogram = sample_mean_histogram(population, sample_size, num_samples, seed)
+        draw_sample_mean_histogram(figures, histogram, 'Distribution of Sample Means')
+    else:
+        # Plot the exact distribution of the sample mean, trimmed to its visible support
+        values, probabilities, step = exact_sample_mean_distribution(population_type, sample_size)
+        visible = probabilities > 1e-9 * probabilities.max()
+        values, probabilities = values[visible], probabilities[visible]
+        if is_discrete(POPULATION_DISTRIBUTIONS[population_type]):
+            axes[1].vlines(values, 0, probabilities, color='green')
+            axes[1].set_ylabel('Probability')
+        else:
+            density = probabilities / step
+            axes[1].plot(values, density, color='green')
+            axes[1].fill_between(values, density, color='green', alpha=0.3)
+            axes[1].set_ylabel('Density')
+        axes[1].set_title('Exact Distribution of Sample Means')
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    figures.figure.tight_layout()
+    return figures
+
+def simulate_with_previews(population_type, population, sample_size, num_samples, seed):
+    """
+    Simulate the sample means chunk by chunk, showing coarse histograms as soon as the first chunk
+    is drawn and refining them while the rest follow. The previews are drawn by the browser, so
+    no image is rendered until the full plot. The means are handed to the histogram cache,
+    so plot_clt doesn't simulate them again.
+    """
+    counts, edges, _, _ = population_histogram(population)
+    population_spec = histogram_spec(counts, edges, f'{population_type} Distribution (Population)', 'Value', 'blue')
+
+    def preview(sample_means):
+        counts, edges = np.histogram(sample_means, bins=PREVIEW_BINS)
+        title = f'Distribution of Sample Means ({sample_means.size:,} of {num_samples:,} samples)'
+        st.vega_lite_chart(spec={"hconcat": [population_spec, histogram_spec(counts, edges, title, 'Sample Mean', 'green')]})
+
+    chunks = iter_sample_means(population, sample_size, num_samples, rng=seed, max_block_bytes=BLOCK_BYTES,
+                               workers=SAMPLING_WORKERS)
+    sample_means = collect_progressively(chunks, num_samples, preview)
+    sample_mean_histogram(population, sample_size, num_samples, seed, _sample_means=sample_means)
 
 # Streamlit UI
 
@@ -75,6 +237,9 @@ The CLT is the cornerstone of many statistical methods. It allows us to:
 
 st.header("Explore the Central Limit Theorem")
 
+# Session seed for reproducible simulations
+seed_control()
+
 # Dropdown for population type
 population_type = st.selectbox(
     "Select Population Distribution",
@@ -82,13 +247,43 @@ population_type = st.selectbox(
 )
 
 # Slider for sample size
-sample_size = st.slider("Sample Size (n)", min_value=1, max_value=500, value=30)
+sample_size = st.slider("Sample Size (n)", min_value=1, max_value=1000, value=30)
 
 # Slider for number of samples
-num_samples = st.slider("Number of Samples", min_value=100, max_value=5000, value=1000, step=100)
+num_samples = st.select_slider(
+    "Number of Samples",
+    options=[100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000],
+    value=1000
+)
+
+# Monte Carlo simulation or exact computation of the sampling distribution
+method = st.radio(
+    "Sampling Distribution Method",
+    ["Monte Carlo", "Exact (FFT convolution)"],
+    horizontal=True,
+    help="The exact method convolves the population's probability mass function with itself n times, so it needs no random draws."
+)
 
 # Generate and plot the graphs
-plot_clt(population_type, sample_size, num_samples)
+population, population_label = generate_population(population_type)
+seed = stream_seed("clt")
+with st.empty():
+    # Large simulations show previews in this placeholder until the full plot replaces them
+    if method == "Monte Carlo" and not is_finished("clt", population, sample_size, num_samples, seed) \
+            and not plot_clt.is_cached(population_type, population, sample_size, num_samples, method, seed):
+        simulate_with_previews(population_type, population, sample_size, num_samples, seed)
+    plot_clt(population_type, population, sample_size, num_samples, method, seed)
+
+st.subheader("Convergence Across Sample Sizes")
+st.write("""
+Instead of one sample size at a time, the sweep draws a single matrix of samples and reads off the sample means 
+for every \(n\) from 1 up to the chosen maximum with one cumulative sum. The diagnostics show how quickly the 
+distribution of the sample means approaches the normal curve.
+""")
+if st.checkbox("Run convergence sweep"):
+    max_n = st.slider("Maximum Sample Size", min_value=2, max_value=500, value=100)
+    sweep_samples = st.slider("Samples per Sample Size", min_value=100, max_value=5000, value=1000, step=100)
+    plot_clt_sweep(population, max_n, sweep_samples, stream_seed("clt-sweep"))
 
 # Additional educational content
 st.write("""
@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from utils.contingency import analyze_2x2, chi2_2x2, fisher_exact_2x2, gtest_2x2
+
+
+def page_tables(count, users, base_rate, lift_fraction=0.1, lift=0.2, seed=0):
+    # Simulated A/B tests like those of the chi-square page's batch tab
+    rng = np.random.default_rng(seed)
+    rate_b = np.where(np.arange(count) < lift_fraction * count, min(1.0, base_rate * (1 + lift)), base_rate)
+    conversions = np.stack([rng.binomial(users, base_rate, count), rng.binomial(users, rate_b)], axis=1)
+    return np.stack([conversions, users - conversions], axis=2)
+
+
+@pytest.fixture
+def tables():
+    rng = np.random.default_rng(3)
+    near_empty = np.array([[False, False], [False, True]])
+    tables = [rng.integers(0, 6, (300, 2, 2)), rng.integers(0, 60, (300, 2, 2)),
+              page_tables(300, 5000, 0.05), page_tables(300, 50_000, 0.3, lift_fraction=0.5),
+              # Unbalanced tables with a near-empty cell, whose p-values are far out in a tail
+              np.where(near_empty, rng.integers(0, 3, (300, 2, 2)), rng.integers(0, 3000, (300, 2, 2))),
+              [[[0, 0], [3, 4]], [[0, 5], [0, 7]], [[5, 5], [5, 5]], [[3, 0], [0, 3]], [[10, 0], [0, 10]],
+               [[1, 2], [2, 1]], [[100_000, 3], [2, 100_000]], [[0, 0], [0, 0]]]]
+    return np.concatenate([np.asarray(part).reshape(-1, 2, 2) for part in tables])
+
+
+def test_fisher_matches_scipy(tables):
+    result = fisher_exact_2x2(tables)
+    expected = [stats.fisher_exact(table) for table in tables]
+    # Subnormal p-values (below about 1e-308) have few digits left in either implementation
+    assert np.allclose(result.pvalue, [test.pvalue for test in expected], rtol=1e-9, atol=1e-300)
+    assert np.allclose(result.statistic, [test.statistic for test in expected], equal_nan=True)
+
+
+@pytest.mark.parametrize("test, kwargs", [(chi2_2x2, {"correction": False}), (chi2_2x2, {"correction": True}),
+                                          (gtest_2x2, {"correction": False}), (gtest_2x2, {"correction": True})])
+def test_chi2_and_g_match_scipy(tables, test, kwargs):
+    # scipy rejects tables with an empty row or column, which get NaN here
+    tables = tables[(tables.sum(axis=1) > 0).all(axis=1) & (tables.sum(axis=2) > 0).all(axis=1)]
+    result = test(tables, **kwargs)
+    options = {**kwargs, "lambda_": "log-likelihood"} if test is gtest_2x2 else kwargs
+    expected = [stats.chi2_contingency(table, **options) for table in tables]
+    assert np.allclose(result.statistic, [test.statistic for test in expected], rtol=1e-10)
+    assert np.allclose(result.pvalue, [test.pvalue for test in expected], rtol=1e-9)
+
+
+def test_analyze_2x2_runs_every_test(tables):
+    results = analyze_2x2(tables)
+    expected = (chi2_2x2(tables, correction=False), chi2_2x2(tables), gtest_2x2(tables, correction=False),
+                fisher_exact_2x2(tables))
+    for result, single in zip(results, expected):
+        assert np.array_equal(result.pvalue, single.pvalue, equal_nan=True)
+
+
+def test_invalid_counts():
+    for table in ([[1, -1], [2, 3]], [[1.5, 1], [2, 3]], [[np.nan, 1], [2, 3]]):
+        with pytest.raises(ValueError):
+            fisher_exact_2x2(table)
+
+
+@pytest.mark.parametrize("base_rate", [0.05, 0.5])
+def test_fisher_at_the_pages_largest_settings(base_rate):
+    # A million tables of 100,000 users per arm take seconds; summing the PMF term by term took minutes
+    tables = page_tables(1_000_000, 100_000, base_rate)
+    start = time.perf_counter()
+    pvalues = fisher_exact_2x2(tables).pvalue
+    assert time.perf_counter() - start < 60
+    sample = np.random.default_rng(4).choice(len(tables), 50, replace=False)
+    assert np.allclose(pvalues[sample], [stats.fisher_exact(tables[i]).pvalue for i in sample], rtol=1e-9)
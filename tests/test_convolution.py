@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from utils.convolution import mean_distribution
+
+
+@pytest.mark.parametrize("p", [0.05, 0.5, 0.9])
+@pytest.mark.parametrize("n", [1, 10, 1000])
+def test_mean_of_bernoulli_draws_is_binomial(p, n):
+    values, probabilities, step = mean_distribution(stats.bernoulli(p), n)
+    assert step == 1 / n
+    assert np.allclose(values * n, np.arange(n + 1))
+    assert np.allclose(probabilities, stats.binom.pmf(np.arange(n + 1), n, p), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("lam", [0.5, 3.0, 20.0])
+@pytest.mark.parametrize("n", [1, 10, 100])
+def test_mean_of_poisson_draws_is_poisson(lam, n):
+    values, probabilities, _ = mean_distribution(stats.poisson(lam), n)
+    counts = np.rint(values * n)
+    # Each draw's lattice drops the tails beyond 1e-12, which the sums of n draws add up
+    assert np.allclose(probabilities, stats.poisson.pmf(counts, n * lam), rtol=0, atol=2e-12)
+
+
+@pytest.mark.parametrize("dist", [stats.expon(scale=2.0), stats.lognorm(1.0), stats.poisson(3.0),
+                                  stats.bernoulli(0.01)], ids=["expon", "lognorm", "poisson", "bernoulli"])
+def test_mass_is_conserved_after_clipping(dist):
+    # Round-off leaves negative values in the far tails, which are clipped before normalizing
+    values, probabilities, _ = mean_distribution(dist, 50)
+    assert (probabilities >= 0).all()
+    assert abs(probabilities.sum() - 1) < 1e-14
+    assert np.isclose(values @ probabilities, dist.mean(), rtol=1e-3)
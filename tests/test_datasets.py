@@ -0,0 +1,18 @@
+import pytest
+
+from utils.datasets import parse_numbers
+
+
+@pytest.mark.parametrize("text", ["1, 2, 3", "1, 2, 3,", "1;2;3;", ",1,2,3", " 1 2\n3\n", "1,,2 ; 3"])
+def test_parse_numbers_ignores_separators_at_the_ends(text):
+    assert parse_numbers(text).tolist() == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.parametrize("text", ["", "  ", ",", " ; \n"])
+def test_parse_numbers_of_no_numbers(text):
+    assert parse_numbers(text).size == 0
+
+
+def test_parse_numbers_rejects_other_tokens():
+    with pytest.raises(ValueError):
+        parse_numbers("1, two, 3")
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from utils.downsample import lttb
+
+
+@pytest.fixture
+def curve():
+    x = np.sort(np.random.default_rng(0).uniform(0, 100, 10_000))
+    y = np.sin(x) + 0.1 * np.random.default_rng(1).normal(size=x.size)
+    y[5000] = 10.0  # a spike
+    return x, y
+
+
+@pytest.mark.parametrize("n_out", [3, 10, 1400, 9999])
+def test_lttb_keeps_the_endpoints_and_the_order(curve, n_out):
+    x, y = curve
+    x_out, y_out = lttb(x, y, n_out)
+    assert x_out.size == y_out.size == n_out
+    assert (x_out[0], y_out[0], x_out[-1], y_out[-1]) == (x[0], y[0], x[-1], y[-1])
+    assert (np.diff(x_out) > 0).all()
+    # Every kept point is a point of the curve
+    assert np.array_equal(y_out, y[np.searchsorted(x, x_out)])
+
+
+def test_lttb_keeps_peaks(curve):
+    x, y = curve
+    assert 10.0 in lttb(x, y, 100)[1]
+
+
+@pytest.mark.parametrize("n_out", [10, 11, 50])
+def test_lttb_returns_short_curves_unchanged(n_out):
+    x, y = np.arange(10.0), np.arange(10.0) ** 2
+    x_out, y_out = lttb(x, y, n_out)
+    assert np.array_equal(x_out, x) and np.array_equal(y_out, y)
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from utils.histograms import binned_kde
+
+
+def samples():
+    rng = np.random.default_rng(0)
+    return {"normal": rng.normal(0, 1, 5000), "skewed": rng.exponential(2, 20_000),
+            "bimodal": np.concatenate([rng.normal(0, 1, 3000), rng.normal(6, 0.5, 1000)])}
+
+
+@pytest.mark.parametrize("name", samples())
+def test_binned_kde_matches_gaussian_kde(name):
+    data = samples()[name]
+    x, density = binned_kde(data)
+    assert x[0] == data.min() and x[-1] == data.max() and x.size == 1024
+    # Linear binning errs by about the squared grid step over the squared bandwidth: well within 0.1% of the peak
+    expected = stats.gaussian_kde(data)(x)
+    assert np.abs(density - expected).max() < 1e-3 * expected.max()
+
+
+def test_binned_kde_of_a_constant_sample():
+    x, density = binned_kde(np.full(10, 3.0), gridsize=16)
+    assert x.size == 16 and not density.any()
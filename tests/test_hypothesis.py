@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+# TestResult is renamed, since pytest would try to collect a class named Test*
+from utils.hypothesis import (TestResult as Result, benjamini_hochberg, f_oneway, holm, ttest_1samp,
+                              ttest_1samp_from_stats, ttest_ind, ttest_ind_from_stats, ttest_rel, ttest_rel_from_stats,
+                              ztest_1samp, ztest_ind)
+from utils.moments import Moments, array_chunks
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(1)
+    return rng.normal(10.0, 2.0, 200), rng.normal(10.5, 3.0, 150), rng.normal(9.8, 2.5, 90)
+
+
+def streamed(values):
+    return Moments.from_chunks(array_chunks(values, 64))
+
+
+def assert_result(result, expected):
+    assert np.isclose(result.statistic, expected.statistic, rtol=1e-10)
+    assert np.isclose(result.pvalue, expected.pvalue, rtol=1e-9)
+
+
+def test_ttest_1samp(samples):
+    assert_result(ttest_1samp(streamed(samples[0]), 10.3), stats.ttest_1samp(samples[0], 10.3))
+
+
+def test_ttest_rel(samples):
+    before, after = samples[0][:150], samples[1]
+    assert_result(ttest_rel(streamed(before - after)), stats.ttest_rel(before, after))
+
+
+@pytest.mark.parametrize("equal_var", [True, False])
+def test_ttest_ind(samples, equal_var):
+    a, b = samples[:2]
+    result = ttest_ind(streamed(a), streamed(b), equal_var=equal_var)
+    expected = stats.ttest_ind(a, b, equal_var=equal_var)
+    assert_result(result, expected)
+    assert np.isclose(result.df, expected.df, rtol=1e-10)
+
+
+def test_f_oneway(samples):
+    result = f_oneway(*(streamed(sample) for sample in samples))
+    assert_result(result, stats.f_oneway(*samples))
+    assert result.df == (2, sum(len(sample) for sample in samples) - 3)
+
+
+def test_f_oneway_of_columns(samples):
+    # One ANOVA per column of 2-D chunks
+    groups = [np.column_stack([sample, 2 * sample ** 2]) for sample in samples]
+    result = f_oneway(*(streamed(group) for group in groups))
+    for column in range(2):
+        assert_result(Result(result.statistic[column], result.pvalue[column], None),
+                      stats.f_oneway(*(group[:, column] for group in groups)))
+
+
+def z_result(statistic):
+    return Result(statistic, 2 * stats.norm.sf(abs(statistic)), None)
+
+
+def test_ztests(samples):
+    a, b = samples[:2]
+    assert_result(ztest_1samp(streamed(a), 10.3, 2.0), z_result((a.mean() - 10.3) / (2.0 / np.sqrt(len(a)))))
+    assert_result(ztest_ind(streamed(a), streamed(b), 2.0, 3.0),
+                  z_result((a.mean() - b.mean()) / np.sqrt(2.0 ** 2 / len(a) + 3.0 ** 2 / len(b))))
+
+
+@pytest.mark.parametrize("equal_var", [True, False])
+def test_ttest_ind_from_stats(equal_var):
+    # One design per element
+    args = (np.array([10.0, 3.2, -1.0]), np.array([2.0, 0.5, 1.0]), np.array([30, 5, 1000]),
+            np.array([11.0, 3.0, -1.1]), np.array([2.5, 0.7, 1.3]), np.array([40, 2, 900]))
+    result = ttest_ind_from_stats(*args, equal_var=equal_var)
+    expected = stats.ttest_ind_from_stats(*args, equal_var=equal_var)
+    assert np.allclose(result.statistic, expected.statistic, rtol=1e-10)
+    assert np.allclose(result.pvalue, expected.pvalue, rtol=1e-9)
+
+
+def test_from_stats_match_the_raw_values(samples):
+    a, b = samples[0][:150], samples[1]
+    assert_result(ttest_1samp_from_stats(a.mean(), a.std(ddof=1), len(a), 10.3), stats.ttest_1samp(a, 10.3))
+    differences = a - b
+    assert_result(ttest_rel_from_stats(differences.mean(), differences.std(ddof=1), len(differences)),
+                  stats.ttest_rel(a, b))
+
+
+@pytest.mark.parametrize("adjust, method", [(holm, "holm"), (benjamini_hochberg, "fdr_bh")])
+def test_adjusted_pvalues(adjust, method):
+    pvalues = np.random.default_rng(2).uniform(0, 0.2, 1000) ** 2
+    pvalues[:10] = pvalues[10]  # ties
+    assert np.allclose(adjust(pvalues), multipletests(pvalues, method=method)[1], rtol=1e-12)
+    # Missing p-values stay missing and don't count as tests
+    with_missing = np.insert(pvalues, [0, 500], np.nan)
+    adjusted = adjust(with_missing)
+    assert np.isnan(adjusted[[0, 501]]).all()
+    assert np.allclose(np.delete(adjusted, [0, 501]), adjust(pvalues), rtol=1e-12)
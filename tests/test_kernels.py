@@ -0,0 +1,16 @@
+import numpy as np
+from scipy import stats
+
+from utils.kernels import binomial_logpmf, check_against_scipy, hypergeom_logpmf
+
+
+def test_kernels_match_scipy():
+    assert check_against_scipy() == {}
+
+
+def test_log_pmfs_keep_their_digits_far_from_the_mode():
+    # scipy's PMFs underflow here; the kernels' log-PMFs still match the exact log-PMF
+    k = np.array([0, 10, 4000])
+    assert np.allclose(binomial_logpmf(k, 10000, 0.5), stats.binom.logpmf(k, 10000, 0.5), rtol=1e-12)
+    assert np.allclose(hypergeom_logpmf(k, 20000, 10000, 8000), stats.hypergeom.logpmf(k, 20000, 10000, 8000),
+                       rtol=1e-12)
@@ -0,0 +1,76 @@
+import io
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+import utils.moments
+from utils.moments import Moments, array_chunks, paired_differences, read_number_chunks
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).normal(1e6, 3.0, 10_001)
+
+
+def assert_moments(moments, values):
+    assert moments.count == len(values)
+    assert np.allclose(moments.mean, values.mean(axis=0), rtol=1e-14)
+    assert np.allclose(moments.variance(), values.var(axis=0, ddof=1), rtol=1e-10)
+
+
+def test_chunks_of_any_size(values):
+    for chunk_values in (1, 7, 1000, len(values)):
+        assert_moments(Moments.from_chunks(array_chunks(values, chunk_values)), values)
+
+
+def test_empty_chunks_change_nothing(values):
+    assert_moments(Moments.from_chunks([values[:0], values, values[:0]]), values)
+
+
+def test_merge_order_does_not_matter(values):
+    parts = [Moments.from_values(part) for part in np.split(values, [1, 100, 5000, 5001])]
+    for order in permutations(parts):
+        assert_moments(Moments.combine(order), values)
+    # A tree of merges, like worker processes reduced pairwise
+    assert_moments((parts[0] + parts[1]) + (parts[2] + (parts[3] + parts[4])), values)
+
+
+def test_columns_of_2d_chunks(values):
+    table = values.reshape(-1, 1) * [1.0, -2.0, 0.5] + [0.0, 1.0, 2.0]
+    assert_moments(Moments.from_chunks(array_chunks(table, 333)), table)
+
+
+def test_from_summary_matches_the_values(values):
+    summary = Moments.from_summary(len(values), values.mean(), values.std(ddof=1))
+    assert_moments(summary, values)
+
+
+def test_paired_differences_need_aligned_chunks():
+    a, b = np.arange(10.0), np.arange(10.0) ** 2
+    differences = np.concatenate(list(paired_differences(array_chunks(a, 3), array_chunks(b, 3))))
+    assert np.array_equal(differences, a - b)
+    with pytest.raises(ValueError):
+        list(paired_differences(array_chunks(a, 3), array_chunks(b[:-1], 3)))
+
+
+@pytest.mark.parametrize("read_bytes", [1, 2, 3, 5, 64])
+def test_numbers_split_across_blocks(monkeypatch, read_bytes):
+    # Multibyte separators (no-break and em spaces) and a byte order mark, cut at every block size
+    monkeypatch.setattr(utils.moments, "READ_BYTES", read_bytes)
+    text = "﻿1.5, -2e3;3\n\n4 5  6.25,7"
+    chunks = list(read_number_chunks(io.BytesIO(text.encode()), chunk_values=3))
+    assert [chunk.tolist() for chunk in chunks] == [[1.5, -2000.0, 3.0], [4.0, 5.0, 6.25], [7.0]]
+
+
+def test_text_streams_and_paths(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils.moments, "READ_BYTES", 4)
+    path = tmp_path / "numbers.txt"
+    path.write_text("10, 20, 30\n40", encoding="utf-8")
+    for source in (io.StringIO("10, 20, 30\n40"), path, str(path)):
+        assert np.concatenate(list(read_number_chunks(source, chunk_values=2))).tolist() == [10, 20, 30, 40]
+
+
+def test_not_a_number():
+    with pytest.raises(ValueError):
+        list(read_number_chunks(io.BytesIO(b"1, two, 3")))
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+
+def curve_family_frame(x, y, params):
+    """
+    Long-format frame of a curve family.
+
+    Parameters:
+        x (ndarray): Curve points, shape (..., points) or (points,).
+        y (ndarray): Curve values, shape (..., points), one leading axis per parameter.
+        params (dict): Parameter name -> values along the matching leading axis of y.
+    """
+    y = np.asarray(y, dtype=np.float32)
+    x = np.broadcast_to(np.asarray(x, dtype=np.float32), y.shape)
+    grids = np.meshgrid(*params.values(), np.arange(y.shape[-1]), indexing="ij")
+    columns = {name: np.round(grid.ravel(), 6).astype(np.float32) for name, grid in zip(params, grids[:-1])}
+    columns["x"] = x.ravel()
+    columns["y"] = y.ravel()
+    return pd.DataFrame(columns)
+
+
+def sweep_chart_spec(sliders, x_title, y_title, family_label, static_label=None, title=None):
+    """
+    Vega-Lite spec that filters a curve family by browser-side sliders.
+
+    The whole family is sent once, and moving a slider only re-filters the data in the
+    browser, so no script rerun or new image is needed per tick.
+
+    Parameters:
+        sliders (dict): Parameter name -> dict(min, max, step, value, label).
+        family_label (str): Legend entry of the swept curve.
+        static_label (str): Legend entry of rows without parameters, always shown.
+    """
+    params = []
+    conditions = []
+    for name, slider in sliders.items():
+        params.append({
+            "name": name,
+            "value": slider["value"],
+            "bind": {"input": "range", "min": slider["min"], "max": slider["max"],
+                     "step": slider["step"], "name": slider["label"] + " "},
+        })
+        conditions.append(f"abs(datum['{name}'] - {name}) < {slider['step'] / 2}")
+
+    encoding = {
+        "x": {"field": "x", "type": "quantitative", "title": x_title},
+        "y": {"field": "y", "type": "quantitative", "title": y_title},
+        "color": {"field": "curve", "type": "nominal", "title": None},
+    }
+    layers = [{
+        "transform": [{"filter": f"datum.curve == '{family_label}' && " + " && ".join(conditions)}],
+        "mark": {"type": "line", "strokeWidth": 2},
+        "encoding": encoding,
+    }]
+    if static_label is not None:
+        layers.insert(0, {
+            "transform": [{"filter": f"datum.curve == '{static_label}'"}],
+            "mark": {"type": "line", "strokeWidth": 2},
+            "encoding": encoding,
+        })
+
+    spec = {"params": params, "layer": layers, "height": 400}
+    if title is not None:
+        spec["title"] = title
+    return spec
+
+
+def sweep_data(family, family_label, static=None, static_label=None):
+    """
+    Join the swept family and an optional static curve into one payload with a "curve" column.
+    """
+    family = family.assign(curve=family_label)
+    if static is None:
+        return family
+    return pd.concat([family, static.assign(curve=static_label)], ignore_index=True)
+
+
+def histogram_spec(counts, edges, title, x_title, color):
+    """
+    Vega-Lite spec of a histogram from precomputed counts and bin edges, with the data inline.
+
+    Only the bins are sent and the browser draws them, so the chart is ready without
+    rendering an image (e.g. for previews of a running simulation).
+    """
+    values = [{"start": float(start), "end": float(end), "count": int(count)}
+              for start, end, count in zip(edges[:-1], edges[1:], counts)]
+    return {
+        "data": {"values": values},
+        "title": title,
+        "mark": {"type": "bar", "color": color, "opacity": 0.6},
+        "encoding": {
+            "x": {"field": "start", "type": "quantitative", "bin": {"binned": True}, "title": x_title},
+            "x2": {"field": "end"},
+            "y": {"field": "count", "type": "quantitative", "title": "Frequency"},
+        },
+        "width": 420,
+        "height": 300,
+    }
+
+
+def interval_spec(index, lower, upper, center, covers, reference, title):
+    """
+    Vega-Lite spec of intervals as vertical rules with their centers, colored by whether they
+    cover the reference value drawn as a horizontal rule. Data is inline.
+    """
+    values = [{"index": int(i), "lower": float(lo), "upper": float(hi), "center": float(c), "covers": bool(ok)}
+              for i, lo, hi, c, ok in zip(index, lower, upper, center, covers)]
+    color = {"field": "covers", "type": "nominal", "title": "Includes Mean",
+             "scale": {"domain": [True, False], "range": ["green", "red"]}}
+    return {
+        "title": title,
+        "layer": [
+            {
+                "data": {"values": values},
+                "mark": "rule",
+                "encoding": {
+                    "x": {"field": "index", "type": "quantitative", "title": "Sample Index"},
+                    "y": {"field": "lower", "type": "quantitative", "title": "Value"},
+                    "y2": {"field": "upper"},
+                    "color": color,
+                },
+            },
+            {
+                "data": {"values": values},
+                "mark": {"type": "point", "filled": True, "size": 20},
+                "encoding": {
+                    "x": {"field": "index", "type": "quantitative"},
+                    "y": {"field": "center", "type": "quantitative"},
+                    "color": color,
+                },
+            },
+            {
+                "data": {"values": [{"reference": float(reference)}]},
+                "mark": {"type": "rule", "strokeDash": [6, 4], "color": "black"},
+                "encoding": {"y": {"field": "reference", "type": "quantitative"}},
+            },
+        ],
+        "height": 400,
+    }
@@ -0,0 +1,459 @@
+"""
+Tests of many 2x2 contingency tables at once, e.g. one table per metric of an A/B test.
+
+Tables come as an (m, 2, 2) array of counts. The chi-square and G statistics need only
+each table's expected counts, so all tables are tested in a few array operations.
+
+Fisher's exact test sums the hypergeometric PMF of the top-left count over the counts at
+most as likely as the observed one, which scipy evaluates one table (and tens of
+microseconds per value) at a time. Here every table costs about the same, however large
+its counts: the boundary of the opposite tail is found by Newton's method on the log-PMF's
+continuous extension, and the sums run either term by term with the PMF's ratio
+recurrence, for short sums, or by the Euler-Maclaurin formula, whose integral takes a
+fixed number of quadrature nodes, for long ones. Large p-values are one minus the mass
+of the short stretch between the observed count and the opposite tail; small ones, which
+would lose their digits in that difference, are the sum of the two tails.
+"""
+from collections import namedtuple
+from math import comb, factorial
+
+import numpy as np
+from scipy import special
+
+from utils.hypothesis import TestResult
+from utils.kernels import hypergeom_logpmf
+
+# Relative difference under which a table counts as exactly as likely as the observed one.
+# Tied tables are common (e.g. mirror images) and the log-PMF is computed far more precisely
+# than this (R's fisher.test uses the same tolerance)
+FISHER_TOLERANCE = 1e-7
+
+# Tables tested at a time, bounding the memory of the (tables, nodes) arrays of a batch
+FISHER_BATCH = 1 << 14
+
+# Smallest p-value taken as 1 - the mass of the tables more likely than the observed one;
+# smaller ones are summed over the tails directly, so they keep their relative precision
+COMPLEMENT_MIN_PVALUE = 0.1
+
+# Longest stretch between the observed count and the opposite tail, in standard deviations,
+# summed for the complement (longer ones give p-values below COMPLEMENT_MIN_PVALUE)
+CENTRAL_SPAN = 6
+
+# Terms smaller than this fraction of a tail's sum end a term-by-term sum
+TAIL_PRECISION = 1e-17
+
+# Steps taken per table in the first block of a term-by-term sum; later blocks double, up to MAX_BLOCK
+FIRST_BLOCK = 16
+MAX_BLOCK = 1024
+
+# Sums expected to need more terms than this are taken by the Euler-Maclaurin formula
+WALK_STEPS = 128
+
+# Drop of the log-PMF beyond which the terms of a tail are negligible (e^-45 < 3e-20)
+TAIL_DECAY = 45
+
+# Newton iterations for the length of a tail
+DECAY_ITERATIONS = 3
+
+# Gauss-Legendre nodes and weights on [-1, 1] for the integral of a sum. Tails are cut where
+# they have decayed by TAIL_DECAY and central stretches are at most CENTRAL_SPAN standard
+# deviations long, so the integrand always has about the same shape
+QUADRATURE_NODES, QUADRATURE_WEIGHTS = np.polynomial.legendre.leggauss(24)
+
+# Bernoulli numbers B2, B4, B6, B8, and the coefficients B2j / (2j)! of the Euler-Maclaurin formula
+BERNOULLI = (1 / 6, -1 / 30, 1 / 42, -1 / 30)
+EULER_MACLAURIN = tuple(bernoulli / factorial(2 * j) for j, bernoulli in enumerate(BERNOULLI, start=1))
+
+# Smallest cell for Stirling's and the polygamma series (smaller cells use gammaln)
+STIRLING_MIN = 30
+
+# How each cell of a 2x2 table changes with its top-left count, the margins fixed
+CELL_SIGNS = (1, -1, -1, 1)
+
+# Newton iterations for the boundary of the opposite tail, and the step (in counts) that ends them
+NEWTON_ITERATIONS = 100
+NEWTON_PRECISION = 1e-6
+
+# Results of every test of the same tables
+TableTests = namedtuple("TableTests", ["chi2", "chi2_yates", "g", "fisher"])
+
+
+# Sums over the two cells of an axis are written out: numpy reductions over an axis of
+# length 2 cost more per table than the arithmetic itself
+
+def _expected(tables):
+    rows = tables[..., :, :1] + tables[..., :, 1:]
+    columns = tables[..., :1, :] + tables[..., 1:, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return rows * columns / (rows[..., :1, :] + rows[..., 1:, :])
+
+
+def _cell_sum(values):
+    return values[..., 0, 0] + values[..., 0, 1] + values[..., 1, 0] + values[..., 1, 1]
+
+
+def _chi2_sf_1(statistic):
+    # chi2_sf with one degree of freedom, as the two normal tails beyond sqrt(statistic)
+    # (about a hundred times faster than chdtrc)
+    return special.erfc(np.sqrt(statistic / 2))
+
+
+def _yates(tables, expected):
+    # Every count moves half a unit towards its expected count, but not past it
+    difference = expected - tables
+    return tables + np.sign(difference) * np.minimum(0.5, np.abs(difference))
+
+
+def chi2_2x2(tables, correction=True):
+    """
+    Pearson's chi-square test of independence of every (2, 2) table in tables.
+
+    Matches scipy.stats.chi2_contingency, with Yates' continuity correction if correction.
+    Tables with an empty row or column have no expected counts and give NaN.
+    """
+    tables = np.asarray(tables, dtype=np.float64)
+    expected = _expected(tables)
+    observed = _yates(tables, expected) if correction else tables
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = _cell_sum((observed - expected) ** 2 / expected)
+    return TestResult(statistic, _chi2_sf_1(statistic), 1)
+
+
+def gtest_2x2(tables, correction=True):
+    """
+    G-test (log-likelihood ratio test) of independence of every (2, 2) table in tables.
+
+    Matches scipy.stats.chi2_contingency with lambda_="log-likelihood", which also applies
+    Yates' correction by default.
+    """
+    tables = np.asarray(tables, dtype=np.float64)
+    expected = _expected(tables)
+    observed = _yates(tables, expected) if correction else tables
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = 2 * _cell_sum(special.xlogy(observed, observed / expected))
+    return TestResult(statistic, _chi2_sf_1(statistic), 1)
+
+
+def _log_ratio(k, step, population, successes, draws):
+    # log(pmf(k + step) / pmf(k)) of the hypergeometric distribution
+    if step > 0:
+        ratio = (successes - k) * (draws - k) / ((k + 1) * (population - successes - draws + k + 1))
+    else:
+        ratio = k * (population - successes - draws + k) / ((successes - k + 1) * (draws - k + 1))
+    return np.log(ratio)
+
+
+def _walk(k, log_pmf, step, size, population, successes, draws, lower, upper):
+    """
+    The next size values after k in direction step, and their log-PMFs (-inf outside the support).
+    """
+    start = k[:, None] + step * np.arange(size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = log_pmf[:, None] + np.cumsum(_log_ratio(start, step, population[:, None], successes[:, None],
+                                                       draws[:, None]), axis=1)
+    positions = start + step
+    inside = (positions >= lower[:, None]) & (positions <= upper[:, None])
+    return positions, np.where(inside, logs, -np.inf)
+
+
+def _walked_sum(k, step, params, count=None):
+    """
+    Sum of pmf(k + step j) / pmf(k) over j = 0 to count, term by term in blocks of steps,
+    or over every j until the terms vanish if count is None.
+    """
+    total = np.ones(k.size)
+    position, log_position = k.copy(), np.zeros(k.size)
+    remaining = np.full(k.size, np.inf) if count is None else np.asarray(count, dtype=np.float64).copy()
+    active, size = np.flatnonzero(remaining > 0), FIRST_BLOCK
+    while active.size:
+        positions, logs = _walk(position[active], log_position[active], step, size,
+                                *(param[active] for param in params))
+        terms = np.where(np.arange(1, size + 1) <= remaining[active, None], np.exp(logs), 0.0)
+        total[active] += terms.sum(axis=1)
+        position[active], log_position[active] = positions[:, -1], logs[:, -1]
+        remaining[active] -= size
+        going = (remaining[active] > 0) & (terms[:, -1] > TAIL_PRECISION * total[active])
+        active, size = active[going], min(2 * size, MAX_BLOCK)
+    return total
+
+
+def _cells(k, successes, draws, population):
+    # The cells of the table with top-left count k and the given margins
+    return k, successes - k, draws - k, population - successes - draws + k
+
+
+def _stirling_series(n):
+    # log(n!) - log(sqrt(2πn) (n/e)^n) for n >= STIRLING_MIN
+    inverse = 1 / n
+    inverse_square = inverse * inverse
+    return inverse * (1 / 12 - inverse_square * (1 / 360 - inverse_square / 1260))
+
+
+def _log_pmf_change(k, distance, margins):
+    """
+    log(pmf(k + distance) / pmf(k)) for real distance, without evaluating either PMF.
+
+    k and the margins broadcast against distance, e.g. one table per row and one distance
+    per column. The change of each cell's log(cell!) is the difference of Stirling's series,
+    written with one log1p instead of a difference of logarithms, so it keeps full precision
+    where gammaln values would cancel. Cells below STIRLING_MIN take the difference of
+    gammaln values, which is exact for them.
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    change = np.zeros(np.broadcast(k, distance).shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for cell, sign in zip(_cells(k, *margins), CELL_SIGNS):
+            cell = np.asarray(cell, dtype=np.float64)
+            moved = cell + sign * distance
+            # Factors that only depend on the table are computed once per table
+            term = ((moved + 0.5) * np.log1p(distance * (sign / cell)) + distance * (sign * (np.log(cell) - 1))
+                    + (_stirling_series(moved) - _stirling_series(cell)))
+            small = np.minimum(cell, moved) < STIRLING_MIN
+            if small.any():
+                term = np.broadcast_to(term, change.shape).copy()
+                term[small] = (special.gammaln(np.broadcast_to(moved, change.shape)[small] + 1)
+                               - special.gammaln(np.broadcast_to(cell, change.shape)[small] + 1))
+            change -= term
+    return change
+
+
+def _log_pmf_derivatives(k, count, margins, step=1):
+    """
+    Derivatives of orders 1 to count of log pmf(k + step t) in t at t = 0, for real k.
+
+    The log-PMF is minus the sum of log(cell!) over the cells, whose derivatives are polygamma
+    functions: digamma exactly, higher orders by their asymptotic series, which is exact to
+    double precision for cells of at least STIRLING_MIN (scipy's polygamma costs a hundred
+    times more).
+    """
+    derivatives = [0.0] * count
+    for cell, sign in zip(_cells(k, *margins), CELL_SIGNS):
+        x = cell + 1.0
+        direction = step * sign
+        derivatives[0] = derivatives[0] - direction * special.psi(x)
+        inverse = 1 / x
+        powers = [np.ones_like(inverse), inverse]
+        for _ in range(count + 5):
+            powers.append(powers[-1] * inverse)
+        for order in range(1, count):
+            # polygamma(order, x) * (-1) ** (order + 1)
+            series = factorial(order - 1) * powers[order] + factorial(order) / 2 * powers[order + 1]
+            for j, bernoulli in enumerate(BERNOULLI[:3], start=1):
+                series = series + bernoulli * factorial(2 * j + order - 1) / factorial(2 * j) * powers[2 * j + order]
+            derivatives[order] = derivatives[order] - direction ** (order + 1) * (-1) ** (order + 1) * series
+    return derivatives
+
+
+def _end_correction(derivatives):
+    # Sum of B2j / (2j)! times the (2j-1)-th derivative of pmf(k + step t) / pmf(k) at t = 0, from the
+    # derivatives of its logarithm (Faà di Bruno's formula for exp, as a recurrence)
+    scaled = [1.0]
+    for order in range(1, len(derivatives) + 1):
+        scaled.append(sum(comb(order - 1, j) * derivatives[j] * scaled[order - 1 - j] for j in range(order)))
+    return sum(coefficient * scaled[2 * j + 1] for j, coefficient in enumerate(EULER_MACLAURIN))
+
+
+def _euler_maclaurin_sum(k, step, margins, end, count=None):
+    """
+    Sum of pmf(k + step j) / pmf(k) over j = 0 to count, or over the tail beyond k if count is
+    None, by the Euler-Maclaurin formula: the integral of the PMF's continuous extension (by
+    Gauss-Legendre quadrature) plus corrections from its derivatives at both ends.
+
+    Accurate where the PMF is smooth on the scale of one count, i.e. for long sums over tables
+    with large cells. Also returns whether that holds at the far end (else the sum must be
+    walked), which only matters where the far end of a tail is the end of the support.
+    """
+    orders = 2 * len(EULER_MACLAURIN) - 1
+    derivatives = _log_pmf_derivatives(k, orders, margins, step)
+    distance = np.abs(end - k)
+    if count is None:
+        # Where the log-PMF has dropped by TAIL_DECAY: from its quadratic expansion, refined by
+        # Newton's method (the quadrature loses digits on stretches much longer than the decay)
+        slope, curvature = -derivatives[0], -derivatives[1]
+        length = (np.sqrt(slope * slope + 2 * TAIL_DECAY * curvature) - slope) / curvature
+        for _ in range(DECAY_ITERATIONS):
+            length = np.minimum(length, distance)
+            excess = _log_pmf_change(k, step * length, margins) + TAIL_DECAY
+            length = length - excess / _log_pmf_derivatives(k + step * length, 1, margins, step)[0]
+        count = np.minimum(np.ceil(length), distance)
+
+    t = count[:, None] * (QUADRATURE_NODES + 1) / 2
+    column = [margin[:, None] for margin in margins]
+    integral = count / 2 * (QUADRATURE_WEIGHTS * np.exp(_log_pmf_change(k[:, None], step * t, column))).sum(axis=1)
+
+    far = k + step * count
+    log_far = _log_pmf_change(k, step * count, margins)
+    smooth = np.minimum.reduce(_cells(far, *margins)) >= STIRLING_MIN
+    # Where the far end's cells are too small for the series its corrections are dropped, which
+    # only holds where its terms are negligible
+    far_derivatives = _log_pmf_derivatives(np.where(smooth, far, k), orders, margins, step)
+    far_terms = np.exp(log_far) * (0.5 + np.where(smooth, _end_correction(far_derivatives), 0.0))
+    near_terms = 0.5 - _end_correction(derivatives)
+    return integral + near_terms + far_terms, smooth | (log_far < -TAIL_DECAY)
+
+
+def _range_sums(k, step, margins, params, variance, count=None):
+    """
+    Sum of pmf(k + step j) / pmf(k) over j = 0 to count, or over the tail beyond k (at or
+    beyond the mode in direction step) if count is None.
+
+    Sums expected to need more than WALK_STEPS terms take constant time by the Euler-Maclaurin
+    formula; shorter ones (and those over small cells) are summed term by term.
+    """
+    if count is None:
+        slope = -_log_pmf_derivatives(k, 1, margins, step)[0]
+        # Steps until the log-PMF drops by TAIL_DECAY, from its slope at k and the variance
+        steps = variance * (np.sqrt(slope * slope + 2 * TAIL_DECAY / variance) - slope)
+    else:
+        steps = count
+    long = np.flatnonzero((steps > WALK_STEPS) & (np.minimum.reduce(_cells(k, *margins)) >= STIRLING_MIN))
+
+    sums = np.empty(k.size)
+    walked = np.ones(k.size, dtype=bool)
+    if long.size:
+        end = params[4] if step > 0 else params[3]
+        sums[long], smooth = _euler_maclaurin_sum(k[long], step, [margin[long] for margin in margins], end[long],
+                                                  None if count is None else count[long])
+        walked[long[smooth]] = False
+    walked = np.flatnonzero(walked)
+    sums[walked] = _walked_sum(k[walked], step, [param[walked] for param in params],
+                               None if count is None else count[walked])
+    return sums
+
+
+def _opposite_boundary(a, margins, upper):
+    """
+    Smallest count above a (itself below the mode) that is at most as likely as a, up to
+    FISHER_TOLERANCE, or upper + 1 if there is none, and log(pmf(boundary) / pmf(a)).
+
+    Found by Newton's method on the log-PMF's continuous extension, which is concave, so
+    iterates starting beyond the root approach it monotonically.
+    """
+    log_tolerance = np.log1p(FISHER_TOLERANCE)
+
+    def excess(k, tables):
+        # log(pmf(k) / pmf(a)) beyond the tie threshold (<= 0 for counts at most as likely as a)
+        return _log_pmf_change(a[tables], k - a[tables], [margin[tables] for margin in margins]) - log_tolerance
+
+    everything = np.arange(a.size)
+    successes, draws, population = margins
+    mean = successes * draws / population
+    # The mirror image of a about the mean, pushed further out for the skewness, else the end of the support
+    guess = np.clip(2.25 * mean - 1.25 * a + 1, a + 1, upper)
+    guess = np.where(excess(guess, everything) > 0, upper, guess)
+
+    boundary = upper + 1
+    active = np.flatnonzero(excess(upper, everything) <= 0)
+    found, x = active, guess[active]
+    for _ in range(NEWTON_ITERATIONS):
+        step = excess(x, active) / _log_pmf_derivatives(x, 1, [margin[active] for margin in margins])[0]
+        x -= step
+        going = step > NEWTON_PRECISION
+        guess[active] = x
+        active, x = active[going], x[going]
+        if not active.size:
+            break
+
+    # The first count at or beyond the root, corrected where rounding put it one off
+    boundary[found] = np.clip(np.ceil(guess[found]), a[found] + 1, upper[found])
+    for _ in range(2):
+        inner = found[boundary[found] - 1 > a[found]]
+        inner = inner[excess(boundary[inner] - 1, inner) <= 0]
+        boundary[inner] -= 1
+        outer = found[boundary[found] <= upper[found]]
+        outer = outer[excess(boundary[outer], outer) > 0]
+        boundary[outer] += 1
+
+    log_change = np.full(a.size, -np.inf)
+    inside = np.flatnonzero(boundary <= upper)
+    log_change[inside] = excess(boundary[inside], inside) + log_tolerance
+    return boundary, log_change
+
+
+def _fisher_pvalues(a, b, c, d):
+    # Two-sided p-values of tables without an empty row or column
+    successes, draws = a + b, a + c
+    population = successes + c + d
+    mode = np.floor((draws + 1) * (successes + 1) / (population + 2))
+    # Swapping the columns mirrors the distribution and keeps the p-value, so every observed
+    # count can be taken below the mode: the opposite tail is above it
+    above = a > mode
+    a, c = np.where(above, b, a), np.where(above, d, c)
+    draws = a + c
+    mode = np.floor((draws + 1) * (successes + 1) / (population + 2))
+
+    pvalue = np.ones(a.size)
+    # Counts at the mode are the most likely: every table counts and the p-value is 1
+    tested = np.flatnonzero(a < mode)
+    a, successes, draws, population = a[tested], successes[tested], draws[tested], population[tested]
+    margins = successes, draws, population
+    lower, upper = np.maximum(0, draws - (population - successes)), np.minimum(successes, draws)
+    params = population, successes, draws, lower, upper
+    fraction = successes / population
+    variance = draws * fraction * (1 - fraction) * (population - draws) / np.maximum(population - 1, 1)
+
+    boundary, log_change = _opposite_boundary(a, margins, upper)
+    exact = np.exp(hypergeom_logpmf(a, population, successes, draws))
+    result = np.empty(a.size)
+
+    def subset(tables):
+        return [margin[tables] for margin in margins], [param[tables] for param in params], variance[tables]
+
+    # 1 - the mass of the counts between a and the boundary: a short sum for most tables
+    span = boundary - a - 1
+    central = np.flatnonzero(span <= CENTRAL_SPAN * np.sqrt(variance))
+    sums = _range_sums(a[central], 1, *subset(central), count=span[central])
+    result[central] = 1 - exact[central] * (sums - 1)
+
+    # Small p-values as the sum of both tails
+    tails = np.setdiff1d(np.arange(a.size), central[result[central] >= COMPLEMENT_MIN_PVALUE])
+    observed_tail = _range_sums(a[tails], -1, *subset(tails))
+    opposite_tail = np.zeros(tails.size)
+    inside = np.flatnonzero(boundary[tails] <= upper[tails])
+    opposite_tail[inside] = np.exp(log_change[tails[inside]]) * _range_sums(
+        boundary[tails[inside]], 1, *subset(tails[inside]))
+    result[tails] = exact[tails] * (observed_tail + opposite_tail)
+
+    pvalue[tested] = np.clip(result, 0.0, 1.0)
+    return pvalue
+
+
+def fisher_exact_2x2(tables):
+    """
+    Two-sided Fisher's exact test of every (2, 2) table in tables.
+
+    Matches scipy.stats.fisher_exact: the p-value is the probability, given the margins,
+    of all tables at most as likely as the observed one, and the statistic is the sample
+    odds ratio (NaN for tables with an empty row or column, whose p-value is 1).
+
+    Raises ValueError if a count isn't a non-negative whole number.
+    """
+    tables = np.asarray(tables, dtype=np.float64).reshape(-1, 2, 2)
+    if not ((tables >= 0) & (tables == np.floor(tables)) & np.isfinite(tables)).all():
+        raise ValueError("Counts must be non-negative whole numbers")
+    a, b, c, d = tables[:, 0, 0], tables[:, 0, 1], tables[:, 1, 0], tables[:, 1, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        odds_ratio = np.where((b > 0) & (c > 0), a * d / (b * c), np.inf)
+    empty = (a + b == 0) | (c + d == 0) | (a + c == 0) | (b + d == 0)
+    odds_ratio[empty] = np.nan
+
+    pvalue = np.ones(a.size)
+    tested = np.flatnonzero(~empty)
+    for start in range(0, tested.size, FISHER_BATCH):
+        batch = tested[start:start + FISHER_BATCH]
+        pvalue[batch] = _fisher_pvalues(a[batch], b[batch], c[batch], d[batch])
+    return TestResult(odds_ratio, pvalue, None)
+
+
+def analyze_2x2(tables):
+    """
+    Chi-square (without and with Yates' correction), G- and Fisher's exact test of every table.
+
+    Args:
+        tables (array_like): Counts of shape (m, 2, 2).
+
+    Returns:
+        TableTests of TestResults, each with one statistic and p-value per table.
+    """
+    return TableTests(chi2_2x2(tables, correction=False), chi2_2x2(tables, correction=True),
+                      gtest_2x2(tables, correction=False), fisher_exact_2x2(tables))
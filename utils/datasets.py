@@ -0,0 +1,237 @@
+"""
+Numeric columns of uploaded datasets (CSV, text, Parquet, Arrow IPC and .npy files).
+
+Files are parsed by Arrow's vectorized, multithreaded readers straight into columnar
+buffers, and each column is handed to numpy as a view of those buffers where its type
+allows (numeric, one chunk), so no value is copied after parsing. Columns with missing
+values are left out, since they could only be used by dropping rows, which would misalign
+them with the other columns.
+Arrow IPC and .npy files need no parsing at all: their columns are views of the uploaded
+bytes, or of a memory map when read from disk. Uploads are parsed once per content,
+keyed by a hash of their bytes, so reruns of a page reuse the columns.
+"""
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.parquet
+import streamlit as st
+
+from utils.moments import CHUNK_VALUES, SEPARATORS, read_number_chunks
+
+# File types accepted by dataset_uploader
+UPLOAD_TYPES = ["csv", "txt", "parquet", "arrow", "feather", "ipc", "npy"]
+
+# Uploads whose columns are kept, shared by every session
+MAX_UPLOADS = 16
+
+
+def parse_numbers(text):
+    """
+    Numbers separated by commas, semicolons or whitespace, e.g. typed in a text input.
+
+    Raises ValueError if a token isn't a number.
+    """
+    # Separators at either end (e.g. "1, 2," pasted from a spreadsheet) leave empty tokens
+    tokens = [token for token in SEPARATORS.split(text) if token]
+    return np.array(tokens, dtype=np.float64)
+
+
+def _table_columns(table):
+    columns, incomplete = {}, []
+    for name, column in zip(table.column_names, table.columns):
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+                or pa.types.is_boolean(column.type)):
+            continue
+        if column.null_count:
+            incomplete.append(str(name))
+            continue
+        if column.num_chunks == 1:
+            # A view of the Arrow buffer, unless the type needs converting (booleans)
+            values = column.chunk(0).to_numpy(zero_copy_only=False)
+        else:
+            values = column.to_numpy()
+        columns[str(name)] = values
+    return columns, incomplete
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _read_csv(source):
+    table = pa.csv.read_csv(source)
+    if all(_is_number(name) for name in table.column_names):
+        # A header of numbers is the first row of a file without a header
+        source.seek(0)
+        table = pa.csv.read_csv(source, read_options=pa.csv.ReadOptions(autogenerate_column_names=True))
+        table = table.rename_columns([f"column {i + 1}" for i in range(table.num_columns)])
+    return table
+
+
+def _read_text(source):
+    # Numbers separated like in a text input, or else a CSV table (e.g. with a header)
+    try:
+        chunks = list(read_number_chunks(source))
+    except ValueError:
+        source.seek(0)
+        return _table_columns(_read_csv(source))
+    return {"values": np.concatenate(chunks) if chunks else np.empty(0)}, []
+
+
+def _array_columns(array):
+    if array.dtype.names:
+        return {name: array[name] for name in array.dtype.names}
+    if array.ndim == 1:
+        return {"values": array}
+    array = array.reshape(array.shape[0], -1)
+    return {f"column {i + 1}": array[:, i] for i in range(array.shape[1])}
+
+
+def _read_npy(source):
+    version = np.lib.format.read_magic(source)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(source)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(source)
+    if dtype.hasobject:
+        raise ValueError("Arrays of Python objects are not supported")
+    count = int(np.prod(shape))
+    array = np.frombuffer(source.read_buffer(), dtype=dtype, count=count)
+    return array.reshape(shape, order="F" if fortran_order else "C")
+
+
+def _read_columns(source, suffix):
+    """
+    Numeric columns of a dataset read from an Arrow input stream, by file suffix, and the
+    names of the numeric columns left out for missing values.
+    """
+    if suffix == "npy":
+        columns, incomplete = _array_columns(_read_npy(source)), []
+    elif suffix == "csv":
+        columns, incomplete = _table_columns(_read_csv(source))
+    elif suffix == "txt":
+        columns, incomplete = _read_text(source)
+    elif suffix == "parquet":
+        columns, incomplete = _table_columns(pa.parquet.read_table(source))
+    elif suffix in ("arrow", "feather", "ipc"):
+        try:
+            table = pa.ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            # Not the random-access file format: read it as a stream
+            source.seek(0)
+            table = pa.ipc.open_stream(source).read_all()
+        columns, incomplete = _table_columns(table)
+    else:
+        raise ValueError(f"Unsupported file type: .{suffix}")
+
+    for values in columns.values():
+        # Columns are shared between reruns and sessions, and may be views of a file
+        values.flags.writeable = False
+    return columns, incomplete
+
+
+@st.cache_resource(max_entries=MAX_UPLOADS, show_spinner="Reading dataset...")
+def _read_upload(digest, suffix, _buffer):
+    # The uploaded bytes aren't hashed by Streamlit (the leading underscore); digest identifies them
+    return _read_columns(pa.BufferReader(_buffer), suffix)
+
+
+def read_upload(uploaded_file):
+    """
+    Numeric columns of a file uploaded with st.file_uploader, as read-only numpy arrays.
+
+    Returns:
+        columns (dict): Column name to 1-D array, in the file's order.
+        incomplete (list): Names of the numeric columns left out for missing values.
+    """
+    buffer = uploaded_file.getbuffer()
+    digest = hashlib.blake2b(buffer, digest_size=16).hexdigest()
+    suffix = Path(uploaded_file.name).suffix.lstrip(".").lower()
+    return _read_upload(digest, suffix, pa.py_buffer(buffer))
+
+
+def read_file(path):
+    """
+    Numeric columns of a dataset on disk, as read-only numpy arrays, and the names of the
+    numeric columns left out for missing values (like read_upload).
+
+    Arrow IPC and .npy files are memory-mapped, so their columns are only read from disk
+    as they're used, and can be larger than memory when streamed (see utils.moments).
+    """
+    path = Path(path)
+    with pa.memory_map(str(path)) as source:
+        return _read_columns(source, path.suffix.lstrip(".").lower())
+
+
+def table_chunks(columns, rows=None, chunk_values=CHUNK_VALUES):
+    """
+    Blocks of rows of several columns as 2-D arrays, one column per column, for Moments.from_chunks.
+
+    Only one block of about chunk_values values is copied out of the columns at a time,
+    so a wide table is reduced column by column in one pass over its rows.
+
+    Args:
+        columns (list): Equally long 1-D arrays, e.g. values of the dict from read_upload.
+        rows (ndarray | None): Boolean mask of the rows to include, e.g. one group of an experiment.
+    """
+    length = len(columns[0]) if columns else 0
+    step = max(1, chunk_values // max(1, len(columns)))
+    for start in range(0, length, step):
+        block = np.empty((min(step, length - start), len(columns)))
+        for i, column in enumerate(columns):
+            block[:, i] = column[start:start + step]
+        yield block if rows is None else block[rows[start:start + step]]
+
+
+def dataset_uploader(label="Or upload a dataset (CSV, Parquet, Arrow or .npy)", key=None):
+    """
+    File uploader for a dataset.
+
+    Returns:
+        columns (dict | None): The numeric columns of the uploaded file, or None without upload.
+    """
+    uploaded_file = st.file_uploader(label, type=UPLOAD_TYPES, key=key)
+    if uploaded_file is None:
+        return None
+    try:
+        columns, incomplete = read_upload(uploaded_file)
+    except (ValueError, pa.ArrowException) as error:
+        st.error(f"Could not read {uploaded_file.name}: {error}")
+        return None
+    if incomplete:
+        st.warning(f"Columns with missing values are left out: {', '.join(incomplete)}.")
+    if not columns:
+        st.error(f"{uploaded_file.name} has no numeric columns.")
+        return None
+    return columns
+
+
+def numbers_input(label, value, columns=None, index=0, key=None):
+    """
+    Numbers typed in a text input, or, with an uploaded dataset, one of its columns.
+
+    Args:
+        label (str): Label of the input, e.g. "Group 1 Data".
+        value (str): Default text, e.g. "1, 2, 3".
+        columns (dict | None): Columns from dataset_uploader to choose from instead of typing.
+        index (int): Column selected by default, wrapping around if there are fewer columns.
+
+    Returns:
+        values (ndarray | None): The numbers, or None (with an error shown) if the text isn't numbers.
+    """
+    if columns:
+        names = list(columns)
+        return columns[st.selectbox(f"{label} (column)", names, index=index % len(names), key=key)]
+    text = st.text_input(f"{label} (comma-separated)", value, key=key)
+    try:
+        return parse_numbers(text)
+    except ValueError:
+        st.error(f"{label}: enter numbers separated by commas.")
+        return None
@@ -0,0 +1,73 @@
+"""
+PMF and CDF of discrete distributions with very large parameters, reduced for plotting.
+
+A binomial with n = 10^7 has ten million possible values, but all of its mass lies within
+a few thousand of the mean. Only that effective support is evaluated (in log space, so no
+term underflows or overflows on the way), and when it is wider than the plot has pixels,
+neighbouring values are merged into bins. The work then grows with the standard
+deviation, not with n or λ, and the drawing stays the same size whatever the parameters.
+"""
+import numpy as np
+import streamlit as st
+
+from utils.distributions import compute
+
+# Mean and variance of the distributions with a large-parameter mode
+MOMENTS = {
+    "binomial": lambda n, p: (n * p, n * p * (1 - p)),
+    "poisson": lambda lam: (lam, lam),
+}
+
+# Standard deviations around the mean searched for mass, plus a margin for skewed small cases
+SEARCH_SDS = 10
+SEARCH_MARGIN = 10
+
+# Values with less mass than this fraction of the mode are left out of the support
+TAIL = 1e-6
+
+# Most bins drawn: about one per pixel column of one of two axes in a 14 inch figure
+MAX_BINS = 600
+
+
+def effective_support(name, **params):
+    """
+    First and last value with non-negligible mass, found from the log-PMF around the mean.
+
+    Returns:
+        k (ndarray): The values of the effective support.
+        log_pmf (ndarray): Their log-PMF.
+    """
+    mean, variance = MOMENTS[name](**params)
+    reach = SEARCH_SDS * np.sqrt(variance) + SEARCH_MARGIN
+    upper = params["n"] if name == "binomial" else np.inf
+    start, stop = max(0, np.floor(mean - reach)), min(upper, np.ceil(mean + reach))
+    k = np.arange(start, stop + 1)
+    log_pmf = compute(name, "logpmf", k, **params)
+
+    kept = np.flatnonzero(log_pmf >= log_pmf.max() + np.log(TAIL))
+    kept = slice(kept[0], kept[-1] + 1)
+    return k[kept], log_pmf[kept]
+
+
+@st.cache_data(max_entries=128)
+def binned_distribution(name, max_bins=MAX_BINS, **params):
+    """
+    PMF and CDF over the effective support, merged into at most max_bins bins of equal width.
+
+    Returns:
+        edges (ndarray): Bin edges, halfway between integers, one more than the bins.
+        pmf (ndarray): Mean PMF of the values in each bin (the PMF itself for bins of width 1).
+        last (ndarray): Last value of each bin.
+        cdf (ndarray): CDF at the last value of each bin.
+    """
+    k, log_pmf = effective_support(name, **params)
+    width = int(np.ceil(k.size / max_bins))
+    starts = np.arange(0, k.size, width)
+    counts = np.diff(np.append(starts, k.size))
+    # Summed relative to the mode, so the exponentials stay in range whatever the parameters
+    peak = log_pmf.max()
+    pmf = np.add.reduceat(np.exp(log_pmf - peak), starts) * np.exp(peak) / counts
+
+    edges = np.append(k[starts], k[-1] + 1) - 0.5
+    last = k[starts + counts - 1]
+    return edges, pmf, last, compute(name, "cdf", last, **params)
@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+import numpy as np
+import streamlit as st
+from scipy import stats
+
+from utils.kernels import KERNELS
+
+# A registered distribution: the scipy object, a converter from the page's
+# parametrisation to scipy's, and whether it has a PMF instead of a PDF
+Distribution = namedtuple("Distribution", ["scipy", "convert", "discrete"])
+
+REGISTRY = {}
+
+
+def register(name, scipy_dist, convert, discrete=False):
+    """
+    Add a distribution to the registry under name.
+    """
+    REGISTRY[name] = Distribution(scipy_dist, convert, discrete)
+
+
+register("normal", stats.norm, lambda mu, sigma: {"loc": mu, "scale": sigma})
+register("uniform", stats.uniform, lambda a, b: {"loc": a, "scale": b - a})
+register("lognormal", stats.lognorm, lambda mu, sigma: {"s": sigma, "scale": np.exp(mu)})
+register("pareto", stats.pareto, lambda alpha: {"b": alpha})
+register("exponential", stats.expon, lambda rate: {"scale": 1 / rate})
+register("t", stats.t, lambda df: {"df": df})
+register("f", stats.f, lambda dfn, dfd: {"dfn": dfn, "dfd": dfd})
+register("chi2", stats.chi2, lambda df: {"df": df})
+register("bernoulli", stats.bernoulli, lambda p: {"p": p}, discrete=True)
+register("binomial", stats.binom, lambda n, p: {"n": n, "p": p}, discrete=True)
+register("poisson", stats.poisson, lambda lam: {"mu": lam}, discrete=True)
+register("hypergeom", stats.hypergeom,
+         lambda population, successes, draws: {"M": population, "n": successes, "N": draws}, discrete=True)
+
+
+def compute(name, function, x, **params):
+    """
+    Evaluate a registered distribution's "pdf", "pmf", "cdf", "sf" or "ppf" at x, without memoizing.
+
+    For callers that evaluate many small intermediate arrays and cache their own result.
+    Functions with a closed-form kernel in utils.kernels skip scipy.stats; the rest go
+    through the scipy distribution.
+    """
+    params = {key: np.asarray(value) for key, value in params.items()}
+    kernel = KERNELS.get((name, function))
+    if kernel is not None:
+        return kernel(np.asarray(x, dtype=np.float64), **params)
+    dist = REGISTRY[name]
+    return getattr(dist.scipy, function)(np.asarray(x), **dist.convert(**params))
+
+
+def support(name, **params):
+    """
+    Lower and upper end of a registered distribution's support for the given parameters.
+    """
+    dist = REGISTRY[name]
+    return dist.scipy.support(**dist.convert(**{key: np.asarray(value) for key, value in params.items()}))
+
+
+@st.cache_data(max_entries=512)
+def evaluate(name, function, x, **params):
+    """
+    Evaluate a registered distribution's "pdf", "pmf", "cdf", "sf" or "ppf" at x.
+
+    Parameters broadcast against x, so several parameter sets are evaluated in one call,
+    e.g. mu=[[0], [1]] with a 1-D x gives one row per distribution. Results are memoized
+    on the distribution, function, x and parameters, and shared by every session.
+    """
+    return compute(name, function, x, **params)
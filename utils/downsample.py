@@ -0,0 +1,72 @@
+"""
+Reduce large series to about the number of pixels they are drawn on.
+
+A figure shown 14 inches wide is about 1400 pixels across, so drawing more points or
+intervals than that only costs rendering time. The reductions keep what stands out:
+the largest-triangle-three-buckets (LTTB) selection keeps peaks and edges of curves,
+and envelopes keep the lowest and highest values of every column of intervals.
+"""
+import numpy as np
+
+# Displayed pixels per inch of figure width
+PIXELS_PER_INCH = 100
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of threshold points of the curve (x, y) chosen by largest-triangle-three-buckets.
+
+    The first and last points are kept. The others are split into threshold - 2 buckets, and
+    from each the point forming the largest triangle with the point kept before it and the
+    average of the next bucket is kept. Curves with at most threshold points are kept whole.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket i spans edges[i]:edges[i + 1]; the last point is its own final bucket
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(np.intp), n)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+
+    kept = 0
+    for i in range(threshold - 2):
+        start, stop, next_stop = edges[i], edges[i + 1], edges[i + 2]
+        average_x = x[stop:next_stop].mean()
+        average_y = y[stop:next_stop].mean()
+        area = np.abs((x[kept] - average_x) * (y[start:stop] - y[kept])
+                      - (x[kept] - x[start:stop]) * (average_y - y[kept]))
+        kept = start + int(np.argmax(area))
+        selected[i + 1] = kept
+    return selected
+
+
+def lttb(x, y, threshold):
+    """
+    The curve (x, y) reduced to threshold points with lttb_indices.
+    """
+    indices = lttb_indices(x, y, threshold)
+    return np.asarray(x)[indices], np.asarray(y)[indices]
+
+
+def interval_envelope(index, lower, upper, width):
+    """
+    Merge intervals at sorted integer positions into columns of width positions each.
+
+    Every column becomes one interval from the lowest lower bound to the highest upper
+    bound of the intervals in it, placed at the middle of the column.
+
+    Returns:
+        centers (ndarray): Position of each non-empty column.
+        lower (ndarray): Lowest lower bound per column.
+        upper (ndarray): Highest upper bound per column.
+    """
+    index = np.asarray(index)
+    if index.size == 0:
+        return np.empty(0), np.empty(0), np.empty(0)
+    columns = index // width
+    starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+    centers = columns[starts] * width + (width - 1) / 2
+    return centers, np.minimum.reduceat(lower, starts), np.maximum.reduceat(upper, starts)
@@ -0,0 +1,266 @@
+import hashlib
+import pickle
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+
+from utils.downsample import PIXELS_PER_INCH, lttb
+
+# Session state key holding this session's figures
+FIGURES_KEY = "_figures"
+
+# Reference to the index-th Axes of a FigureSpec, resolved when the spec is replayed
+AxesRef = namedtuple("AxesRef", ["index"])
+
+
+class FigureSet:
+    """
+    A Figure with its Axes and named artists, reused across reruns of one session.
+
+    Artists are created on the first call and only have their data and style replaced
+    afterwards, so a rerun skips building the figure, axes and artists again.
+    """
+
+    def __init__(self, nrows, ncols, **figure_kwargs):
+        # Figure() instead of pyplot keeps it out of pyplot's global registry,
+        # so it is freed with the session state when the session ends
+        self.figure = Figure(**figure_kwargs)
+        axes = self.figure.subplots(nrows, ncols, squeeze=False)
+        self.axes = axes[0, 0] if axes.size == 1 else axes.ravel()
+        self.artists = {}
+        # Digest of the setup calls of the last FigureSpec drawn on it
+        self.setup_key = None
+
+    def line(self, name, ax, x, y, **style):
+        """
+        Line called name on ax, created with style on first use and updated with set_data and style after.
+
+        Curves with more points than the figure is wide in pixels are reduced to that width first.
+        """
+        if np.size(x) > self.max_points():
+            x, y = lttb(x, y, self.max_points())
+        line = self.artists.get(name)
+        if line is None:
+            line, = ax.plot(x, y, **style)
+            self.artists[name] = line
+        else:
+            line.set_data(x, y)
+            line.set(**style)
+        return line
+
+    def step(self, name, ax, x, y, where="mid", **style):
+        """
+        Step line called name, like Axes.step(..., where=where).
+        """
+        return self.line(name, ax, x, y, drawstyle="steps-" + where, **style)
+
+    def max_points(self):
+        """
+        Number of points a curve needs at most: about one per pixel of the displayed figure width.
+        """
+        return int(self.figure.get_figwidth() * PIXELS_PER_INCH)
+
+    def vline(self, name, ax, x, **style):
+        """
+        Vertical line called name at x, like Axes.axvline.
+        """
+        line = self.artists.get(name)
+        if line is None:
+            line = ax.axvline(x, **style)
+            self.artists[name] = line
+        else:
+            line.set_xdata([x, x])
+            line.set(**style)
+        return line
+
+    def bars(self, name, ax, x, heights, **style):
+        """
+        Bars called name. Heights are updated in place while the number of bars stays the same.
+        """
+        bars = self.artists.get(name)
+        if bars is not None and len(bars) == len(heights):
+            for bar, position, height in zip(bars, x, heights):
+                bar.set_x(position - bar.get_width() / 2)
+                bar.set_height(height)
+            if "color" in style:
+                for bar, color in zip(bars, np.broadcast_to(to_rgba_array(style["color"]), (len(bars), 4))):
+                    bar.set_facecolor(color)
+            return bars
+        if bars is not None:
+            bars.remove()
+        bars = ax.bar(x, heights, **style)
+        self.artists[name] = bars
+        return bars
+
+    def histogram(self, name, ax, counts, edges, **style):
+        """
+        Histogram called name from precomputed counts and bin edges, drawn as one filled step patch.
+        """
+        patch = self.artists.get(name)
+        if patch is None:
+            patch = ax.stairs(counts, edges, fill=True, **style)
+            self.artists[name] = patch
+        else:
+            patch.set_data(counts, edges)
+            patch.set(**style)
+        return patch
+
+    def integer_ticks(self, ax, max_ticks=12):
+        """
+        At most max_ticks x ticks on ax, on integers at round steps: every integer of a short
+        range, thinned out for long ones.
+        """
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=max_ticks, integer=True))
+
+    def rescale(self):
+        """
+        Recompute data limits of every Axes after artists were updated.
+        """
+        for ax in np.atleast_1d(self.axes):
+            ax.relim()
+            ax.autoscale_view()
+
+    def clear(self):
+        """
+        Clear every Axes for plots that are redrawn from scratch, keeping the Figure itself.
+        """
+        for ax in np.atleast_1d(self.axes):
+            ax.clear()
+        self.artists = {}
+
+    def draw(self, spec):
+        """
+        Replay a FigureSpec on this FigureSet.
+
+        Its setup calls only run if this FigureSet wasn't set up by the same calls before, in
+        which case it is cleared first.
+        """
+        setup_key = spec.setup_key()
+        set_up = setup_key == self.setup_key
+        if not set_up and self.setup_key is not None:
+            self.clear()
+        self.setup_key = setup_key
+        axes = np.atleast_1d(self.axes)
+        targets = {"figures": self, "figure": self.figure}
+
+        def resolve(value):
+            return axes[value.index] if isinstance(value, AxesRef) else value
+
+        for setup, target, method, args, kwargs in spec.calls:
+            if setup and set_up:
+                continue
+            obj = axes[target] if isinstance(target, int) else targets[target]
+            getattr(obj, method)(*map(resolve, args), **kwargs)
+
+
+class _Recorder:
+    """
+    Stand-in for an Axes or Figure of a FigureSpec that records method calls instead.
+    """
+
+    def __init__(self, spec, target):
+        self._spec = spec
+        self._target = target
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def record(*args, **kwargs):
+            self._spec._record(self._target, method, args, kwargs)
+        return record
+
+
+class FigureSpec:
+    """
+    Plain-data description of a figure, for drawing it somewhere else (e.g. a render worker).
+
+    It is written like a FigureSet: figure-level methods (line, bars, rescale, ...) and the
+    methods of .axes and .figure are recorded with their arguments instead of being run.
+    Calls made inside `with spec.setup():` are only replayed on a FigureSet that wasn't set
+    up by the same calls yet, like the `if created:` blocks of session figures. Since it holds only names, numbers and arrays,
+    a spec pickles cheaply and draws the same in any process.
+    """
+
+    def __init__(self, name, nrows=1, ncols=1, **figure_kwargs):
+        self.name = name
+        self.layout = (nrows, ncols, figure_kwargs)
+        self.calls = []
+        self._setup = False
+        axes = [_Recorder(self, index) for index in range(nrows * ncols)]
+        self.axes = axes[0] if len(axes) == 1 else axes
+        self.figure = _Recorder(self, "figure")
+
+    @contextmanager
+    def setup(self):
+        """
+        Record the calls of the with-block as setup of a new figure (titles, labels, ticks).
+        """
+        self._setup = True
+        try:
+            yield
+        finally:
+            self._setup = False
+
+    def _record(self, target, method, args, kwargs):
+        args = tuple(AxesRef(arg._target) if isinstance(arg, _Recorder) else arg for arg in args)
+        self.calls.append((self._setup, target, method, args, kwargs))
+
+    def __getattr__(self, method):
+        # FigureSet methods: line, step, vline, bars, histogram, integer_ticks, rescale, clear
+        if method.startswith("_") or not callable(getattr(FigureSet, method, None)):
+            raise AttributeError(method)
+        return _Recorder(self, "figures").__getattr__(method)
+
+    def __getstate__(self):
+        # Only the recorded calls travel; the recorders are rebuilt from the layout
+        return {"name": self.name, "layout": self.layout, "calls": self.calls}
+
+    def __setstate__(self, state):
+        nrows, ncols, figure_kwargs = state["layout"]
+        self.__init__(state["name"], nrows, ncols, **figure_kwargs)
+        self.calls.extend(state["calls"])
+
+    def setup_key(self):
+        """
+        Digest of the setup calls, identifying how a FigureSet drawing this spec is set up.
+        """
+        setup = [call[1:] for call in self.calls if call[0]]
+        return hashlib.sha1(pickle.dumps(setup)).hexdigest()
+
+    def new_figure_set(self):
+        """
+        Empty FigureSet with this spec's layout.
+        """
+        nrows, ncols, figure_kwargs = self.layout
+        return FigureSet(nrows, ncols, **figure_kwargs)
+
+
+def session_figure(key, nrows=1, ncols=1, **figure_kwargs):
+    """
+    FigureSet for key (usually the page and plot name) in the current session.
+
+    Returns:
+        figures (FigureSet): The session's FigureSet for key.
+        created (bool): True if it was created on this run.
+    """
+    # Imported here, since render workers import this module to draw FigureSpecs without Streamlit
+    import streamlit as st
+
+    figures = st.session_state.setdefault(FIGURES_KEY, {})
+    created = key not in figures
+    if created:
+        figures[key] = FigureSet(nrows, ncols, **figure_kwargs)
+    return figures[key], created
+
+
+def palette(name, n):
+    """
+    n colors from a matplotlib colormap, dark to light (like seaborn's "_d" palettes).
+    """
+    return colormaps[name](np.linspace(0.85, 0.45, n))
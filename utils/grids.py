@@ -0,0 +1,107 @@
+"""
+Evaluation grids for continuous distribution curves, fitted to each distribution.
+
+The x range is taken from quantiles instead of fixed bounds, so heavy tails are shown
+rather than cut off, and curves whose tail reaches far beyond their median switch to
+logarithmic axes. Along that range, points are only added where the curve bends: a
+coarse grid is refined by bisecting the segments around points that straight lines
+through their neighbours would miss on screen. Straight stretches (including power-law
+tails on log axes) stay coarse, so a curve needs a few dozen to a few hundred evaluations
+instead of a fixed 1000.
+"""
+import numpy as np
+import streamlit as st
+
+from utils.distributions import compute, support
+
+# Upper quantile of the range on linear axes; the lower end is the start of the support
+LINEAR_UPPER_QUANTILE = 0.99
+
+# Quantiles spanned on logarithmic axes, reaching much further into the tails
+LOG_QUANTILES = (1e-4, 1 - 1e-4)
+
+# Axes become logarithmic when the upper quantile exceeds the median by this factor
+LOG_AXIS_RATIO = 20
+
+# Points of the coarse grid the refinement starts from
+INITIAL_POINTS = 33
+
+# Largest error of the straight segments, as a fraction of the curve's height on screen
+# (about half a pixel of a 6 inch tall plot)
+TOLERANCE = 1e-3
+
+
+def curve_range(name, **params):
+    """
+    Range and scale of the x axis for plotting a continuous distribution.
+
+    Parameters broadcast like for utils.distributions.evaluate, so the range of several
+    curves drawn on the same axes is found in one call, e.g. dfn=[10, 5], dfd=[20, 2].
+
+    Returns:
+        lower (float): Start of the x range.
+        upper (float): End of the x range.
+        log (bool): True if the curves should be drawn on logarithmic axes.
+    """
+    params = {key: np.atleast_1d(value) for key, value in params.items()}
+    median, upper = compute(name, "ppf", np.array([[0.5], [LINEAR_UPPER_QUANTILE]]), **params)
+    if np.all(median > 0) and np.any(upper / median > LOG_AXIS_RATIO):
+        lower, upper = compute(name, "ppf", np.array(LOG_QUANTILES)[:, None], **params)
+        return float(lower.min()), float(upper.max()), True
+
+    lower = np.min(support(name, **params)[0])
+    if not np.isfinite(lower):
+        lower = compute(name, "ppf", 1 - LINEAR_UPPER_QUANTILE, **params).min()
+    return float(lower), float(upper.max()), False
+
+
+@st.cache_data(max_entries=512)
+def adaptive_grid(name, lower, upper, log_x=False, log_y=False, function="pdf", max_points=1000, **params):
+    """
+    Points of a distribution's curve from lower to upper, denser where it bends.
+
+    Spacing and error are measured as the curve appears on screen, i.e. in log10(x) and
+    log10(y) on logarithmic axes. No segment is split below 1/max_points of the range, so
+    singularities such as an F density at 0 are resolved like on an even grid.
+
+    Returns:
+        x (ndarray): Points of the curve, sorted.
+        y (ndarray): The distribution's function at x.
+    """
+    def to_x(u):
+        return 10.0 ** u if log_x else u
+
+    def to_screen(y):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.log10(y) if log_y else y
+
+    start, stop = (np.log10(lower), np.log10(upper)) if log_x else (lower, upper)
+    u = np.linspace(start, stop, INITIAL_POINTS)
+    y = compute(name, function, to_x(u), **params)
+    min_width = (stop - start) / max_points
+
+    while u.size < max_points:
+        v = to_screen(y)
+        finite = np.isfinite(v)
+        height = np.ptp(v[finite]) if finite.any() else 0.0
+        if height == 0:
+            break
+
+        # Distance of each interior point from the straight line through its neighbours
+        weight = (u[1:-1] - u[:-2]) / (u[2:] - u[:-2])
+        with np.errstate(invalid="ignore"):
+            error = np.abs(v[1:-1] - (v[:-2] + weight * (v[2:] - v[:-2]))) / height
+        bent = np.zeros(u.size, dtype=bool)
+        # Points next to a singularity (an infinite density) have no defined error and count as bent
+        bent[1:-1] = ~(error <= TOLERANCE)
+
+        # Split both segments around every bent point, unless they're already narrow
+        split = (bent[:-1] | bent[1:]) & (np.diff(u) > 2 * min_width)
+        split = np.flatnonzero(split)[:max_points - u.size]
+        if split.size == 0:
+            break
+        midpoints = (u[split] + u[split + 1]) / 2
+        u = np.insert(u, split + 1, midpoints)
+        y = np.insert(y, split + 1, compute(name, function, to_x(midpoints), **params))
+
+    return to_x(u), y
@@ -0,0 +1,65 @@
+import numpy as np
+from scipy import fft
+
+from utils.kernels import normal_pdf
+
+
+def binned_kde(data, gridsize=1024):
+    """
+    Gaussian kernel density of data on an even grid across its range, with Scott's bandwidth.
+
+    The data is linearly binned onto the grid and convolved with the sampled kernel by FFT,
+    so the cost is O(n + g log g) instead of O(n × g) for evaluating every point's kernel
+    at every grid point. The result matches scipy's gaussian_kde to binning accuracy.
+
+    Returns:
+        x (ndarray): Grid points from data.min() to data.max().
+        density (ndarray): Estimated density at x.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    lo, hi = data.min(), data.max()
+    x = np.linspace(lo, hi, gridsize)
+    bandwidth = data.std(ddof=1) * data.size ** (-1 / 5) if data.size > 1 else 0.0
+    if hi == lo or bandwidth == 0:
+        # A constant sample has no density; leave the curve flat
+        return x, np.zeros_like(x)
+
+    # Linear binning: each point splits its weight between its two neighbouring grid points
+    step = (hi - lo) / (gridsize - 1)
+    position = (data - lo) / step
+    left = np.minimum(position.astype(np.intp), gridsize - 2)
+    fraction = position - left
+    weights = np.bincount(left, 1 - fraction, minlength=gridsize) \
+        + np.bincount(left + 1, fraction, minlength=gridsize)
+
+    # Kernel sampled on the grid out to 4 bandwidths (or the whole grid), normalized to unit mass
+    half_width = min(int(np.ceil(4 * bandwidth / step)), gridsize - 1)
+    kernel = normal_pdf(np.arange(-half_width, half_width + 1) * step, sigma=bandwidth)
+    kernel /= kernel.sum() * step
+
+    size = fft.next_fast_len(gridsize + 2 * half_width, real=True)
+    smoothed = fft.irfft(fft.rfft(weights, size) * fft.rfft(kernel, size), size)
+    density = smoothed[half_width:half_width + gridsize] / data.size
+
+    # Round-off leaves tiny negative values where the density is zero
+    np.clip(density, 0, None, out=density)
+    return x, density
+
+
+def histogram_with_kde(data, bins=30, gridsize=1024):
+    """
+    Histogram counts and a kernel density curve of data, computed once so plots only draw them.
+
+    Like seaborn's histplot(data, bins=bins, kde=True), the density is drawn across the
+    data range and scaled to counts per bin.
+
+    Returns:
+        counts (ndarray): Number of values in each bin.
+        edges (ndarray): Bin edges, one more than counts.
+        kde_x (ndarray): Points of the density curve.
+        kde_y (ndarray): Density at kde_x in counts per bin.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    counts, edges = np.histogram(data, bins=bins)
+    kde_x, density = binned_kde(data, gridsize)
+    return counts, edges, kde_x, density * data.size * (edges[1] - edges[0])
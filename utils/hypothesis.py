@@ -0,0 +1,153 @@
+"""
+Hypothesis tests computed from sufficient statistics (utils.moments.Moments).
+
+Every test needs only the count, mean and M2 of each sample, so the data can be streamed
+through Moments in chunks and the test itself costs O(1), however large the sample.
+The results match scipy.stats' tests on the raw values (ttest_1samp, ttest_rel,
+ttest_ind, f_oneway) with two-sided p-values. When only a sample's size, mean and
+standard deviation are known, the *_from_stats functions describe it with
+Moments.from_summary; their arguments may be arrays, testing one design per element.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from utils.kernels import f_sf, normal_sf, t_sf
+from utils.moments import Moments
+
+# Result of a test: the statistic, its two-sided p-value and its degrees of freedom
+# (None for z-tests; a (between, within) pair for ANOVA)
+TestResult = namedtuple("TestResult", ["statistic", "pvalue", "df"])
+
+
+def _t_result(difference, standard_error, df):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = difference / standard_error
+    return TestResult(statistic, 2 * t_sf(np.abs(statistic), df), df)
+
+
+def _z_result(difference, standard_error):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = difference / standard_error
+    return TestResult(statistic, 2 * normal_sf(np.abs(statistic)), None)
+
+
+def ttest_1samp(moments, population_mean):
+    """
+    One-sample t-test of the sample's mean against population_mean.
+    """
+    return _t_result(moments.mean - population_mean, np.sqrt(moments.variance() / moments.count),
+                     moments.count - 1)
+
+
+def ttest_rel(differences):
+    """
+    Paired t-test, from the moments of the pairwise differences (before - after).
+    """
+    return ttest_1samp(differences, 0.0)
+
+
+def ttest_ind(a, b, equal_var=True):
+    """
+    Two-sample t-test of the means of independent samples a and b.
+
+    With equal_var the variances are pooled (Student); otherwise Welch's test with
+    Welch-Satterthwaite degrees of freedom is used.
+    """
+    if equal_var:
+        df = a.count + b.count - 2
+        pooled = (a.m2 + b.m2) / df
+        standard_error = np.sqrt(pooled * (1 / a.count + 1 / b.count))
+    else:
+        va, vb = a.variance() / a.count, b.variance() / b.count
+        standard_error = np.sqrt(va + vb)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df = (va + vb) ** 2 / (va ** 2 / (a.count - 1) + vb ** 2 / (b.count - 1))
+    return _t_result(a.mean - b.mean, standard_error, df)
+
+
+def ttest_1samp_from_stats(mean, std, nobs, population_mean):
+    """
+    One-sample t-test from the sample's mean, standard deviation (ddof=1) and size.
+    """
+    return ttest_1samp(Moments.from_summary(nobs, mean, std), population_mean)
+
+
+def ttest_rel_from_stats(mean_difference, std_difference, nobs):
+    """
+    Paired t-test from the mean and standard deviation (ddof=1) of the nobs pairwise differences.
+    """
+    return ttest_rel(Moments.from_summary(nobs, mean_difference, std_difference))
+
+
+def ttest_ind_from_stats(mean1, std1, nobs1, mean2, std2, nobs2, equal_var=True):
+    """
+    Two-sample t-test from the samples' means, standard deviations (ddof=1) and sizes.
+
+    Takes the same arguments and gives the same results as scipy.stats.ttest_ind_from_stats.
+    """
+    return ttest_ind(Moments.from_summary(nobs1, mean1, std1), Moments.from_summary(nobs2, mean2, std2),
+                     equal_var=equal_var)
+
+
+def ztest_1samp(moments, population_mean, population_std):
+    """
+    One-sample z-test of the sample's mean against population_mean, with known population_std.
+    """
+    return _z_result(moments.mean - population_mean, population_std / np.sqrt(moments.count))
+
+
+def ztest_ind(a, b, std_a, std_b):
+    """
+    Two-sample z-test of the means of independent samples with known standard deviations.
+    """
+    return _z_result(a.mean - b.mean, np.sqrt(std_a ** 2 / a.count + std_b ** 2 / b.count))
+
+
+def f_oneway(*groups):
+    """
+    One-way ANOVA F-test of equal means across the groups.
+    """
+    means = np.stack([np.asarray(group.mean, dtype=np.float64) for group in groups])
+    # Counts broadcast against the means, which have one entry per column for 2-D chunks
+    counts = np.array([group.count for group in groups], dtype=np.float64).reshape((-1,) + (1,) * (means.ndim - 1))
+    total = counts.sum()
+    grand_mean = (counts * means).sum(axis=0) / total
+    between = (counts * (means - grand_mean) ** 2).sum(axis=0)
+    within = sum(group.m2 for group in groups)
+    df_between, df_within = len(groups) - 1, int(total) - len(groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = (between / df_between) / (within / df_within)
+    return TestResult(statistic, f_sf(statistic, df_between, df_within), (df_between, df_within))
+
+
+def _adjusted(pvalues, adjust):
+    # Adjusts the finite p-values in ascending order; missing ones (NaN) stay NaN and don't count
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    adjusted = np.full(pvalues.shape, np.nan)
+    tested = np.flatnonzero(~np.isnan(pvalues))
+    order = tested[np.argsort(pvalues[tested], kind="stable")]
+    adjusted[order] = np.minimum(adjust(pvalues[order], np.arange(1, order.size + 1), order.size), 1.0)
+    return adjusted
+
+
+def holm(pvalues):
+    """
+    Holm's step-down adjusted p-values, controlling the family-wise error rate.
+
+    The i-th smallest of m p-values is scaled by m - i + 1, and adjusted p-values are
+    kept from decreasing with rank. Sorting dominates, so m tests cost O(m log m).
+    Rejecting where holm(pvalues) < alpha is Holm's procedure at level alpha.
+    """
+    return _adjusted(pvalues, lambda p, rank, m: np.maximum.accumulate(p * (m - rank + 1)))
+
+
+def benjamini_hochberg(pvalues):
+    """
+    Benjamini–Hochberg adjusted p-values (q-values), controlling the false discovery rate.
+
+    The i-th smallest of m p-values is scaled by m / i, and adjusted p-values are the
+    running minimum from the largest down. Sorting dominates, so m tests cost O(m log m).
+    Rejecting where benjamini_hochberg(pvalues) < alpha is the BH procedure at level alpha.
+    """
+    return _adjusted(pvalues, lambda p, rank, m: np.minimum.accumulate((p * m / rank)[::-1])[::-1])
@@ -0,0 +1,370 @@
+"""
+Closed-form distribution functions on numpy and scipy.special ufuncs.
+
+scipy.stats distributions validate and broadcast their arguments in Python on every call
+before reaching the same special functions, which dominates the cost for the small arrays
+and scalars the pages evaluate. These kernels call the ufuncs directly, in the pages'
+parametrisation (e.g. normal(mu, sigma), exponential(rate)), and agree with scipy.stats
+to a relative error of 1e-9 (see check_against_scipy).
+
+Parameters are assumed valid (the sliders keep them in range); values outside a
+distribution's support give a density or probability mass of 0 and a CDF of 0 or 1.
+"""
+import numpy as np
+from scipy import special
+
+_LOG_SQRT_2PI = 0.5 * np.log(2 * np.pi)
+
+
+def _support_where(inside, values):
+    """
+    values where inside is True and 0 elsewhere.
+    """
+    return np.where(inside, values, 0.0)
+
+
+# Normal(mu, sigma)
+
+def normal_pdf(x, mu=0.0, sigma=1.0):
+    z = (x - mu) / sigma
+    return np.exp(-0.5 * z * z - _LOG_SQRT_2PI) / sigma
+
+
+def normal_cdf(x, mu=0.0, sigma=1.0):
+    return special.ndtr((x - mu) / sigma)
+
+
+def normal_sf(x, mu=0.0, sigma=1.0):
+    return special.ndtr((mu - x) / sigma)
+
+
+def normal_ppf(q, mu=0.0, sigma=1.0):
+    return mu + sigma * special.ndtri(q)
+
+
+def normal_isf(q, mu=0.0, sigma=1.0):
+    return mu - sigma * special.ndtri(q)
+
+
+# Uniform(a, b)
+
+def uniform_pdf(x, a, b):
+    return _support_where((x >= a) & (x <= b), 1.0 / (b - a))
+
+
+def uniform_cdf(x, a, b):
+    return np.clip((x - a) / (b - a), 0.0, 1.0)
+
+
+def uniform_ppf(q, a, b):
+    return a + q * (b - a)
+
+
+# Log-normal(mu, sigma) of the underlying normal distribution
+
+def lognormal_pdf(x, mu, sigma):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_x = np.log(x)
+        z = (log_x - mu) / sigma
+        return _support_where(x > 0, np.exp(-0.5 * z * z - _LOG_SQRT_2PI - log_x) / sigma)
+
+
+def lognormal_cdf(x, mu, sigma):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _support_where(x > 0, special.ndtr((np.log(x) - mu) / sigma))
+
+
+def lognormal_ppf(q, mu, sigma):
+    return np.exp(mu + sigma * special.ndtri(q))
+
+
+# Pareto(alpha) with scale 1
+
+def pareto_pdf(x, alpha):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _support_where(x >= 1, alpha * np.exp(-(alpha + 1) * np.log(x)))
+
+
+def pareto_cdf(x, alpha):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _support_where(x >= 1, -np.expm1(-alpha * np.log(x)))
+
+
+def pareto_ppf(q, alpha):
+    return np.exp(-np.log1p(-q) / alpha)
+
+
+# Exponential(rate)
+
+def exponential_pdf(x, rate):
+    return _support_where(x >= 0, rate * np.exp(-rate * x))
+
+
+def exponential_cdf(x, rate):
+    return _support_where(x >= 0, -np.expm1(-rate * x))
+
+
+def exponential_sf(x, rate):
+    return np.where(x >= 0, np.exp(-rate * x), 1.0)
+
+
+def exponential_ppf(q, rate):
+    return -np.log1p(-q) / rate
+
+
+# Student's t(df)
+
+def t_pdf(x, df):
+    log_norm = special.gammaln((df + 1) / 2) - special.gammaln(df / 2) - 0.5 * np.log(df * np.pi)
+    return np.exp(log_norm - (df + 1) / 2 * np.log1p(x * x / df))
+
+
+def t_cdf(x, df):
+    return special.stdtr(df, x)
+
+
+def t_sf(x, df):
+    return special.stdtr(df, -x)
+
+
+def t_ppf(q, df):
+    return special.stdtrit(df, q)
+
+
+def t_isf(q, df):
+    return -special.stdtrit(df, q)
+
+
+# F(dfn, dfd)
+
+def f_pdf(x, dfn, dfd):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pdf = (0.5 * dfn * np.log(dfn) + 0.5 * dfd * np.log(dfd) + special.xlogy(dfn / 2 - 1, x)
+                   - (dfn + dfd) / 2 * np.log(dfd + dfn * x) - special.betaln(dfn / 2, dfd / 2))
+        return _support_where(x >= 0, np.exp(log_pdf))
+
+
+def f_cdf(x, dfn, dfd):
+    return special.fdtr(dfn, dfd, np.maximum(x, 0))
+
+
+def f_sf(x, dfn, dfd):
+    return special.fdtrc(dfn, dfd, np.maximum(x, 0))
+
+
+def f_ppf(q, dfn, dfd):
+    return special.fdtri(dfn, dfd, q)
+
+
+# Chi-square(df)
+
+def chi2_pdf(x, df):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pdf = special.xlogy(df / 2 - 1, x) - x / 2 - df / 2 * np.log(2) - special.gammaln(df / 2)
+        return _support_where(x >= 0, np.exp(log_pdf))
+
+
+def chi2_cdf(x, df):
+    return special.chdtr(df, np.maximum(x, 0))
+
+
+def chi2_sf(x, df):
+    return special.chdtrc(df, np.maximum(x, 0))
+
+
+def chi2_ppf(q, df):
+    return 2 * special.gammaincinv(df / 2, q)
+
+
+def chi2_isf(q, df):
+    return 2 * special.gammainccinv(df / 2, q)
+
+
+# Discrete distributions: the mass is 0 away from the integers of the support
+
+def bernoulli_pmf(k, p):
+    return np.where(k == 0, 1 - p, np.where(k == 1, p, 0.0))
+
+
+def bernoulli_cdf(k, p):
+    return np.where(k < 0, 0.0, np.where(k < 1, 1 - p, 1.0))
+
+
+def _stirling_error(n):
+    """
+    log(n!) - log(sqrt(2πn) (n/e)^n), the error of Stirling's formula, for n >= 1.
+    """
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        direct = special.gammaln(n + 1) - (n + 0.5) * np.log(n) + n - _LOG_SQRT_2PI
+        inverse_square = 1 / (n * n)
+        series = (1 / 12 - (1 / 360 - (1 / 1260 - (1 / 1680 - inverse_square / 1188) * inverse_square)
+                            * inverse_square) * inverse_square) / n
+    # The direct form cancels catastrophically for large n, the series converges slowly for small n
+    return np.where(n > 15, series, direct)
+
+
+def _deviance(x, mean):
+    """
+    x log(x / mean) + mean - x, accurate when x is close to mean (Loader's bd0).
+    """
+    x, mean = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(mean, dtype=np.float64))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        direct = special.xlogy(x, x / mean) + mean - x
+        # Near mean, expand in v = (x - mean) / (x + mean), used where |v| < 0.1, so the
+        # 11 terms leave a remainder below v^24 / 25
+        v = (x - mean) / (x + mean)
+        series = (x - mean) * v
+        term = 2 * x * v
+        for j in range(1, 12):
+            term = term * v * v
+            series = series + term / (2 * j + 1)
+    return np.where(np.abs(x - mean) < 0.1 * (x + mean), series, direct)
+
+
+def binomial_logpmf(k, n, p):
+    """
+    Log-PMF by Loader's saddle point expansion, accurate to full precision for n up to 10^7 and beyond,
+    where differences of gammaln values lose digits.
+    """
+    inside = (k >= 0) & (k <= n) & (k == np.floor(k))
+    q = 1 - p
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interior = (_stirling_error(n) - _stirling_error(k) - _stirling_error(n - k)
+                    - _deviance(k, n * p) - _deviance(n - k, n * q)
+                    - np.log(2 * np.pi) / 2 - np.log(k) / 2 - np.log1p(-k / n) / 2)
+        log_pmf = np.where(k == 0, special.xlog1py(n, -p), np.where(k == n, special.xlogy(n, p), interior))
+    return np.where(inside, log_pmf, -np.inf)
+
+
+def binomial_pmf(k, n, p):
+    return np.exp(binomial_logpmf(k, n, p))
+
+
+def binomial_cdf(k, n, p):
+    # bdtr loses accuracy for large n; the regularized incomplete beta function keeps it
+    k = np.floor(k)
+    with np.errstate(invalid="ignore"):
+        cdf = special.betainc(np.maximum(n - k, 1), np.clip(k, 0, n) + 1, 1 - p)
+    return np.where(k < 0, 0.0, np.where(k >= n, 1.0, cdf))
+
+
+def poisson_logpmf(k, lam):
+    """
+    Log-PMF by Loader's saddle point expansion, like binomial_logpmf.
+    """
+    inside = (k >= 0) & (k == np.floor(k))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interior = -_stirling_error(k) - _deviance(k, lam) - _LOG_SQRT_2PI - np.log(k) / 2
+        log_pmf = np.where(k == 0, -lam, interior)
+    return np.where(inside, log_pmf, -np.inf)
+
+
+def poisson_pmf(k, lam):
+    return np.exp(poisson_logpmf(k, lam))
+
+
+def poisson_cdf(k, lam):
+    k = np.floor(k)
+    return _support_where(k >= 0, special.pdtr(np.maximum(k, 0), lam))
+
+
+def hypergeom_logpmf(k, population, successes, draws):
+    """
+    Log-PMF of the number of successes among draws taken without replacement, as the ratio of
+    three binomial PMFs at p = draws / population (like R's dhyper), so it inherits their
+    saddle point accuracy instead of cancelling six gammaln values.
+    """
+    p = draws / population
+    return (binomial_logpmf(k, successes, p) + binomial_logpmf(draws - k, population - successes, p)
+            - binomial_logpmf(draws, population, p))
+
+
+def hypergeom_pmf(k, population, successes, draws):
+    return np.exp(hypergeom_logpmf(k, population, successes, draws))
+
+
+# Kernels by registered distribution name and function
+KERNELS = {
+    (name, function): globals()[f"{name}_{function}"]
+    for name, functions in {
+        "normal": ("pdf", "cdf", "sf", "ppf", "isf"),
+        "uniform": ("pdf", "cdf", "ppf"),
+        "lognormal": ("pdf", "cdf", "ppf"),
+        "pareto": ("pdf", "cdf", "ppf"),
+        "exponential": ("pdf", "cdf", "sf", "ppf"),
+        "t": ("pdf", "cdf", "sf", "ppf", "isf"),
+        "f": ("pdf", "cdf", "sf", "ppf"),
+        "chi2": ("pdf", "cdf", "sf", "ppf", "isf"),
+        "bernoulli": ("pmf", "cdf"),
+        "binomial": ("pmf", "logpmf", "cdf"),
+        "poisson": ("pmf", "logpmf", "cdf"),
+        "hypergeom": ("pmf", "logpmf"),
+    }.items()
+    for function in functions
+}
+
+
+def check_against_scipy(rtol=1e-9, atol=1e-12):
+    """
+    Compare every kernel with the registered scipy.stats distribution over a grid of points
+    and parameters, and return the kernels that disagree as {(name, function): max error}.
+
+    scipy's log-PMFs and Poisson PMF take differences of gammaln values, which lose about
+    eight digits at 10^7, so log-PMFs are compared with the log of scipy's PMF, and Poisson
+    and hypergeometric kernels are only checked where scipy is exact.
+
+    Run it with:
+
+        python -m utils.kernels
+    """
+    from utils.distributions import REGISTRY
+
+    params = {
+        "normal": {"mu": [-2.0, 0.0, 3.5], "sigma": [0.1, 1.0, 4.0]},
+        "uniform": {"a": [-1.0, 0.0], "b": [1.0, 7.5]},
+        "lognormal": {"mu": [-2.0, 0.0, 2.0], "sigma": [0.1, 1.0, 2.0]},
+        "pareto": {"alpha": [0.1, 1.0, 10.0]},
+        "exponential": {"rate": [0.1, 1.0, 10.0]},
+        "t": {"df": [1, 2, 5, 30, 100]},
+        "f": {"dfn": [1, 2, 5, 30], "dfd": [1, 2, 10, 30]},
+        "chi2": {"df": [1, 2, 3, 10, 50]},
+        "bernoulli": {"p": [0.0, 0.3, 1.0]},
+        "binomial": {"n": [1, 10, 50, 1000, 10 ** 7], "p": [0.01, 0.5, 0.99]},
+        "poisson": {"lam": [0.5, 3.0, 15.0, 200.0]},
+        "hypergeom": {"population": [100, 200, 1000], "successes": [10, 50, 100], "draws": [0, 5, 50, 100]},
+    }
+    points = np.concatenate([np.linspace(-5, 10, 301), np.linspace(10, 1000, 100), [0.0, 1.0, 1.5],
+                             # Around the modes of the largest binomial and Poisson parameters
+                             np.linspace(4.99e6, 5.01e6, 41), np.linspace(9.99e6, 1.001e7, 41)])
+    quantiles = np.concatenate([[1e-10, 1e-4], np.linspace(0.01, 0.99, 99), [1 - 1e-4]])
+
+    failures = {}
+    for (name, function), kernel in KERNELS.items():
+        dist = REGISTRY[name]
+        grids = np.meshgrid(*params[name].values(), indexing="ij")
+        args = {key: grid.ravel()[:, None] for key, grid in zip(params[name], grids)}
+        x = quantiles if function in ("ppf", "isf") else points
+        with np.errstate(all="ignore"):
+            if function == "logpmf":
+                expected = np.log(dist.scipy.pmf(x, **dist.convert(**args)))
+            else:
+                expected = getattr(dist.scipy, function)(x, **dist.convert(**args))
+            actual = kernel(x, **args)
+        close = np.isclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)
+        if function == "logpmf":
+            # Where scipy's PMF is subnormal or underflows it has few digits left to compare;
+            # the log-PMF only needs to be that small too
+            log_tiny = np.log(np.finfo(np.float64).tiny)
+            close |= (expected < log_tiny) & (actual < log_tiny + 1)
+        if not close.all():
+            with np.errstate(invalid="ignore"):
+                failures[name, function] = float(np.nanmax(np.abs(actual - expected)[~close]))
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_against_scipy()
+    for (name, function), error in failures.items():
+        print(f"{name}.{function}: max error {error:.3g}")
+    print("All kernels match scipy.stats" if not failures else f"{len(failures)} kernels differ")
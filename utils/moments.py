@@ -0,0 +1,179 @@
+"""
+Mergeable count, mean and sum of squared deviations (M2) of a stream of values.
+
+Each chunk's moments are computed with numpy and folded into the running totals with
+Chan et al.'s pairwise update (Welford's update for chunks of one value), so data is
+read once, in pieces of any size, and never held in memory as a whole. Moments of
+different chunks, files or worker processes merge exactly the same way, in any order.
+"""
+import codecs
+import re
+from functools import reduce
+from itertools import zip_longest
+
+import numpy as np
+
+# Values per chunk yielded by read_number_chunks
+CHUNK_VALUES = 1 << 20
+
+# Bytes read from a stream at a time
+READ_BYTES = 1 << 22
+
+# Separators between the numbers of a text
+SEPARATORS = re.compile(r"[\s,;]+")
+
+
+class Moments:
+    """
+    Count, mean and M2 (sum of squared deviations from the mean) of the values seen so far.
+
+    Chunks may be 1-D, or 2-D with one column per variable; the moments are then arrays
+    with one entry per column.
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_values(cls, values):
+        """
+        Moments of an array of values, reduced along its first axis.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        count = values.shape[0]
+        if count == 0:
+            return cls(0, np.zeros(values.shape[1:]), np.zeros(values.shape[1:]))
+        mean = values.mean(axis=0)
+        return cls(count, mean, ((values - mean) ** 2).sum(axis=0))
+
+    @classmethod
+    def from_summary(cls, count, mean, std=0.0):
+        """
+        Moments of a sample known only by its size, mean and standard deviation (ddof=1).
+
+        The arguments may be arrays, describing one sample per element.
+        """
+        return cls(count, mean, np.square(std) * np.maximum(np.subtract(count, 1), 0))
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """
+        Moments of all values of an iterable of chunks, in one pass.
+        """
+        moments = cls()
+        for chunk in chunks:
+            moments.update(chunk)
+        return moments
+
+    @classmethod
+    def combine(cls, parts):
+        """
+        Moments of the union of the samples described by parts (e.g. from worker processes).
+        """
+        return reduce(lambda total, part: total.merge(part), parts, cls())
+
+    def update(self, values):
+        """
+        Add a chunk of values in place.
+        """
+        merged = self.merge(Moments.from_values(values))
+        self.count, self.mean, self.m2 = merged.count, merged.mean, merged.m2
+        return self
+
+    def merge(self, other):
+        """
+        Moments of both samples together (Chan et al.'s parallel update).
+        """
+        if other.count == 0:
+            return Moments(self.count, self.mean, self.m2)
+        if self.count == 0:
+            return Moments(other.count, other.mean, other.m2)
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        mean = self.mean + delta * (other.count / count)
+        m2 = self.m2 + other.m2 + delta * delta * (self.count * other.count / count)
+        return Moments(count, mean, m2)
+
+    __add__ = merge
+
+    def variance(self, ddof=1):
+        """
+        Variance of the values, by default the unbiased sample variance.
+        """
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=1):
+        """
+        Standard deviation of the values, by default the sample standard deviation.
+        """
+        return np.sqrt(self.variance(ddof))
+
+    def __repr__(self):
+        return f"Moments(count={self.count!r}, mean={self.mean!r}, m2={self.m2!r})"
+
+
+def array_chunks(values, chunk_values=CHUNK_VALUES):
+    """
+    Consecutive views of chunk_values values of an array (e.g. a memory-mapped column).
+    """
+    for start in range(0, len(values), chunk_values):
+        yield values[start:start + chunk_values]
+
+
+def paired_differences(chunks_a, chunks_b):
+    """
+    Chunks of a - b from two aligned chunk streams, e.g. before and after values for a paired test.
+
+    Raises ValueError if one stream ends before the other.
+    """
+    missing = object()
+    for chunk_a, chunk_b in zip_longest(chunks_a, chunks_b, fillvalue=missing):
+        if chunk_a is missing or chunk_b is missing or len(chunk_a) != len(chunk_b):
+            raise ValueError("Paired samples must have the same number of values")
+        yield np.subtract(chunk_a, chunk_b)
+
+
+def read_number_chunks(source, chunk_values=CHUNK_VALUES):
+    """
+    Numbers separated by commas, semicolons or whitespace, in chunks of chunk_values values.
+
+    source is a path or a text or binary stream (UTF-8), read READ_BYTES at a time, so files
+    larger than memory can be streamed. Every chunk but the last has exactly chunk_values values,
+    so the chunks of two equally long sources line up (e.g. for a paired test).
+    """
+    if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        with open(source, "rb") as stream:
+            yield from read_number_chunks(stream, chunk_values)
+        return
+
+    pending = np.empty(0)
+    tail = ""
+    # Bytes are decoded incrementally, since a block can end inside a character; a byte order
+    # mark (as written by Excel) is dropped
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        block = source.read(READ_BYTES)
+        if isinstance(block, (bytes, bytearray, memoryview)):
+            text = tail + decoder.decode(block, final=not block)
+        else:
+            text = tail + block
+        if block:
+            # The last token may continue in the next block
+            cut = max(text.rfind(separator) for separator in ",; \t\r\n") + 1
+            text, tail = text[:cut], text[cut:]
+        else:
+            tail = ""
+
+        tokens = [token for token in SEPARATORS.split(text) if token]
+        if tokens:
+            pending = np.concatenate([pending, np.asarray(tokens, dtype=np.float64)])
+        while pending.size >= chunk_values:
+            yield pending[:chunk_values]
+            pending = pending[chunk_values:]
+        if not block:
+            break
+
+    if pending.size:
+        yield pending
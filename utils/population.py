@@ -0,0 +1,188 @@
+import atexit
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Byte budget of the process-wide cache, configurable through the environment
+DEFAULT_MAX_BYTES = int(os.environ.get("POPULATION_CACHE_BYTES", 256 * 1024 * 1024))
+
+# Size and seed of the populations drawn by the simulation pages
+POPULATION_SIZE = 10000
+POPULATION_SEED = 42
+
+# Shared blocks start with a header that their creator sets to READY_MARKER once the population
+# is written, so other processes never read a block that is still being filled
+HEADER_BYTES = 8
+READY_MARKER = b"statpop1"
+
+# How long to wait for another process to finish writing a block before drawing a private copy
+READY_TIMEOUT = 5.0
+READY_POLL = 0.01
+
+
+def _block_name(key):
+    """
+    Shared memory name derived from the cache key, so other processes can attach to the same block.
+    """
+    return "statpop_" + hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+
+
+def _attach(name):
+    """
+    Attach to an existing block without letting this process's resource tracker unlink it on exit.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    block = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+def _is_ready(block):
+    return block.size >= HEADER_BYTES and bytes(block.buf[:HEADER_BYTES]) == READY_MARKER
+
+
+def _attach_when_ready(name):
+    """
+    Attach to a block created by another process once its creator has marked it ready.
+
+    Returns None if it isn't ready within READY_TIMEOUT (e.g. its creator died while drawing).
+    """
+    deadline = time.monotonic() + READY_TIMEOUT
+    block = None
+    while True:
+        if block is None:
+            try:
+                block = _attach(name)
+            except ValueError:
+                # Created but not sized yet
+                pass
+        if block is not None and _is_ready(block):
+            return block
+        if time.monotonic() > deadline:
+            if block is not None:
+                block.close()
+            return None
+        time.sleep(READY_POLL)
+
+
+def _open_block(name, nbytes):
+    """
+    The shared block of a population, created here if no process has created it yet.
+
+    Returns:
+        block (SharedMemory | None): The block, or None if shared memory is unavailable.
+        created (bool): Whether this process created the block and must write the population.
+    """
+    try:
+        # Creation is exclusive, so exactly one process writes each population
+        return shared_memory.SharedMemory(name=name, create=True, size=nbytes), True
+    except FileExistsError:
+        pass
+    except OSError:
+        return None, False
+    try:
+        return _attach_when_ready(name), False
+    except OSError:
+        # e.g. unlinked by its creator in the meantime
+        return None, False
+
+
+class PopulationCache:
+    """
+    LRU cache of read-only population arrays backed by shared memory.
+
+    Populations are keyed by numpy Generator method, parameters, size and seed, so every
+    session (and every process on the host) reads the same array instead of drawing its own.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._retired = []
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, distribution, params, size=POPULATION_SIZE, seed=POPULATION_SEED):
+        """
+        Return a read-only population drawn with numpy.random.Generator.<distribution>(**params, size=size).
+        """
+        key = (distribution, tuple(sorted(params.items())), size, seed)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][1]
+
+            array, block = self._load(key)
+            self._entries[key] = (block, array)
+            self._nbytes += array.nbytes
+            self._evict()
+            return array
+
+    def clear(self):
+        """
+        Drop every cached population and unlink the shared memory this process created.
+        """
+        with self._lock:
+            while self._entries:
+                self._pop_oldest()
+            self._retry_retired()
+
+    def _load(self, key):
+        distribution, params, size, seed = key
+        nbytes = HEADER_BYTES + size * np.dtype(np.float64).itemsize
+        block, created = _open_block(_block_name(key), nbytes)
+
+        if block is None:
+            # No shared memory on this platform, or the block never became ready: draw a private array
+            array = self._draw(distribution, dict(params), size, seed)
+        else:
+            array = np.ndarray(size, dtype=np.float64, buffer=block.buf, offset=HEADER_BYTES)
+            if created:
+                array[:] = self._draw(distribution, dict(params), size, seed)
+                # Marked ready last, so other processes only read the complete population
+                block.buf[:HEADER_BYTES] = READY_MARKER
+            block = (block, created)
+
+        array.flags.writeable = False
+        return array, block
+
+    @staticmethod
+    def _draw(distribution, params, size, seed):
+        rng = np.random.default_rng(seed)
+        return getattr(rng, distribution)(size=size, **params)
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes and len(self._entries) > 1:
+            self._pop_oldest()
+        self._retry_retired()
+
+    def _pop_oldest(self):
+        _, (block, array) = self._entries.popitem(last=False)
+        self._nbytes -= array.nbytes
+        if block is not None:
+            shm, created = block
+            if created:
+                shm.unlink()
+            self._retired.append(shm)
+
+    def _retry_retired(self):
+        # Blocks still viewed by a running session cannot be closed yet, try again later
+        still_open = []
+        for shm in self._retired:
+            try:
+                shm.close()
+            except BufferError:
+                still_open.append(shm)
+        self._retired = still_open
+
+
+# Process-wide cache shared by all Streamlit sessions
+population_cache = PopulationCache()
+atexit.register(population_cache.clear)
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.render_cache import normalize
+
+# Seconds between two refinements of a progressive plot
+REFRESH_INTERVAL = 0.25
+
+# Number of finished simulations remembered by mark_finished
+MAX_FINISHED = 1024
+
+_finished = OrderedDict()
+_finished_lock = threading.Lock()
+
+
+def mark_finished(*key):
+    """
+    Remember that the simulation identified by key has run (and is likely cached).
+    """
+    key = normalize(key)
+    with _finished_lock:
+        _finished[key] = True
+        _finished.move_to_end(key)
+        while len(_finished) > MAX_FINISHED:
+            _finished.popitem(last=False)
+
+
+def is_finished(*key):
+    """
+    True if mark_finished was called with key, so the simulation needs no previews.
+
+    Its result may have been evicted from the cache since; it is then simply computed
+    again without previews.
+    """
+    with _finished_lock:
+        return normalize(key) in _finished
+
+
+def collect_progressively(chunks, total, show, interval=REFRESH_INTERVAL):
+    """
+    Gather chunks of a simulation into full arrays, showing intermediate results on the way.
+
+    show is called with the results gathered so far right after the first chunk, so something
+    appears as soon as possible, and then at most every interval seconds until the last chunk.
+
+    Parameters:
+        chunks (iterable): Arrays, or tuples of arrays, holding consecutive rows of the result.
+        total (int): Number of rows of the full result.
+        show (callable): Called with a prefix view of each result array.
+
+    Returns:
+        ndarray or tuple: The full result, shaped like the chunks (one empty array without chunks).
+
+    Raises ValueError if the chunks don't hold total rows.
+    """
+    results = None
+    stop = 0
+    last_shown = None
+    is_tuple = False
+    for chunk in chunks:
+        is_tuple = isinstance(chunk, tuple)
+        parts = chunk if is_tuple else (chunk,)
+        if results is None:
+            results = tuple(np.empty(total, dtype=np.float64) for _ in parts)
+        start, stop = stop, stop + parts[0].size
+        for result, part in zip(results, parts):
+            result[start:stop] = part
+
+        if stop < total and (last_shown is None or time.perf_counter() - last_shown >= interval):
+            show(*(result[:stop] for result in results))
+            last_shown = time.perf_counter()
+
+    if stop != total:
+        raise ValueError(f"The chunks hold {stop} rows instead of {total}")
+    if results is None:
+        return np.empty(0)
+    return results if is_tuple else results[0]
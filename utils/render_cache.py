@@ -0,0 +1,126 @@
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+from utils.figures import FigureSpec, session_figure
+from utils.render_pool import render_spec
+from utils.render_worker import render
+
+# Byte budget of the process-wide cache, configurable through the environment
+DEFAULT_MAX_BYTES = int(os.environ.get("RENDER_CACHE_BYTES", 64 * 1024 * 1024))
+
+
+def normalize(value):
+    """
+    Hashable, canonical form of a plot parameter.
+
+    Floats are rounded so that 0.1 + 0.2 and 0.3 share an entry, numpy scalars become
+    Python numbers, seed sequences are identified by their entropy and spawn key, and arrays
+    are reduced to their shape, dtype and a digest of their bytes.
+    """
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return ("ndarray", data.shape, data.dtype.str, hashlib.sha1(data.tobytes()).hexdigest())
+    if isinstance(value, np.random.SeedSequence):
+        return ("SeedSequence", value.entropy, value.spawn_key)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 10)
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize(item)) for key, item in value.items()))
+    return value
+
+
+class RenderCache:
+    """
+    LRU cache of rendered plot images under a byte budget, shared by every session.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._images:
+                self._nbytes -= len(self._images.pop(key))
+            self._images[key] = image
+            self._nbytes += len(image)
+            while self._nbytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._nbytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._nbytes = 0
+
+
+render_cache = RenderCache()
+
+
+def render_drawn(drawn):
+    """
+    PNG bytes of a Figure, or of a FigureSpec drawn by a render worker.
+
+    Without a worker, the spec is drawn on this session's figure of the same name instead.
+    """
+    if not isinstance(drawn, FigureSpec):
+        return render(drawn)
+    image = render_spec(drawn)
+    if image is None:
+        nrows, ncols, figure_kwargs = drawn.layout
+        figures, _ = session_figure(drawn.name, nrows, ncols, **figure_kwargs)
+        figures.draw(drawn)
+        image = render(figures.figure)
+    return image
+
+
+def show_image(key, draw):
+    """
+    Show the image cached under key, calling draw() for the Figure or FigureSpec only on a miss.
+    """
+    image = render_cache.get(key)
+    if image is None:
+        image = render_drawn(draw())
+        render_cache.put(key, image)
+    st.image(image)
+
+
+def cached_pyplot(name):
+    """
+    Decorator for functions that draw and return a Figure or a FigureSpec.
+
+    Calling the decorated function shows the plot instead of returning it. The image is
+    looked up by name and the normalized arguments first, so identical plots requested
+    by any session are served from memory and the function only runs on a miss.
+    The wrapper's is_cached(*args, **kwargs) tells whether a call would be served from memory.
+    """
+    def decorator(draw):
+        def key(args, kwargs):
+            return (name, normalize(args), normalize(kwargs))
+
+        @functools.wraps(draw)
+        def wrapper(*args, **kwargs):
+            show_image(key(args, kwargs), lambda: draw(*args, **kwargs))
+
+        wrapper.is_cached = lambda *args, **kwargs: render_cache.get(key(args, kwargs)) is not None
+        return wrapper
+    return decorator
@@ -0,0 +1,96 @@
+"""
+Worker processes that turn FigureSpecs into PNG bytes.
+
+Rasterizing holds the GIL, so figures drawn in the Streamlit process are rendered one
+at a time however many sessions are waiting. Workers are separate processes, each with
+its own matplotlib state, so plots of different sessions render in parallel on all cores.
+
+Each worker is a `python -m utils.render_worker` subprocess that reads pickled specs from
+its stdin. Unlike multiprocessing's spawn start method, this doesn't re-run the parent's
+__main__ in the worker, which under Streamlit is whichever page script is running.
+
+The number of workers is set with RENDER_WORKERS (default: one per available CPU);
+0 renders in the calling process instead.
+"""
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+# CPUs this process may run on
+AVAILABLE_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", AVAILABLE_CPUS))
+
+# Directory holding the utils package, from which workers import it
+ROOT = Path(__file__).resolve().parent.parent
+
+# Workers waiting for a spec, and the slots bounding how many render at once
+_idle_workers = queue.SimpleQueue()
+_slots = threading.BoundedSemaphore(max(RENDER_WORKERS, 1))
+
+
+class RenderError(RuntimeError):
+    """
+    A FigureSpec failed to draw in a worker.
+    """
+
+
+class _Worker:
+    """
+    One render worker process and its pipes.
+    """
+
+    def __init__(self):
+        self.process = subprocess.Popen([sys.executable, "-m", "utils.render_worker"], cwd=ROOT,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def render(self, spec):
+        pickle.dump(spec, self.process.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+        self.process.stdin.flush()
+        ok, payload = pickle.load(self.process.stdout)
+        if not ok:
+            raise RenderError(payload)
+        return payload
+
+    def close(self):
+        self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                # A request still buffered for the dead worker can't be flushed
+                pass
+
+
+def render_spec(spec):
+    """
+    PNG bytes of a FigureSpec drawn by a worker, or None if no worker is available.
+
+    Workers are started as they're first needed, up to RENDER_WORKERS at a time. A worker
+    that died is replaced on the next call. Raises RenderError if the spec fails to draw.
+    """
+    if RENDER_WORKERS <= 0:
+        return None
+    with _slots:
+        try:
+            worker = _idle_workers.get_nowait()
+        except queue.Empty:
+            try:
+                worker = _Worker()
+            except OSError:
+                return None
+        try:
+            image = worker.render(spec)
+        except RenderError:
+            _idle_workers.put(worker)
+            raise
+        except (OSError, EOFError, pickle.UnpicklingError):
+            worker.close()
+            return None
+        _idle_workers.put(worker)
+        return image
@@ -0,0 +1,68 @@
+"""
+Render worker: draws FigureSpecs read from stdin and writes their PNG bytes to stdout.
+
+utils.render_pool starts each worker as its own interpreter with `python -m utils.render_worker`,
+so a worker only imports what drawing needs: not Streamlit, and not the page script that happens
+to be running in the Streamlit process (which multiprocessing's spawn would re-run first).
+
+Requests are pickled FigureSpecs and replies pickled (ok, payload) pairs: PNG bytes, or the
+error message of a spec that failed to draw. The worker exits when stdin is closed.
+"""
+import io
+import pickle
+import sys
+
+import matplotlib
+
+# Same output as st.pyplot
+SAVEFIG_KWARGS = {"format": "png", "bbox_inches": "tight", "dpi": 200}
+
+# FigureSets of this worker by spec name and layout, reused like session figures (and set up
+# again when a spec's setup calls differ)
+_figures = {}
+
+
+def render(figure):
+    """
+    PNG bytes of a Figure, rendered like st.pyplot does.
+    """
+    buffer = io.BytesIO()
+    figure.savefig(buffer, **SAVEFIG_KWARGS)
+    return buffer.getvalue()
+
+
+def draw(spec):
+    """
+    PNG bytes of a FigureSpec, drawn on this worker's FigureSet of the same name and layout.
+    """
+    key = (spec.name, repr(spec.layout))
+    figures = _figures.get(key)
+    if figures is None:
+        figures = _figures[key] = spec.new_figure_set()
+    figures.draw(spec)
+    return render(figures.figure)
+
+
+def serve(requests, replies):
+    """
+    Answer pickled FigureSpecs from the binary stream requests on replies until requests ends.
+    """
+    while True:
+        try:
+            spec = pickle.load(requests)
+        except EOFError:
+            return
+        try:
+            reply = (True, draw(spec))
+        except Exception as error:
+            reply = (False, f"{type(error).__name__}: {error}")
+        pickle.dump(reply, replies, protocol=pickle.HIGHEST_PROTOCOL)
+        replies.flush()
+
+
+if __name__ == "__main__":
+    matplotlib.use("Agg")
+    replies = sys.stdout.buffer
+    # Anything printed while drawing goes to stderr, so stdout only carries replies
+    sys.stdout = sys.stderr
+    serve(sys.stdin.buffer, replies)
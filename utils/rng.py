@@ -0,0 +1,75 @@
+import zlib
+
+import numpy as np
+import streamlit as st
+
+# Session state key holding the root seed of the current session
+SESSION_SEED_KEY = "rng_seed"
+SEED_INPUT_KEY = "rng_seed_input"
+
+
+def session_seed():
+    """
+    Root seed of the current session, drawn from OS entropy on first use.
+    """
+    if SESSION_SEED_KEY not in st.session_state:
+        st.session_state[SESSION_SEED_KEY] = int(np.random.SeedSequence().generate_state(1)[0])
+    return st.session_state[SESSION_SEED_KEY]
+
+
+def _store_seed():
+    st.session_state[SESSION_SEED_KEY] = int(st.session_state[SEED_INPUT_KEY])
+
+
+def seed_control():
+    """
+    Sidebar input showing the session seed, so a simulation can be reproduced or redrawn.
+
+    The seed is kept under its own key, so it survives pages that don't show this input.
+    """
+    st.sidebar.number_input(
+        "Random Seed",
+        min_value=0,
+        max_value=2**32 - 1,
+        value=session_seed(),
+        step=1,
+        key=SEED_INPUT_KEY,
+        on_change=_store_seed,
+        help="Simulations in this session are reproducible for a given seed. Change it to draw new samples."
+    )
+
+
+def stream_seed(name):
+    """
+    SeedSequence of a named stream (e.g. one per page) derived from the session seed.
+
+    Different names give statistically independent streams for the same session.
+    """
+    return np.random.SeedSequence(session_seed(), spawn_key=(zlib.crc32(name.encode()),))
+
+
+def session_generator(name):
+    """
+    PCG64 Generator for a named stream of the current session.
+    """
+    return np.random.Generator(np.random.PCG64(stream_seed(name)))
+
+
+def child_generator(seed_sequence, index):
+    """
+    Generator of the index-th child of seed_sequence, as seed_sequence.spawn() would seed it.
+
+    Children can be built one at a time, in any order, without spawning all earlier ones.
+    """
+    child = np.random.SeedSequence(seed_sequence.entropy, spawn_key=seed_sequence.spawn_key + (index,),
+                                   pool_size=seed_sequence.pool_size)
+    return np.random.Generator(np.random.PCG64(child))
+
+
+def spawn_generators(seed_sequence, count):
+    """
+    Independent child Generators for parallel workers (threads or processes).
+
+    The same seed_sequence always yields the same children.
+    """
+    return [child_generator(seed_sequence, index) for index in range(count)]
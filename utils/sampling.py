@@ -0,0 +1,174 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import stats
+
+from utils.kernels import normal_cdf
+from utils.rng import child_generator
+
+# Default memory budget for one block of drawn indices (bytes)
+DEFAULT_BLOCK_BYTES = 32 * 1024 * 1024
+
+# CPUs this process may run on, an upper bound for useful sampling threads
+AVAILABLE_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+
+def _rows_per_block(sample_size, max_block_bytes):
+    """
+    Number of samples that fit in one block of int32 indices.
+    """
+    return max(1, int(max_block_bytes // (4 * sample_size)))
+
+
+def _block_generators(rng, num_blocks):
+    """
+    One Generator per block: a child stream each when given a SeedSequence, else the same Generator.
+    Child streams are created lazily, as blocks are drawn.
+    """
+    if isinstance(rng, np.random.SeedSequence):
+        return (child_generator(rng, index) for index in range(num_blocks))
+    rng = np.random.default_rng() if rng is None else rng
+    return [rng] * num_blocks
+
+
+def _draw_block(population, rows, sample_size, rng):
+    indices = rng.integers(0, population.size, size=(rows, sample_size), dtype=np.int32)
+    return population.take(indices)
+
+
+def iter_sample_blocks(population, sample_size, num_samples, rng=None, max_block_bytes=DEFAULT_BLOCK_BYTES):
+    """
+    Yield samples as (rows, sample_size) blocks drawn with replacement.
+
+    Each block is drawn in one call, so memory stays bounded by max_block_bytes
+    whatever num_samples is. rng may be a Generator or a SeedSequence; with a
+    SeedSequence every block gets its own spawned child stream.
+    """
+    population = np.asarray(population, dtype=np.float64)
+    rows = _rows_per_block(sample_size, max_block_bytes)
+    starts = range(0, num_samples, rows)
+
+    for start, generator in zip(starts, _block_generators(rng, len(starts))):
+        yield _draw_block(population, min(rows, num_samples - start), sample_size, generator)
+
+
+def iter_sample_means(population, sample_size, num_samples, rng=None, max_block_bytes=DEFAULT_BLOCK_BYTES, workers=1):
+    """
+    Yield sample means chunk by chunk, in order.
+
+    With workers > 1 and a SeedSequence, blocks are drawn on that many threads while
+    finished chunks are yielded; the spawned per-block streams keep the result
+    independent of the number of workers.
+    """
+    if workers > 1 and isinstance(rng, np.random.SeedSequence):
+        population = np.asarray(population, dtype=np.float64)
+        rows = _rows_per_block(sample_size, max_block_bytes)
+        starts = range(0, num_samples, rows)
+
+        def draw(start, generator):
+            return _draw_block(population, min(rows, num_samples - start), sample_size, generator).mean(axis=1)
+
+        # numpy releases the GIL while drawing, gathering and reducing, so the blocks run in parallel.
+        # Only a few blocks per worker are queued at a time, so the first chunk is yielded right away.
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending = deque()
+        try:
+            for start, generator in zip(starts, _block_generators(rng, len(starts))):
+                pending.append(executor.submit(draw, start, generator))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # A consumer that stops early doesn't wait for the remaining blocks
+            executor.shutdown(wait=False, cancel_futures=True)
+        return
+
+    for block in iter_sample_blocks(population, sample_size, num_samples, rng, max_block_bytes):
+        yield block.mean(axis=1)
+
+
+def iter_sample_means_and_errors(population, sample_size, num_samples, rng=None, max_block_bytes=DEFAULT_BLOCK_BYTES):
+    """
+    Yield (means, standard errors) chunk by chunk, in order. Standard errors use ddof=1.
+    """
+    for block in iter_sample_blocks(population, sample_size, num_samples, rng, max_block_bytes):
+        errors = block.std(axis=1, ddof=1) if sample_size > 1 else np.full(block.shape[0], np.nan)
+        yield block.mean(axis=1), errors / np.sqrt(sample_size)
+
+
+def sample_means(population, sample_size, num_samples, rng=None, max_block_bytes=DEFAULT_BLOCK_BYTES, workers=1):
+    """
+    Draw num_samples samples of size sample_size from population and return their means.
+
+    Parameters:
+        population (array-like): Values to resample from (with replacement).
+        sample_size (int): Size of each sample (n).
+        num_samples (int): Number of samples to draw.
+        rng (Generator or SeedSequence): Source of randomness, a fresh Generator is used if omitted.
+        max_block_bytes (int): Memory budget for one block of drawn indices.
+        workers (int): Threads drawing blocks in parallel. Needs a SeedSequence, whose spawned
+            per-block streams keep the result independent of the number of workers.
+    """
+    means = np.empty(num_samples, dtype=np.float64)
+    start = 0
+    for chunk in iter_sample_means(population, sample_size, num_samples, rng, max_block_bytes, workers):
+        means[start:start + chunk.size] = chunk
+        start += chunk.size
+    return means
+
+
+def sample_means_and_errors(population, sample_size, num_samples, rng=None, max_block_bytes=DEFAULT_BLOCK_BYTES):
+    """
+    Draw num_samples samples and return their means and standard errors (ddof=1).
+    """
+    means = np.empty(num_samples, dtype=np.float64)
+    errors = np.empty(num_samples, dtype=np.float64)
+    start = 0
+    for chunk_means, chunk_errors in iter_sample_means_and_errors(population, sample_size, num_samples, rng, max_block_bytes):
+        stop = start + chunk_means.size
+        means[start:stop] = chunk_means
+        errors[start:stop] = chunk_errors
+        start = stop
+    return means, errors
+
+
+def cumulative_sample_means(population, max_n, num_samples, rng=None):
+    """
+    Means for every sample size n = 1..max_n from a single (num_samples, max_n) draw.
+
+    Column n-1 holds the means of the first n values of each row, so all sample sizes
+    share one simulation and one cumulative sum.
+    """
+    rng = np.random.default_rng(rng) if not isinstance(rng, np.random.Generator) else rng
+    population = np.asarray(population, dtype=np.float64)
+    indices = rng.integers(0, population.size, size=(num_samples, max_n), dtype=np.int32)
+    means = np.cumsum(population.take(indices), axis=1)
+    means /= np.arange(1, max_n + 1)
+    return means
+
+
+def convergence_diagnostics(means, mu, sigma):
+    """
+    Compare each column of cumulative_sample_means against its normal approximation N(mu, sigma/sqrt(n)).
+
+    Returns:
+        dict: Arrays over n = 1..max_n with the Kolmogorov-Smirnov distance ("ks"),
+        the skewness ("skewness") and the standard error ("standard_error") of the sample means.
+    """
+    num_samples, max_n = means.shape
+    n = np.arange(1, max_n + 1)
+
+    # KS distance of every column at once, from the column-wise sorted means
+    z = (np.sort(means, axis=0) - mu) / (sigma / np.sqrt(n))
+    cdf = normal_cdf(z)
+    rank = np.arange(1, num_samples + 1)[:, None]
+    ks = np.maximum((rank / num_samples - cdf).max(axis=0), (cdf - (rank - 1) / num_samples).max(axis=0))
+
+    return {
+        "ks": ks,
+        "skewness": stats.skew(means, axis=0),
+        "standard_error": means.std(axis=0, ddof=1),
+    }
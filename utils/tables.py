@@ -0,0 +1,175 @@
+"""
+Precomputed curve tables for the slider-bound distribution pages.
+
+Every slider on those pages is bounded and discrete, so each curve family can be
+evaluated once and stored as a memory-mapped .npy table. Pages then slice a row
+instead of calling scipy on every rerun, and all sessions (and processes) share
+the same pages of the OS file cache.
+
+Build all tables ahead of time with:
+
+    python -m utils.tables
+
+Missing tables are built on first use.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from utils.distributions import compute, evaluate
+
+TABLE_DIR = Path(os.environ.get("DISTRIBUTION_TABLE_DIR", Path(__file__).resolve().parent.parent / "tables"))
+
+# Memory-mapped tables loaded so far, by family name and function
+_loaded_tables = {}
+
+# Curve families: slider grids as (start, step, count) and the x values of each curve
+FAMILIES = {
+    "binomial": {
+        "params": {"n": (1, 1, 50), "p": (0.01, 0.01, 100)},
+        "x": np.arange(0, 51),
+        "functions": ("pmf", "cdf"),
+    },
+    "poisson": {
+        "params": {"lam": (1, 1, 15)},
+        "x": np.arange(0, 16),
+        "functions": ("pmf", "cdf"),
+    },
+    "t": {
+        "params": {"df": (1, 1, 100)},
+        "x": np.linspace(-4, 4, 1000),
+        "functions": ("pdf",),
+    },
+    # Location-scale family: one standard curve covers every μ and σ (x = μ + σz)
+    "normal": {
+        "params": {},
+        "fixed": {"mu": 0, "sigma": 1},
+        "x": np.linspace(-3, 3, 1000),
+        "functions": ("pdf", "cdf"),
+    },
+}
+
+
+def _axis(start, step, count):
+    return start + step * np.arange(count)
+
+
+def _table_path(name, function):
+    return TABLE_DIR / f"{name}_{function}.npy"
+
+
+def build_table(name, function):
+    """
+    Evaluate one curve family on its full parameter grid and save it as .npy.
+    """
+    family = FAMILIES[name]
+    axes = [_axis(*spec) for spec in family["params"].values()]
+    grids = np.meshgrid(*axes, indexing="ij") if axes else []
+
+    # Parameters get a trailing axis so they broadcast against x
+    params = {key: grid[..., None] for key, grid in zip(family["params"], grids)}
+    params.update(family.get("fixed", {}))
+    table = compute(name, function, family["x"], **params)
+
+    # Write to a temporary file first, so concurrent readers never see a partial table
+    TABLE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=TABLE_DIR, suffix=".npy", delete=False) as handle:
+        np.save(handle, np.ascontiguousarray(table, dtype=np.float64))
+    os.chmod(handle.name, 0o644)
+    os.replace(handle.name, _table_path(name, function))
+
+
+def build_all():
+    """
+    Build every table of every family.
+    """
+    for name, family in FAMILIES.items():
+        for function in family["functions"]:
+            build_table(name, function)
+
+
+def load_table(name, function):
+    """
+    Memory-mapped table of a family, built first if missing. None if it can't be built.
+
+    Loaded tables are kept for the process; failures aren't, so a table that couldn't be
+    built (e.g. on a full or read-only disk) is tried again on the next call.
+    """
+    table = _loaded_tables.get((name, function))
+    if table is not None:
+        return table
+    path = _table_path(name, function)
+    try:
+        if not path.exists():
+            build_table(name, function)
+        table = np.load(path, mmap_mode="r")
+    except OSError:
+        return None
+    _loaded_tables[(name, function)] = table
+    return table
+
+
+def _index(params, spec):
+    """
+    Index of the parameter values on the table grid, or None if any is off the grid.
+    """
+    index = []
+    for key, (start, step, count) in spec.items():
+        position = (params[key] - start) / step
+        i = int(round(position))
+        if not 0 <= i < count or abs(position - i) > 1e-6:
+            return None
+        index.append(i)
+    return tuple(index)
+
+
+def lookup(name, function, **params):
+    """
+    Precomputed curve for the given slider values, or None if it isn't tabulated.
+    """
+    family = FAMILIES.get(name)
+    if family is None or function not in family["functions"] or set(params) != set(family["params"]):
+        return None
+    index = _index(params, family["params"])
+    if index is None:
+        return None
+    table = load_table(name, function)
+    return None if table is None else table[index]
+
+
+def tabulated(name, function, x, **params):
+    """
+    Same as utils.distributions.evaluate, served from the precomputed table when x is
+    (a prefix of) the table's x values and the parameters lie on its grid.
+    """
+    family = FAMILIES.get(name)
+    x = np.asarray(x)
+    if family is not None and x.ndim == 1 and x.size <= family["x"].size \
+            and np.array_equal(x, family["x"][:x.size]):
+        row = lookup(name, function, **params)
+        if row is not None:
+            return row[:x.size]
+    return evaluate(name, function, x, **params)
+
+
+def normal_curve(function, mu, sigma):
+    """
+    Normal curve over μ ± 3σ from the standard table.
+
+    Returns:
+        x (ndarray): Points of the curve.
+        y (ndarray): PDF or CDF at x.
+    """
+    z = FAMILIES["normal"]["x"]
+    table = load_table("normal", function)
+    if table is None:
+        table = evaluate("normal", function, z, mu=0, sigma=1)
+    y = table / sigma if function == "pdf" else table
+    return mu + sigma * z, y
+
+
+if __name__ == "__main__":
+    build_all()
+    print(f"Tables written to {TABLE_DIR}")